@@ -0,0 +1,97 @@
+"""
+Stores benchmark results as JSON and compares two runs metric by metric.
+
+Usage:
+    python -m benchmarks.baseline benchmarks/baseline.json benchmarks/results/20261018_093000.json
+"""
+import argparse
+import json
+import os
+import sys
+from configs.configs import BENCH_REGRESSION_THRESHOLD, BENCH_METRIC_THRESHOLDS
+from utilities.utilities import write_atomically
+
+
+def save_results(results: dict, path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # An interrupted run must not leave a truncated baseline behind
+    write_atomically(path, json.dumps(results, indent=2, sort_keys=True))
+
+
+def load_results(path: str) -> dict:
+    with open(path, encoding="utf-8") as results_file:
+        return json.load(results_file)
+
+
+def threshold_for(metric: str, threshold: float = BENCH_REGRESSION_THRESHOLD, overrides=BENCH_METRIC_THRESHOLDS):
+    """Returns the allowed slowdown of a metric; overrides are keyed by the name before its parameters."""
+    return overrides.get(metric.split("[")[0], threshold)
+
+
+def compare_runs(baseline: dict, current: dict, threshold: float = BENCH_REGRESSION_THRESHOLD,
+                 overrides=BENCH_METRIC_THRESHOLDS):
+    """
+    Compares the median seconds of every metric in two runs.
+
+    :returns: list: One dict per metric with "metric", "baseline", "current", "change" (relative to
+        the baseline) and "status": "regressed" or "improved" past the metric's threshold, "ok",
+        "new" (not in the baseline) or "missing" (not measured in the current run).
+    """
+    rows = []
+    old_metrics, new_metrics = baseline["metrics"], current["metrics"]
+    for metric in sorted(set(old_metrics) | set(new_metrics)):
+        old = old_metrics.get(metric, {}).get("median")
+        new = new_metrics.get(metric, {}).get("median")
+        change = (new - old) / old if old and new is not None else None
+        limit = threshold_for(metric, threshold, overrides)
+        if old is None:
+            status = "new"
+        elif new is None:
+            status = "missing"
+        elif change > limit:
+            status = "regressed"
+        elif change < -limit:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"metric": metric, "baseline": old, "current": new, "change": change, "status": status})
+    return rows
+
+
+def failing_rows(rows, allow_missing: bool = False):
+    """Returns the compare_runs rows that fail the gate: regressions, and missing metrics unless allowed."""
+    failing_statuses = {"regressed"} if allow_missing else {"regressed", "missing"}
+    return [row for row in rows if row["status"] in failing_statuses]
+
+
+def format_table(rows) -> str:
+    """Formats compare_runs rows as a fixed-width table, times in milliseconds."""
+    def milliseconds(seconds):
+        return f"{seconds * 1000:.1f}" if seconds is not None else "-"
+
+    width = max([len(row["metric"]) for row in rows] + [len("metric")])
+    lines = [f"{'metric':<{width}} {'baseline ms':>12} {'current ms':>12} {'change':>8}  status"]
+    for row in rows:
+        change = f"{row['change']:+.0%}" if row["change"] is not None else "-"
+        lines.append(f"{row['metric']:<{width}} {milliseconds(row['baseline']):>12} "
+                     f"{milliseconds(row['current']):>12} {change:>8}  {row['status']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", help="Results of the earlier run")
+    parser.add_argument("current", help="Results of the later run")
+    parser.add_argument("--threshold", type=float, default=BENCH_REGRESSION_THRESHOLD,
+                        help="Relative slowdown that counts as a regression")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="Pass even when baseline metrics were not measured in the later run")
+    args = parser.parse_args()
+
+    rows = compare_runs(load_results(args.baseline), load_results(args.current), args.threshold)
+    print(format_table(rows))
+    sys.exit(1 if failing_rows(rows, args.allow_missing) else 0)
+
+
+if __name__ == "__main__":
+    main()
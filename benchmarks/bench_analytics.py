@@ -0,0 +1,70 @@
+"""
+Times the product analytics stage on a synthetic merged product table.
+
+Usage:
+    python -m benchmarks.bench_analytics --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from configs.configs import SEARCH_ITEMS, SCREEN_SIZES
+from utilities.product_analytics import load_products, aggregate, cross_browser_consistency
+
+
+def write_products(path, rows, seed=0):
+    """Writes a product_info.csv with the sink's columns and text formats, including N/A values."""
+    rng = np.random.default_rng(seed)
+    asins = np.char.add("B", np.char.zfill(rng.integers(0, 50000, rows).astype(str), 9))
+    prices = pd.Series(rng.integers(99, 150000, rows)).map("Rs. {:,}".format)
+    prices[::5] = "N/A"
+    ratings = pd.Series((rng.integers(10, 51, rows) / 10).astype(str))
+    ratings[::7] = "N/A"
+    pd.DataFrame({
+        "term": rng.choice(SEARCH_ITEMS, rows),
+        "browser": rng.choice(["chrome", "edge", "firefox"], rows),
+        "device": rng.choice(list(SCREEN_SIZES), rows),
+        "asin": asins,
+        "name": "Product " + pd.Series(asins),
+        "price": prices,
+        "rating": ratings,
+        "url": "https://www.amazon.in/dp/" + pd.Series(asins)
+    }).to_csv(path, index=False)
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "product_info.csv")
+        write_products(path, rows)
+
+        timings = {}
+        start = time.perf_counter()
+        frame = load_products(path)
+        timings["load + parse"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        summary = aggregate(frame)
+        timings["aggregate"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cross_browser_consistency(frame)
+        timings["consistency"] = time.perf_counter() - start
+
+    print(f"rows={rows} groups={len(summary)}")
+    for stage, seconds in timings.items():
+        print(f"{stage:>14}: {seconds:.2f}s")
+    print(f"{'total':>14}: {sum(timings.values()):.2f}s")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+    run(args.rows)
+
+
+if __name__ == "__main__":
+    main()
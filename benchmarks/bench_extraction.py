@@ -0,0 +1,72 @@
+"""
+Compares the WebDriver round trips and wall time of the batched and per-element extraction paths.
+
+Usage:
+    python -m benchmarks.bench_extraction --browser chrome --cards 16 48
+"""
+import argparse
+import os
+import time
+from page_objects.search_result_page import SearchResultPage
+from utilities.stand_in_server import StandInServer
+from utilities.utilities import BrowserFactory, SingletonLogger
+
+
+class RoundTripCounter:
+    """Counts the WebDriver commands (HTTP round trips) a driver issues while active."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.count = 0
+        self._execute = None
+
+    def __enter__(self):
+        self._execute = self.driver.execute
+
+        def counting_execute(*args, **kwargs):
+            self.count += 1
+            return self._execute(*args, **kwargs)
+
+        self.driver.execute = counting_execute
+        return self
+
+    def __exit__(self, *exc_info):
+        self.driver.execute = self._execute
+
+
+def run(browser_name, card_counts):
+    driver = BrowserFactory.get_browser(browser_name).create_driver()
+    logger = SingletonLogger().get_logger()
+    page = SearchResultPage(driver, logger)
+    results = []
+
+    try:
+        with StandInServer(port=0) as server:
+            for card_count in card_counts:
+                driver.get(f"{server.url}s?k=benchmark&cards={card_count}")
+
+                for mode in ("batched", "element"):
+                    with RoundTripCounter(driver) as counter:
+                        start = time.perf_counter()
+                        products = page.extract_product_information(mode=mode)
+                        elapsed = time.perf_counter() - start
+                    results.append((card_count, mode, len(products), counter.count, elapsed))
+    finally:
+        driver.quit()
+
+    print(f"{'cards':>6} {'mode':>8} {'products':>9} {'round trips':>12} {'seconds':>9}")
+    for card_count, mode, products, round_trips, elapsed in results:
+        print(f"{card_count:>6} {mode:>8} {products:>9} {round_trips:>12} {elapsed:>9.3f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--browser", default=os.environ.get("BENCH_BROWSER", "chrome"))
+    parser.add_argument("--cards", type=int, nargs="+", default=[16, 48])
+    args = parser.parse_args()
+    run(args.browser, args.cards)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Measures the pages per second of the browser-free HTTP crawl engine against the local stand-in.
+
+Usage:
+    python -m benchmarks.bench_http_crawl --pages 20 --concurrency 8 --latency 0.05
+"""
+import argparse
+from urllib.parse import urlsplit
+from configs.configs import SEARCH_ITEMS, HTTP_CRAWL_CONCURRENCY
+from utilities.http_crawler import HttpCrawlEngine
+from utilities.rate_limiter import HostRateLimiter
+from utilities.stand_in_server import StandInServer
+
+
+def run(pages, concurrency, latency):
+    with StandInServer(port=0, latency=latency) as server:
+        # The stand-in is local, so the host rate limiter would only measure its own pacing
+        limiter = HostRateLimiter(urlsplit(server.url).netloc, enabled=False)
+        engine = HttpCrawlEngine(server.url, concurrency=concurrency, rate_limiter=limiter)
+        results = engine.crawl_many(SEARCH_ITEMS, pages)
+
+    products = sum(len(products_info) for products_info in results.values())
+    print(f"pages={engine.stats['pages']} products={products} errors={engine.stats['errors']} "
+          f"seconds={engine.stats['seconds']:.3f} pages/s={engine.pages_per_second:.1f}")
+    return engine.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20, help="Result pages per search term")
+    parser.add_argument("--concurrency", type=int, default=HTTP_CRAWL_CONCURRENCY)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stand-in latency per response in seconds")
+    args = parser.parse_args()
+    run(args.pages, args.concurrency, args.latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Compares navigation time, asset requests and browser memory of the page-load profiles.
+
+Each profile launches a fresh browser and loads the same search result pages from the local
+stand-in, whose cards reference an image each and a web font. Memory is the resident size of the
+driver and browser process tree and needs the optional psutil package.
+
+Usage:
+    python -m benchmarks.bench_load_profiles --browser chrome --loads 10 --latency 0.05
+"""
+import argparse
+import os
+import time
+from configs.configs import LOAD_PROFILES
+from page_objects.search_result_page import SearchResultPage
+from utilities.stand_in_server import StandInServer
+from utilities.utilities import BrowserFactory
+
+
+def process_tree_rss(driver):
+    """Resident memory in MB of the driver service and every browser process it started, or None."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return None
+    rss = 0
+    for process in processes:
+        try:
+            rss += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return rss / (1024 * 1024)
+
+
+def run(browser_name, profiles, loads, cards, latency):
+    results = []
+    with StandInServer(port=0, latency=latency) as server:
+        for profile in profiles:
+            driver = BrowserFactory.get_browser(browser_name, profile).create_driver()
+            try:
+                assets_before = server.stats["assets"]
+                timings = []
+                for load in range(loads):
+                    url = SearchResultPage.build_search_url(server.url, "benchmark", load % 5 + 1)
+                    start = time.perf_counter()
+                    driver.get(f"{url}&cards={cards}")
+                    timings.append(time.perf_counter() - start)
+                results.append((profile, sum(timings) / loads, max(timings),
+                                server.stats["assets"] - assets_before, process_tree_rss(driver)))
+            finally:
+                driver.quit()
+
+    print(f"{'profile':>10} {'avg load s':>11} {'max load s':>11} {'asset reqs':>11} {'memory MB':>10}")
+    for profile, average, slowest, assets, rss in results:
+        memory = f"{rss:.0f}" if rss is not None else "n/a"
+        print(f"{profile:>10} {average:>11.3f} {slowest:>11.3f} {assets:>11} {memory:>10}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--browser", default=os.environ.get("BENCH_BROWSER", "chrome"))
+    parser.add_argument("--profiles", nargs="+", default=list(LOAD_PROFILES), choices=list(LOAD_PROFILES))
+    parser.add_argument("--loads", type=int, default=10, help="Navigations per profile")
+    parser.add_argument("--cards", type=int, default=48, help="Result cards (and card images) per page")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stand-in latency per response in seconds")
+    args = parser.parse_args()
+    run(args.browser, args.profiles, args.loads, args.cards, args.latency)
+
+
+if __name__ == "__main__":
+    main()
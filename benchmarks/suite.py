@@ -0,0 +1,219 @@
+"""
+Measures the automation hot paths against the local stand-in and gates them against a JSON baseline.
+
+Browser metrics (driver startup, open_amazon_website, search_product, extract_product_information at
+16/48/200 cards, screenshot capture) run for every --browsers entry; a browser that cannot start is
+reported as skipped. Product sink writes and merges, screenshot encoding and SingletonLogger
+throughput need no browser. Every metric is the median of --repeat samples, in seconds.
+
+Each run is stored in benchmarks/results/; it fails when a metric is slower than the baseline by more
+than the threshold, or when a baseline metric was not measured (a skipped browser) unless
+--allow-missing. Compare any two stored runs with python -m benchmarks.baseline.
+
+configs reads USE_STAND_IN and RATE_LIMIT when it is first imported, so main() sets them before any
+project module is loaded and the functions below import those modules when they run.
+
+Usage:
+    python -m benchmarks.suite --browsers chrome firefox --save-baseline
+    python -m benchmarks.suite --browsers chrome --threshold 0.2
+"""
+import argparse
+import io
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+CARD_COUNTS = (16, 48, 200)
+SINK_ROWS = 10000
+LOG_RECORDS = 5000
+
+
+def measure(results, metric, sample, repeat):
+    """Runs sample() repeat times; sample returns the seconds of one measurement."""
+    samples = [sample() for _ in range(repeat)]
+    results["metrics"][metric] = {"median": statistics.median(samples), "samples": samples}
+    print(f"{metric:<48} {statistics.median(samples) * 1000:>10.1f} ms")
+
+
+def timed(action):
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def run_browser(results, browser_name, server, repeat):
+    from page_objects.home_page import HomePage
+    from page_objects.search_result_page import SearchResultPage
+    from utilities.screenshot_pipeline import ScreenshotPipeline
+    from utilities.utilities import BrowserFactory, SingletonLogger
+
+    logger = SingletonLogger().get_logger()
+    browser = BrowserFactory.get_browser(browser_name)
+    drivers = []
+
+    def start_driver():
+        start = time.perf_counter()
+        drivers.append(browser.create_driver())
+        return time.perf_counter() - start
+
+    try:
+        measure(results, f"driver_startup[{browser_name}]", start_driver, repeat)
+    except Exception as e:
+        # A later startup sample failed; every driver started so far, the first included, must go
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                logger.exception(f"Could not quit a {browser_name} driver")
+        results["skipped"][browser_name] = repr(e)
+        print(f"Skipping {browser_name}: {e!r}")
+        return
+    for driver in drivers[1:]:
+        driver.quit()
+
+    driver = drivers[0]
+    home_page = HomePage(driver, logger)
+    search_result_page = SearchResultPage(driver, logger)
+    try:
+        measure(results, f"open_amazon_website[{browser_name}]",
+                lambda: timed(lambda: home_page.open_amazon_website("desktop")), repeat)
+
+        def search():
+            home_page.open_amazon_website("desktop")
+            return timed(lambda: home_page.search_product("laptop"))
+        measure(results, f"search_product[{browser_name}]", search, repeat)
+
+        for card_count in CARD_COUNTS:
+            def extract():
+                driver.get(f"{server.url}s?k=benchmark&cards={card_count}")
+                return timed(search_result_page.extract_product_information)
+            measure(results, f"extract_product_information[{browser_name},cards={card_count}]", extract, repeat)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pipeline = ScreenshotPipeline(policy="always", base_dir=tmp_dir)
+            measure(results, f"screenshot_capture[{browser_name}]",
+                    lambda: timed(lambda: pipeline.capture(driver)), repeat)
+            pipeline.close()
+    finally:
+        driver.quit()
+
+
+def run_browser_free(results, repeat):
+    from page_objects.search_result_page import SearchResultPage
+    from utilities.product_sink import ProductSink
+    from utilities.stand_in_server import build_product
+    from utilities.utilities import SingletonLogger, ThumbnailStrategy
+
+    rows = [build_product("benchmark", index // 16 + 1, index % 16) for index in range(SINK_ROWS)]
+    products_info = [SearchResultPage.build_product_info({**row, "url": f"/dp/{row['asin']}"}) for row in rows]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        shard_dir = os.path.join(tmp_dir, "shards")
+
+        measure(results, f"sink_write[rows={SINK_ROWS}]", lambda: write_sink_rows(shard_dir, products_info), repeat)
+
+        def merge_sink():
+            write_sink_rows(shard_dir, products_info)
+            return timed(lambda: ProductSink.merge(shard_dir, tmp_dir, ["csv"]))
+        measure(results, f"sink_merge[rows={SINK_ROWS}]", merge_sink, repeat)
+
+        strategy = ThumbnailStrategy()
+        if strategy._image is None:
+            results["skipped"]["screenshot_encode"] = "Pillow is not installed"
+        else:
+            frame = io.BytesIO()
+            strategy._image.effect_noise((1920, 1080), 64).convert("RGB").save(frame, format="PNG")
+            png_bytes = frame.getvalue()
+            measure(results, "screenshot_encode",
+                    lambda: timed(lambda: strategy.write(png_bytes, tmp_dir, "frame")), repeat)
+
+    logger = SingletonLogger().get_logger()
+
+    def log_records():
+        start = time.perf_counter()
+        for index in range(LOG_RECORDS):
+            logger.info(f"INFO :: bench :: Benchmark record {index}")
+        return time.perf_counter() - start
+    measure(results, f"logger[records={LOG_RECORDS}]", log_records, repeat)
+
+
+def write_sink_rows(shard_dir, products_info):
+    """Writes the rows to a fresh shard sixteen at a time, like one result page per add; returns the seconds taken."""
+    from utilities.product_sink import ProductSink
+
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    start = time.perf_counter()
+    sink = ProductSink(shard_dir, "bench")
+    for offset in range(0, len(products_info), 16):
+        sink.add("benchmark", "bench", "desktop", products_info[offset:offset + 16])
+    sink.close()
+    return time.perf_counter() - start
+
+
+def run(browsers, repeat):
+    from utilities.stand_in_server import StandInServer
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "metrics": {},
+        "skipped": {}
+    }
+    with StandInServer() as server:
+        for browser_name in browsers:
+            run_browser(results, browser_name, server, repeat)
+    run_browser_free(results, repeat)
+    return results
+
+
+def main():
+    # The suite always measures against the stand-in, without the host rate limiter pacing navigations
+    os.environ["USE_STAND_IN"] = "1"
+    os.environ["RATE_LIMIT"] = "0"
+    from configs.configs import BENCH_RESULTS_DIR, BENCH_BASELINE_PATH, BENCH_REGRESSION_THRESHOLD
+    from benchmarks.baseline import save_results, load_results, compare_runs, format_table, failing_rows
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--browsers", nargs="*", default=["chrome"], choices=["chrome", "edge", "firefox"])
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per metric")
+    parser.add_argument("--baseline", default=BENCH_BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=BENCH_REGRESSION_THRESHOLD,
+                        help="Relative slowdown over the baseline that fails the run")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="Pass even when baseline metrics were not measured, e.g. a browser was skipped")
+    args = parser.parse_args()
+
+    results = run(args.browsers, args.repeat)
+    results_path = os.path.join(BENCH_RESULTS_DIR, f"{datetime.now():%Y%m%d_%H%M%S}.json")
+    save_results(results, results_path)
+    print(f"Results written to {results_path}")
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.isfile(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    rows = compare_runs(load_results(args.baseline), results, args.threshold)
+    print(format_table(rows))
+    failing = failing_rows(rows, args.allow_missing)
+    for status in ("regressed", "missing"):
+        metrics = [row["metric"] for row in failing if row["status"] == status]
+        if metrics:
+            print(f"{status.capitalize()}: {', '.join(metrics)}", file=sys.stderr)
+    if failing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
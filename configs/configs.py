@@ -1,4 +1,18 @@
-BASE_URL = "https://www.amazon.in/"
+import os
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Local Amazon stand-in (utilities/stand_in_server.py); USE_STAND_IN=1 points BASE_URL at it
+USE_STAND_IN = os.environ.get("USE_STAND_IN", "0") == "1"
+STAND_IN_HOST = "127.0.0.1"
+STAND_IN_PORT = int(os.environ.get("STAND_IN_PORT", "8765"))
+# Seconds added to every stand-in response
+STAND_IN_LATENCY = float(os.environ.get("STAND_IN_LATENCY", "0"))
+# "traffic" serves the rush hour page, "captcha" the CAPTCHA page, for STAND_IN_ERROR_RATE of the requests
+STAND_IN_ERROR_MODE = os.environ.get("STAND_IN_ERROR_MODE", "")
+STAND_IN_ERROR_RATE = float(os.environ.get("STAND_IN_ERROR_RATE", "0"))
+
+BASE_URL = f"http://{STAND_IN_HOST}:{STAND_IN_PORT}/" if USE_STAND_IN else "https://www.amazon.in/"
 SEARCH_ITEMS = ["mobile", "laptop", "headphones"]
 TIMEOUT = 30
 SCREEN_SIZES = {
@@ -6,3 +20,161 @@ SCREEN_SIZES = {
     "tablet": (768, 1024),
     "mobile": (375, 667)
 }
+
+# Page-load profiles applied by the Browser classes in utilities/utilities.py. "eager" returns from navigation
+# at DOMContentLoaded, "text-only" additionally blocks images and web fonts, which the extraction never reads
+LOAD_PROFILE = os.environ.get("LOAD_PROFILE", "eager")
+LOAD_PROFILES = {
+    "full": {"page_load_strategy": "normal", "block_images": False, "block_fonts": False, "disable_extensions": False},
+    "eager": {"page_load_strategy": "eager", "block_images": False, "block_fonts": False, "disable_extensions": True},
+    "text-only": {"page_load_strategy": "eager", "block_images": True, "block_fonts": True, "disable_extensions": True}
+}
+# URL patterns blocked through CDP on Chrome and Edge when a profile blocks fonts
+BLOCKED_FONT_URLS = ["*.woff", "*.woff2", "*.ttf", "*.otf"]
+
+# Search result pages crawled per search term, and how many of them are loaded at once in separate tabs
+CRAWL_PAGE_DEPTH = 3
+CRAWL_TAB_CONCURRENCY = 3
+
+# Standalone crawl runner (python -m utilities.crawl_runner): worker processes, each with its own browser sessions,
+# and seconds between live throughput lines
+CRAWL_RUNNER_WORKERS = int(os.environ.get("CRAWL_RUNNER_WORKERS", "2"))
+CRAWL_RUNNER_PROGRESS_INTERVAL = 2.0
+
+# Last completed result page of every term/device/browser crawl (utilities/crawl_checkpoint.py); a crawl that
+# failed resumes after it if the checkpoint is younger than CRAWL_CHECKPOINT_MAX_AGE seconds
+CRAWL_CHECKPOINT_DIR = os.path.join(PROJECT_ROOT, "test_data", "checkpoints")
+CRAWL_CHECKPOINT_MAX_AGE = 60 * 60
+
+# Host-wide rate limiter shared by every process navigating to one host (utilities/rate_limiter.py): a token bucket
+# refilled at RATE_LIMIT_PER_SECOND navigations per second, halved on every traffic error page and raised again
+# by RATE_LIMIT_RECOVERY per successful navigation
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT", "1") == "1"
+RATE_LIMIT_STATE_DIR = os.path.join(PROJECT_ROOT, ".rate_limit")
+RATE_LIMIT_PER_SECOND = float(os.environ.get("RATE_LIMIT_PER_SECOND", "50" if USE_STAND_IN else "2"))
+RATE_LIMIT_MIN_PER_SECOND = 0.2
+RATE_LIMIT_RECOVERY = 0.1
+RATE_LIMIT_BURST = 4
+# A navigation that lands on the traffic error page is retried after base * 2^(consecutive errors - 1) seconds,
+# capped at RATE_LIMIT_BACKOFF_MAX and jittered
+RATE_LIMIT_BACKOFF_BASE = 1.0
+RATE_LIMIT_BACKOFF_MAX = 60.0
+RATE_LIMIT_MAX_RETRIES = 4
+# Consecutive traffic errors across all processes that open the circuit and pause every worker for the cooldown;
+# an error right after the cooldown reopens it for twice as long, up to CIRCUIT_BREAKER_MAX_COOLDOWN
+CIRCUIT_BREAKER_THRESHOLD = 5
+CIRCUIT_BREAKER_COOLDOWN = 30.0
+CIRCUIT_BREAKER_MAX_COOLDOWN = 300.0
+
+# "batched" extracts every search result card in one execute_script call, "element" uses one call per element.
+# "network" parses the search result documents Chrome and Edge received (utilities/network_capture.py) and
+# falls back to "batched" when no response was captured, e.g. on Firefox
+EXTRACTION_MODE = os.environ.get("EXTRACTION_MODE", "batched")
+# Responses kept by the network capture: documents whose URL matches the pattern, at most this many at a time
+NETWORK_CAPTURE_URL_PATTERN = r"/s(?:\?|$)"
+NETWORK_CAPTURE_MAX_RESPONSES = 16
+
+# Snapshot cache of extracted search result pages (utilities/snapshot_cache.py), keyed by term, page and viewport.
+# SNAPSHOT_CACHE=1 lets the crawl test reuse a fresh snapshot instead of searching again
+SNAPSHOT_CACHE_ENABLED = os.environ.get("SNAPSHOT_CACHE", "0") == "1"
+SNAPSHOT_CACHE_DIR = os.path.join(PROJECT_ROOT, ".snapshot_cache")
+SNAPSHOT_CACHE_TTL = 6 * 60 * 60
+SNAPSHOT_CACHE_MAX_BYTES = 200 * 1024 * 1024
+# Also keep the gzipped page source of every cached page
+SNAPSHOT_CACHE_STORE_HTML = os.environ.get("SNAPSHOT_CACHE_STORE_HTML", "0") == "1"
+
+# A pooled browser session is quit and relaunched after this many leases
+DRIVER_POOL_MAX_USES = 5
+# Window size a pooled session is reset to when it is returned to the pool
+DRIVER_POOL_WINDOW_SIZE = SCREEN_SIZES["desktop"]
+
+# Persistent manifest mapping browser versions to resolved driver binaries, shared by all workers
+DRIVER_MANIFEST_PATH = os.path.join(PROJECT_ROOT, ".driver_cache", "manifest.json")
+# When set, drivers are only taken from the manifest, *DRIVER_PATH environment variables or the PATH
+DRIVER_OFFLINE = os.environ.get("DRIVER_OFFLINE", "0") == "1"
+DRIVER_PATH_ENV_VARS = {
+    "chrome": "CHROMEDRIVER_PATH",
+    "firefox": "GECKODRIVER_PATH",
+    "edge": "MSEDGEDRIVER_PATH"
+}
+DRIVER_BINARY_NAMES = {
+    "chrome": "chromedriver",
+    "firefox": "geckodriver",
+    "edge": "msedgedriver"
+}
+
+# Browser-free crawl engine (utilities/http_crawler.py)
+HTTP_CRAWL_CONCURRENCY = 8
+HTTP_CRAWL_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/122.0.0.0 Safari/537.36",
+    "Accept-Language": "en-IN,en;q=0.9"
+}
+
+# Session-level product sink (utilities/product_sink.py): workers write shards that are merged at session end
+PRODUCT_SINK_DIR = os.path.join(PROJECT_ROOT, "test_data")
+# Any of "csv", "jsonl" and "parquet" (parquet needs pyarrow)
+PRODUCT_SINK_FORMATS = os.environ.get("PRODUCT_SINK_FORMATS", "csv").split(",")
+# Rows buffered in memory before they are appended to the worker's shard
+PRODUCT_SINK_FLUSH_ROWS = 1000
+
+# Persistent ASIN index fed with every run's merged products (utilities/product_index.py), and the run's diff
+PRODUCT_INDEX_PATH = os.path.join(PRODUCT_SINK_DIR, "product_index.sqlite3")
+PRODUCT_DIFF_PATH = os.path.join(PRODUCT_SINK_DIR, "product_diff.json")
+
+# Product analytics (utilities/product_analytics.py): per-group aggregates, and the share of ASINs every
+# browser must agree on for a term and device
+PRODUCT_SUMMARY_PATH = os.path.join(PRODUCT_SINK_DIR, "product_summary.csv")
+ANALYTICS_MIN_OVERLAP = 0.8
+# With ANALYTICS_CHECK=1 a pytest run whose browsers disagree on a result set fails; otherwise the overlap
+# is only reported. Live Amazon serves different sponsored results per browser and session, so the
+# check is on by default only against the deterministic stand-in
+ANALYTICS_CHECK = os.environ.get("ANALYTICS_CHECK", "1" if USE_STAND_IN else "0") == "1"
+
+# Screenshot pipeline (utilities/screenshot_pipeline.py): "always", "on-failure" or "sampled"
+SCREENSHOT_POLICY = os.environ.get("SCREENSHOT_POLICY", "on-failure")
+# Share of passing test phases captured under the "sampled" policy (failures are always captured)
+SCREENSHOT_SAMPLE_RATE = 0.1
+SCREENSHOT_THUMBNAIL_SIZE = (304, 228)
+SCREENSHOT_QUALITY = 80
+
+# Report artifacts (utilities/report_artifacts.py): before every run, Reports/<date> days older than
+# REPORT_RETENTION_DAYS are removed, then the oldest ones until the tree fits in REPORT_MAX_TOTAL_MB.
+# Bundles of a day's run use "zstd" (needs zstandard), "gzip", or "auto" for zstd when it is installed
+REPORTS_DIR = os.path.join(PROJECT_ROOT, "Reports")
+REPORT_RETENTION = os.environ.get("REPORT_RETENTION", "1") == "1"
+REPORT_RETENTION_DAYS = int(os.environ.get("REPORT_RETENTION_DAYS", "14"))
+REPORT_MAX_TOTAL_MB = int(os.environ.get("REPORT_MAX_TOTAL_MB", "200"))
+REPORT_BUNDLE_COMPRESSION = os.environ.get("REPORT_BUNDLE_COMPRESSION", "auto")
+
+# Logging: LOG_STRUCTURED=1 writes JSON records; every worker file rotates at LOG_MAX_BYTES
+LOG_STRUCTURED = os.environ.get("LOG_STRUCTURED", "0") == "1"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Per-step tracing of page-object actions (utilities/tracing.py): Chrome trace files and a p50/p95 report table
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "0") == "1"
+
+# Benchmark suite (python -m benchmarks.suite): run results, the baseline they are gated against, and the slowdown
+# over the baseline median that fails a run; metrics dominated by process startup get a looser threshold
+BENCH_RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+BENCH_BASELINE_PATH = os.path.join(PROJECT_ROOT, "benchmarks", "baseline.json")
+BENCH_REGRESSION_THRESHOLD = 0.2
+BENCH_METRIC_THRESHOLDS = {"driver_startup": 0.5}
+
+# Duration-aware xdist scheduling (utilities/duration_scheduler.py): per-test history balanced across workers
+DURATION_SCHEDULING = os.environ.get("DURATION_SCHEDULING", "1") == "1"
+DURATION_STORE_PATH = os.path.join(PROJECT_ROOT, ".pytest_durations.json")
+# Weight of the latest run in a test's moving average duration
+DURATION_HISTORY_WEIGHT = 0.5
+
+# Import-time profile in the report (utilities/import_profile.py): IMPORT_PROFILE=1 times each root's imports in a
+# fresh interpreter with -X importtime, in the background while the tests run, and lists its heaviest modules
+IMPORT_PROFILE = os.environ.get("IMPORT_PROFILE", "0") == "1"
+IMPORT_PROFILE_ROOTS = {
+    "test session": ["test_cases.conftest"],
+    "chrome driver": ["selenium.webdriver.chrome.webdriver", "webdriver_manager.chrome"],
+    "firefox driver": ["selenium.webdriver.firefox.webdriver", "webdriver_manager.firefox"],
+    "edge driver": ["selenium.webdriver.edge.webdriver", "webdriver_manager.microsoft"],
+}
+IMPORT_PROFILE_TOP = 5
@@ -12,6 +12,9 @@ pip install pytest-dependency
 pip install pytest-selenium
 pip install pytest-ordering
 pip install pandas
+pip install aiohttp
+pip install lxml
+pip install Pillow
 
 REM Deactivate the virtual environment
 deactivate
\ No newline at end of file
@@ -1,15 +1,168 @@
+import sys
+from time import monotonic, sleep
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from configs.configs import TIMEOUT
+from utilities.network_capture import NetworkCapture
+from utilities.rate_limiter import HostRateLimiter
+from configs.configs import TIMEOUT, BASE_URL, RATE_LIMIT_MAX_RETRIES
+
+class PageState:
+    """States a loaded Amazon document is classified into by BasePage.detect_page_state."""
+    READY = "ready"
+    CAPTCHA = "captcha"
+    TRAFFIC_ERROR = "traffic_error"
+    LOADING = "loading"
 
 class BasePage:
     """Base class for all page objects to handle common operations."""
+    INPUT_CAPTCHA_ID = 'captchacharacters'
+    TEXT_TRAFFIC_ERROR = "rush hour and traffic is piling up"
+
+    # Classifies the current document in a single WebDriver round trip
+    PAGE_STATE_SCRIPT = """
+        var readyElementId = arguments[0], captchaInputId = arguments[1], trafficErrorText = arguments[2];
+        if (document.getElementById(captchaInputId)) return 'captcha';
+        var body = document.body ? document.body.textContent : '';
+        if (body.indexOf(trafficErrorText) !== -1) return 'traffic_error';
+        if (readyElementId && document.getElementById(readyElementId)) return 'ready';
+        return 'loading';
+    """
+
+    # Resolves every locator in one WebDriver round trip and flags error pages so waits can fail fast
+    LOCATE_ALL_SCRIPT = """
+        var locators = arguments[0], captchaInputId = arguments[1], trafficErrorText = arguments[2];
+        var body = document.body ? document.body.textContent : '';
+        if (document.getElementById(captchaInputId)) return {blockedBy: 'captcha'};
+        if (body.indexOf(trafficErrorText) !== -1) return {blockedBy: 'traffic_error'};
+        var report = {};
+        for (var name in locators) {
+            var by = locators[name][0], value = locators[name][1], element = null;
+            if (by === 'id') element = document.getElementById(value);
+            else if (by === 'css selector') element = document.querySelector(value);
+            else if (by === 'xpath') element = document.evaluate(
+                value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            report[name] = element ? (element.getClientRects().length > 0 ? 'displayed' : 'present') : 'missing';
+        }
+        return {report: report};
+    """
+
     def __init__(self, driver, logger):
         self.driver = driver
         self.logger = logger
         self.wait = WebDriverWait(self.driver, TIMEOUT)
         self.browser_name = self.driver.capabilities.get('browserName', 'Unknown')
+        # Every navigation to the host draws from the budget shared by all workers
+        self.rate_limiter = HostRateLimiter.for_url(BASE_URL)
 
     def _log(self, message, is_error=False):
-        """Centralized logging method."""
+        """Centralized logging method; the calling page-object method is recorded as the step."""
         log_method = self.logger.error if is_error else self.logger.info
-        log_method(f"{'ERROR' if is_error else 'INFO'} :: {self.browser_name} :: {message}")
\ No newline at end of file
+        log_method(f"{'ERROR' if is_error else 'INFO'} :: {self.browser_name} :: {message}",
+                   extra={"browser": self.browser_name, "step": sys._getframe(1).f_code.co_name})
+
+    def detect_page_state(self, ready_element_id, timeout=TIMEOUT, poll_interval=0.1):
+        """
+        Classifies the loaded document, returning as soon as any state other than LOADING matches.
+
+        :param ready_element_id: Id of an element that marks the expected page as loaded.
+        :param timeout: Seconds to keep polling while the page is still loading.
+        :returns: str: One of the PageState values; LOADING if nothing matched within the timeout.
+        """
+        deadline = monotonic() + timeout
+        while True:
+            state = self.driver.execute_script(
+                self.PAGE_STATE_SCRIPT, ready_element_id, self.INPUT_CAPTCHA_ID, self.TEXT_TRAFFIC_ERROR)
+            if state != PageState.LOADING or monotonic() >= deadline:
+                self._log(f"Page state detected: {state}.")
+                return state
+            sleep(poll_interval)
+
+    def navigate(self, action, ready_element_id, wait_for_unload=False):
+        """
+        Starts a navigation once the host rate limiter allows it and classifies the page it lands on.
+
+        :param action: Callable that starts the navigation, e.g. a driver.get or a click.
+        :param ready_element_id: Id of an element that marks the expected page as loaded.
+        :param wait_for_unload: Wait for the current document to go away first; needed for clicks,
+            which can return before the next page starts loading.
+        :returns: str: The PageState of the loaded page, see check_for_traffic_error.
+        """
+        self.rate_limiter.acquire()
+        document = self.driver.find_element(By.TAG_NAME, "html") if wait_for_unload else None
+        action()
+        if document is not None:
+            self.wait.until(EC.staleness_of(document))
+        return self.check_for_traffic_error(ready_element_id)
+
+    def check_for_traffic_error(self, ready_element_id):
+        """
+        Classifies the loaded page and reloads it while it shows the rush hour traffic error page.
+
+        Each reload waits for the backoff the rate limiter hands out, up to RATE_LIMIT_MAX_RETRIES times.
+
+        :returns: str: One of the PageState values; TRAFFIC_ERROR if the retries did not get past it.
+        """
+        for retry in range(RATE_LIMIT_MAX_RETRIES + 1):
+            state = self.detect_page_state(ready_element_id)
+            if state != PageState.TRAFFIC_ERROR:
+                self.rate_limiter.record_success()
+                return state
+
+            backoff = self.rate_limiter.record_traffic_error()
+            if retry == RATE_LIMIT_MAX_RETRIES:
+                break
+            self._log(f"Traffic error page shown, reloading in {backoff:.1f}s (retry {retry + 1}).", is_error=True)
+            sleep(backoff)
+            self.rate_limiter.acquire()
+            self.driver.refresh()
+
+        self._log(f"Traffic error page still shown after {RATE_LIMIT_MAX_RETRIES} retries.", is_error=True)
+        return state
+
+    def capture_search_response(self):
+        """Reads the search response the last navigation received while its page is open ("network" mode only)."""
+        capture = NetworkCapture.for_driver(self.driver)
+        if capture is not None:
+            capture.poll()
+
+    def wait_for_all(self, locators, timeout=TIMEOUT, require_displayed=False,
+                     poll_interval=0.05, max_poll_interval=1.0, poll_backoff=1.5):
+        """
+        Waits until every locator resolves, checking all of them with one browser-side call per poll.
+
+        The poll interval starts short, grows by poll_backoff up to max_poll_interval while nothing
+        changes and drops back whenever another element shows up.
+
+        :param locators: dict: Element description to a (By.ID / By.XPATH / By.CSS_SELECTOR, value) locator.
+        :param require_displayed: Wait for the elements to be displayed rather than just present.
+        :returns: dict: Element description to "displayed", "present" or "missing".
+        :raises: TimeoutException listing every missing element, immediately if a CAPTCHA or traffic
+            error page is shown.
+        """
+        deadline = monotonic() + timeout
+        interval = poll_interval
+        found = 0
+        wanted = ("displayed",) if require_displayed else ("displayed", "present")
+
+        while True:
+            result = self.driver.execute_script(
+                self.LOCATE_ALL_SCRIPT, dict(locators), self.INPUT_CAPTCHA_ID, self.TEXT_TRAFFIC_ERROR)
+            if "blockedBy" in result:
+                raise TimeoutException(f"Page shows the {result['blockedBy']} page instead of: {', '.join(locators)}")
+
+            report = result["report"]
+            missing = [name for name, state in report.items() if state not in wanted]
+            if not missing:
+                self._log(f"All elements located: {', '.join(locators)}.")
+                return report
+            if monotonic() >= deadline:
+                self._log(f"Elements not located within {timeout}s: {', '.join(missing)}.", is_error=True)
+                raise TimeoutException(f"Elements not located within {timeout}s: {', '.join(missing)}")
+
+            if len(report) - len(missing) > found:
+                found, interval = len(report) - len(missing), poll_interval
+            else:
+                interval = min(interval * poll_backoff, max_poll_interval)
+            sleep(min(interval, max(deadline - monotonic(), 0)))
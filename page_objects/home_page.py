@@ -1,6 +1,7 @@
 from time import sleep
 from random import randint
-from page_objects.base_page import BasePage
+from utilities.tracing import traced
+from page_objects.base_page import BasePage, PageState
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
@@ -11,30 +12,36 @@ class HomePage(BasePage):
     BUTTON_SEARCH_ID = "nav-search-submit-button"
     LOGO_ID = "nav-logo-sprites"
     DESKTOP_BANNER_ID = "desktop-banner"
-    INPUT_CAPTCHA_ID = 'captchacharacters'
 
-    def refresh_if_captcha(self):
-        """Check for CAPTCHA presence and refresh the page if detected."""
-        
+    @traced()
+    def refresh_if_captcha(self, state=None):
+        """
+        Refresh the page while the CAPTCHA interstitial is shown; a page without it is not refreshed.
+
+        :param state: The PageState already detected for the current page; detected here if omitted.
+        :returns: str: The PageState detected after the CAPTCHA is gone.
+        """
+        if state is None:
+            state = self.detect_page_state(self.LOGO_ID)
+        if state != PageState.CAPTCHA:
+            return state
         attempts = 3
         for attempt in range(attempts):
-            self._log(f"Attempt {attempt + 1} to check CAPTCHA.")
-            try:
-                self.wait.until(EC.presence_of_element_located((By.ID, self.INPUT_CAPTCHA_ID)))
-                self._log("CAPTCHA detected, refreshing the page.")
-                sleep(randint(2, 6))
-                self.driver.refresh()
-                self._log("Page refreshed successfully.")
-                # Re-check for CAPTCHA after refresh
-                self.wait.until(EC.presence_of_element_located((By.ID, self.INPUT_CAPTCHA_ID)))
-                self._log("CAPTCHA still present after refresh.")
-            except (TimeoutException, NoSuchElementException):
+            self._log(f"Attempt {attempt + 1}: CAPTCHA detected, refreshing the page.")
+            sleep(randint(2, 6))
+            self.rate_limiter.acquire()
+            self.driver.refresh()
+            self._log("Page refreshed successfully.")
+            state = self.detect_page_state(self.LOGO_ID)
+            if state != PageState.CAPTCHA:
                 self._log("No CAPTCHA element found on the page.")
-                return
+                return state
+            self._log("CAPTCHA still present after refresh.")
 
         self._log("Run failed due to CAPTCHA being present after maximum attempts.")
         assert False, "Run failed due to CAPTCHA being present."
 
+    @traced()
     def open_amazon_website(self, device='desktop'):
         """
         Opens the Amazon home page and verifies essential elements.
@@ -47,14 +54,20 @@ class HomePage(BasePage):
 
         try:
             self.driver.set_window_size(*SCREEN_SIZES[device])
-            self.driver.get(BASE_URL)
-
-            self.refresh_if_captcha()
-
-            logo_displayed = self.wait.until(EC.presence_of_element_located((By.ID, self.LOGO_ID))).is_displayed()
-            banner_displayed = self.wait.until(EC.presence_of_element_located((By.ID, self.DESKTOP_BANNER_ID))).is_displayed()
-
-            if logo_displayed and banner_displayed:
+            state = self.navigate(lambda: self.driver.get(BASE_URL), self.LOGO_ID)
+            state = self.refresh_if_captcha(state)
+            if state == PageState.TRAFFIC_ERROR:
+                self._log("Amazon returned the rush hour traffic error page.", is_error=True)
+                return False
+            if state == PageState.LOADING:
+                raise TimeoutException("Amazon home page did not finish loading.")
+
+            report = self.wait_for_all({
+                "logo": (By.ID, self.LOGO_ID),
+                "banner": (By.ID, self.DESKTOP_BANNER_ID)
+            })
+
+            if all(state == "displayed" for state in report.values()):
                 self._log("Amazon home page loaded successfully.")
                 return True
 
@@ -67,6 +80,7 @@ class HomePage(BasePage):
 
         return False
 
+    @traced()
     def search_product(self, search):
         """
         Searches for a product on Amazon.
@@ -82,7 +96,10 @@ class HomePage(BasePage):
             search_box.send_keys(search)
 
             search_button = self.wait.until(EC.element_to_be_clickable((By.ID, self.BUTTON_SEARCH_ID)))
-            search_button.click()
+            if self.navigate(search_button.click, self.LOGO_ID, wait_for_unload=True) == PageState.TRAFFIC_ERROR:
+                self._log("Amazon kept returning the rush hour traffic error page.", is_error=True)
+                return False
+            self.capture_search_response()
 
             self._log("Search executed successfully.")
             return True
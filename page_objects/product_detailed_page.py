@@ -1,6 +1,7 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from utilities.tracing import traced
 from page_objects.base_page import BasePage
 
 class TestProductDetailsPage(BasePage):
@@ -20,6 +21,7 @@ class TestProductDetailsPage(BasePage):
             self._log("Failed to switch to the new tab.", is_error=True)
             raise e
 
+    @traced()
     def click_first_product(self):
         """Clicks on the first product in the list."""
         self._log("Attempting to click the first product.")
@@ -42,6 +44,7 @@ class TestProductDetailsPage(BasePage):
             self._log(f"Error retrieving the first product name: {str(e)}", is_error=True)
             raise e
 
+    @traced()
     def verify_product_page_loaded(self, product_name):
         """Verify that the product page has loaded successfully."""
         self._log(f"Attempting to verify product page is loaded for {product_name}.")
@@ -53,6 +56,7 @@ class TestProductDetailsPage(BasePage):
             self._log(f"Error verifying product page load: {str(e)}", is_error=True)
             raise e
 
+    @traced()
     def verify_presence_of_element(self, element_id, description):
         """Generic method to verify the presence of an element."""
         self._log(f"Attempting to verify presence of {description}.")
@@ -64,6 +68,32 @@ class TestProductDetailsPage(BasePage):
             self._log(f"Error verifying presence of {description}: {str(e)}", is_error=True)
             raise e
 
+    @traced()
+    def verify_presence_of_elements(self, elements):
+        """
+        Verify the presence of several elements with a single composite wait.
+
+        :param elements: dict: Element description to element id.
+        :returns: dict: Element description to "displayed" or "present".
+        """
+        self._log(f"Attempting to verify presence of {', '.join(elements)}.")
+        try:
+            report = self.wait_for_all({description: (By.ID, element_id) for description, element_id in elements.items()})
+            self._log(f"{', '.join(elements)} are present.")
+            return report
+        except Exception as e:
+            self._log(f"Error verifying presence of product page elements: {str(e)}", is_error=True)
+            raise e
+
+    def verify_presence_of_product_sections(self):
+        """Verify the Add to Cart button, product overview, product details and image gallery in one wait."""
+        return self.verify_presence_of_elements({
+            "Add to Cart button": self.BUTTON_ADD_TO_CART_ID,
+            "Product overview section": self.TEXT_PRODUCT_OVERVIEW_ID,
+            "Product details section": self.TEXT_PRODUCT_FEATURES_ID,
+            "Image gallery": self.IMAGE_GALLERY_ID
+        })
+
     def verify_presence_of_add_to_cart(self):
         """Verify the presence of the 'Add to Cart' button."""
         self.verify_presence_of_element(self.BUTTON_ADD_TO_CART_ID, "Add to Cart button")
@@ -1,9 +1,15 @@
-import csv
-import os
+import hashlib
+import re
+import time
+from urllib.parse import parse_qsl, quote_plus, urlencode, urljoin, urlsplit, urlunsplit
+from lxml import html as lxml_html
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from page_objects.base_page import BasePage
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from utilities.network_capture import NetworkCapture
+from utilities.tracing import Tracer, traced
+from page_objects.base_page import BasePage, PageState
+from configs.configs import BASE_URL, EXTRACTION_MODE, CRAWL_PAGE_DEPTH, CRAWL_TAB_CONCURRENCY, SCREEN_SIZES
 
 class SearchResultPage(BasePage):
     INPUT_SEARCH_ID = "twotabsearchtextbox"
@@ -16,9 +22,412 @@ class SearchResultPage(BasePage):
     TEXT_PRODUCT_RATING_XPATH = '//i[@data-cy="reviews-ratings-slot"]/parent::a'
     TEXT_PRODUCT_URL_XPATH = '//div[@data-component-type="s-search-result"]//span[@data-component-type="s-product-image"]//a'
     LINK_NEXT_PAGE_XPATH = '//a[contains(@aria-label,"Go to next page")]'
+    # Product links carry the ASIN as /dp/<ASIN> or /gp/product/<ASIN>; used when a card has no data-asin
+    URL_ASIN_PATTERN = re.compile(r"/(?:dp|gp/product)/([A-Z0-9]{10})(?:[/?]|$)")
 
-    def extract_product_information(self):
-        """Extracts product information from Amazon search results."""
+    # Card-relative XPaths used by the batched extraction, evaluated against each search result card
+    CARD_TITLE_XPATH = './/h2//span'
+    CARD_PRICE_XPATH = './/span[@class="a-price-whole"]'
+    CARD_RATING_XPATH = './/i[@data-cy="reviews-ratings-slot"]/parent::a'
+    CARD_URL_XPATH = './/span[@data-component-type="s-product-image"]//a'
+
+    # Reads every card in the browser and returns one plain object per card plus whether a next
+    # page link exists, so the whole results page costs a single WebDriver round trip.
+    EXTRACT_PRODUCTS_SCRIPT = """
+        var xpaths = arguments[0];
+        function first(context, xpath) {
+            return document.evaluate(xpath, context, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        function text(node) {
+            return node ? (node.innerText || node.textContent || '').trim() : null;
+        }
+        var cards = document.evaluate(xpaths.card, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var rows = [];
+        for (var i = 0; i < cards.snapshotLength; i++) {
+            var card = cards.snapshotItem(i);
+            var rating = first(card, xpaths.rating);
+            var url = first(card, xpaths.url);
+            rows.push({
+                asin: card.getAttribute('data-asin'),
+                name: text(first(card, xpaths.title)),
+                price: text(first(card, xpaths.price)),
+                rating: rating ? rating.getAttribute('aria-label') : null,
+                url: url ? url.href : null
+            });
+        }
+        return {products: rows, hasNextPage: first(document, xpaths.next) !== null};
+    """
+
+    # Pages extracted through each path, and the time spent, across every page object of the process
+    extraction_stats = {"network": {"pages": 0, "seconds": 0.0}, "dom": {"pages": 0, "seconds": 0.0}, "fallbacks": 0}
+
+    def __init__(self, driver, logger, snapshot_cache=None):
+        super().__init__(driver, logger)
+        self.snapshot_cache = snapshot_cache
+
+    @traced()
+    def extract_product_information(self, mode=None):
+        """
+        Extracts product information from Amazon search results.
+
+        :param mode: "batched" reads every card in one execute_script call, "element" uses the
+            per-element WebDriver path and "network" parses the captured search response, falling back
+            to "batched". Defaults to EXTRACTION_MODE from the configs.
+        :returns: list: One dict per search result card with Name, Price, Rating and URL.
+        """
+        return self._extract_page(mode)[0]
+
+    def _extract_page(self, mode=None):
+        """
+        Extracts the current search result page.
+
+        :returns: tuple: (product dicts, whether the page links to a next page)
+        """
+        mode = mode or EXTRACTION_MODE
+        if mode == "network":
+            start = time.perf_counter()
+            with Tracer().span("SearchResultPage.extract_from_network"):
+                page = self._extract_from_network()
+            if page is not None:
+                self._record_extraction("network", start, len(page[0]))
+                return page
+            self._log("No search response captured for this page, falling back to the DOM.")
+            SearchResultPage.extraction_stats["fallbacks"] += 1
+            mode = "batched"
+
+        start = time.perf_counter()
+        with Tracer().span("SearchResultPage.extract_from_dom"):
+            page = self._extract_from_dom(mode)
+        self._record_extraction("dom", start, len(page[0]))
+        return page
+
+    def _extract_from_dom(self, mode):
+        if mode == "batched":
+            try:
+                return self._extract_product_information_batched()
+            except TimeoutException:
+                raise
+            except WebDriverException as e:
+                self._log(f"Batched extraction failed, falling back to per-element extraction: {e.msg}", is_error=True)
+        products_info = self._extract_product_information_per_element()
+        return products_info, bool(self.driver.find_elements(By.XPATH, self.LINK_NEXT_PAGE_XPATH))
+
+    def _extract_from_network(self):
+        """
+        Parses the current page from the search response the browser received, without touching the DOM.
+
+        :returns: tuple: (product dicts, whether the page links to a next page), or None when the
+            session does not capture responses or no response was captured for the current URL.
+        """
+        capture = NetworkCapture.for_driver(self.driver, mode="network")
+        if capture is None:
+            return None
+        capture.poll()
+        url = self.driver.current_url
+        page_source = capture.take(url)
+        if page_source is None:
+            return None
+        return self.parse_result_page(page_source, url)
+
+    def _record_extraction(self, path, start, product_count):
+        elapsed = time.perf_counter() - start
+        stats = SearchResultPage.extraction_stats[path]
+        stats["pages"] += 1
+        stats["seconds"] += elapsed
+        self._log(f"Extracted {product_count} products from the {path} in {elapsed * 1000:.0f} ms.")
+
+    def _extract_product_information_batched(self):
+        """Extracts every search result card and the next page link in a single browser-side script call."""
+        self._log("Starting batched extraction of product information.")
+
+        try:
+            self.wait.until(EC.presence_of_element_located((By.XPATH, self.SEARCH_RESULTS_XPATH)))
+            page = self.driver.execute_script(self.EXTRACT_PRODUCTS_SCRIPT, {
+                "card": self.SEARCH_RESULTS_XPATH,
+                "title": self.CARD_TITLE_XPATH,
+                "price": self.CARD_PRICE_XPATH,
+                "rating": self.CARD_RATING_XPATH,
+                "url": self.CARD_URL_XPATH,
+                "next": self.LINK_NEXT_PAGE_XPATH,
+            })
+        except TimeoutException as e:
+            self._log("Timeout while extracting product details", is_error=True)
+            raise e
+
+        products_info = [self.build_product_info(row) for row in page["products"]]
+        self._log(f"Finished batched extraction of {len(products_info)} products.")
+        return products_info, page["hasNextPage"]
+
+    @traced()
+    def load_cached_result_pages(self, search_term, device, max_pages=CRAWL_PAGE_DEPTH):
+        """
+        Serves a crawl of a search term from the snapshot cache without touching the network. The pages
+        may have been extracted by another browser; save_product_information labels them with this one.
+
+        :param search_term: The search term the pages were crawled for.
+        :param device: Device whose viewport the pages were crawled at (a SCREEN_SIZES key).
+        :returns: list: Product dicts of the cached pages, or None unless every page is cached and fresh.
+        """
+        if self.snapshot_cache is None:
+            return None
+        start = time.perf_counter()
+        products_info = []
+        seen_asins = set()
+        extracted_by = set()
+        pages = 0
+
+        for page in range(1, max_pages + 1):
+            snapshot = self.snapshot_cache.get(search_term, page, SCREEN_SIZES[device])
+            if snapshot is None:
+                return None
+            extracted_by.add(snapshot.get("browser") or "unknown")
+            products_info.extend(self.dedupe_by_asin(snapshot["products"], seen_asins))
+            pages += 1
+            if not snapshot["has_next"]:
+                break
+
+        elapsed = time.perf_counter() - start
+        self.crawl_stats = {
+            "pages": pages,
+            "last_page": pages,
+            "seconds": elapsed,
+            "pages_per_second": pages / elapsed if elapsed else 0.0,
+            "cached": True
+        }
+        self._log(f"Served {pages} result pages for {search_term} from the snapshot cache "
+                  f"(extracted by {', '.join(sorted(extracted_by))}).")
+        return products_info
+
+    @traced()
+    def crawl_result_pages(self, max_pages=CRAWL_PAGE_DEPTH, concurrency=CRAWL_TAB_CONCURRENCY,
+                           search_term=None, device=None):
+        """
+        Collects every page of iter_result_pages into one list.
+
+        :returns: list: Product dicts of all crawled pages, in page order.
+        """
+        products_info = []
+        for _, page_products in self.iter_result_pages(max_pages, concurrency, search_term, device):
+            products_info.extend(page_products)
+        return products_info
+
+    def iter_result_pages(self, max_pages=CRAWL_PAGE_DEPTH, concurrency=CRAWL_TAB_CONCURRENCY,
+                          search_term=None, device=None, checkpoint=None):
+        """
+        Yields (page number, product dicts) for the current search result page and the pages after
+        it, loading up to `concurrency` pages at once in separate tabs of the session.
+
+        Stops after max_pages, at the first page without a next page link, or at a page that repeats
+        an earlier one; products already seen on an earlier page are dropped. Only one page of
+        products is held at a time, so memory does not grow with the crawl depth. With a checkpoint,
+        every page the caller has consumed is recorded and a later crawl yields the recorded pages again
+        before it resumes after the last one; a checkpoint of a crawl that already reached max_pages or
+        the last result page is cleared instead.
+        With a snapshot cache, search_term and device, the crawled pages are stored in the cache.
+        The progress of the crawl is kept in self.crawl_stats.
+        """
+        state = checkpoint.load() if checkpoint else None
+        if checkpoint and (state is None or checkpoint.is_complete(state, max_pages)):
+            checkpoint.clear()
+            state = None
+        start = time.perf_counter()
+        origin_handle = self.driver.current_window_handle
+        first_page_url = state["first_page_url"] if state else self.driver.current_url
+        # Listings and pages repeated later in the crawl are dropped
+        seen_asins = set(state["seen_asins"]) if state else set()
+        seen_pages = set(state["seen_pages"]) if state else set()
+        self.crawl_stats = {"pages": 0, "last_page": state["page"] if state else 0, "seconds": 0.0,
+                            "pages_per_second": 0.0, "cached": False}
+        # A page's snapshot is stored once the next page is accepted, so the last one ends the cached crawl
+        pending_snapshot = None
+        handles = []
+
+        def accept_page(page, page_products):
+            nonlocal pending_snapshot
+            fingerprint = self._page_fingerprint(page_products)
+            if fingerprint in seen_pages:
+                self._log(f"Result page {page} repeats an earlier page, stopping.")
+                return None
+            seen_pages.add(fingerprint)
+            self._store_snapshot(search_term, device, pending_snapshot, has_next=True)
+            pending_snapshot = (page, page_products, self._snapshot_source())
+            self.crawl_stats["pages"] += 1
+            self.crawl_stats["last_page"] = page
+            elapsed = time.perf_counter() - start
+            self.crawl_stats["seconds"] = elapsed
+            self.crawl_stats["pages_per_second"] = self.crawl_stats["pages"] / elapsed if elapsed else 0.0
+            return self.dedupe_by_asin(page_products, seen_asins)
+
+        def page_consumed(page, products_info, has_next):
+            if checkpoint:
+                checkpoint.save(page, first_page_url, seen_asins, seen_pages, products_info, has_next)
+
+        if state:
+            self._log(f"Resuming the crawl after result page {state['page']}.")
+            # The pages crawled before only reached the earlier run's product table
+            yield from checkpoint.iter_pages(state)
+            has_next_page, next_page = True, state["page"] + 1
+        else:
+            self._log(f"Starting to crawl up to {max_pages} result pages, {concurrency} at a time.")
+            page_products, has_next_page = self._extract_page()
+            products_info = accept_page(1, page_products)
+            yield 1, products_info
+            page_consumed(1, products_info, has_next_page)
+            next_page = 2
+
+        try:
+            while has_next_page and next_page <= max_pages:
+                batch = range(next_page, min(next_page + concurrency, max_pages + 1))
+                handles = self._open_pages_in_tabs(first_page_url, batch)
+                self._log(f"Loading result pages {batch.start}-{batch.stop - 1} in parallel tabs.")
+
+                for page, handle in zip(batch, handles):
+                    self.driver.switch_to.window(handle)
+                    self.wait.until(lambda driver: driver.execute_script(
+                        "return location.href !== 'about:blank' && document.readyState !== 'loading';"))
+                    if self.check_for_traffic_error(self.LOGO_ID) == PageState.TRAFFIC_ERROR:
+                        raise TimeoutException(f"Result page {page} kept showing the traffic error page.")
+                    page_products, has_next_page = self._extract_page()
+
+                    products_info = accept_page(page, page_products)
+                    if products_info is None:
+                        has_next_page = False
+                        break
+                    yield page, products_info
+                    page_consumed(page, products_info, has_next_page)
+                    if not has_next_page:
+                        break
+
+                self._close_tabs(handles, origin_handle)
+                handles = []
+                next_page = batch.stop
+        finally:
+            if handles:
+                self._close_tabs(handles, origin_handle)
+            self.driver.switch_to.window(origin_handle)
+
+        self._store_snapshot(search_term, device, pending_snapshot, has_next=False)
+        if checkpoint:
+            checkpoint.clear()
+        self._log(f"Crawled {self.crawl_stats['pages']} result pages at "
+                  f"{self.crawl_stats['pages_per_second']:.2f} pages/s.")
+
+    def _store_snapshot(self, search_term, device, snapshot, has_next):
+        if snapshot is None or self.snapshot_cache is None or not (search_term and device):
+            return
+        page, page_products, page_source = snapshot
+        self.snapshot_cache.put(search_term, page, SCREEN_SIZES[device], self.browser_name, page_products, has_next,
+                                page_source)
+
+    def _snapshot_source(self):
+        """Returns the page source for the snapshot cache, when it keeps HTML."""
+        if self.snapshot_cache is not None and self.snapshot_cache.store_html:
+            return self.driver.page_source
+        return None
+
+    def _open_pages_in_tabs(self, first_page_url, pages):
+        """Starts loading every page in its own tab without waiting for the loads to finish."""
+        handles = []
+        for page in pages:
+            self.rate_limiter.acquire()
+            self.driver.switch_to.new_window('tab')
+            self.driver.execute_script("window.location.href = arguments[0];", self.build_page_url(first_page_url, page))
+            handles.append(self.driver.current_window_handle)
+        return handles
+
+    def _close_tabs(self, handles, origin_handle):
+        for handle in handles:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(origin_handle)
+
+    @staticmethod
+    def _page_fingerprint(products_info):
+        """Short digest of a page's result set, cheap to keep for every page of a deep crawl."""
+        content = "\n".join(f"{product['Name']}\t{product['URL']}" for product in products_info)
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=12).hexdigest()
+
+    @staticmethod
+    def parse_result_page(page_source, base_url=BASE_URL):
+        """
+        Parses search result cards out of a page's HTML with the card XPaths.
+
+        :param page_source: HTML of a search result page.
+        :param base_url: URL relative product links are resolved against.
+        :returns: tuple: (product dicts in the extract_product_information schema, whether the page
+            links to a next page)
+        """
+        document = lxml_html.fromstring(page_source)
+        products_info = []
+
+        for card in document.xpath(SearchResultPage.SEARCH_RESULTS_XPATH):
+            titles = card.xpath(SearchResultPage.CARD_TITLE_XPATH)
+            prices = card.xpath(SearchResultPage.CARD_PRICE_XPATH)
+            ratings = card.xpath(SearchResultPage.CARD_RATING_XPATH)
+            urls = card.xpath(SearchResultPage.CARD_URL_XPATH)
+            products_info.append(SearchResultPage.build_product_info({
+                "asin": card.get("data-asin"),
+                "name": titles[0].text_content().strip() if titles else None,
+                "price": prices[0].text_content().strip() if prices else None,
+                "rating": ratings[0].get("aria-label") if ratings else None,
+                "url": urljoin(base_url, urls[0].get("href")) if urls else None,
+            }))
+        return products_info, bool(document.xpath(SearchResultPage.LINK_NEXT_PAGE_XPATH))
+
+    @staticmethod
+    def build_search_url(base_url, search_term, page=1):
+        """Builds the URL of a search result page without going through the search box."""
+        url = f"{base_url.rstrip('/')}/s?k={quote_plus(search_term)}"
+        return url if page == 1 else f"{url}&page={page}"
+
+    @staticmethod
+    def build_page_url(search_url, page):
+        """Returns the search result URL with its page parameter set to the given page."""
+        url = urlsplit(search_url)
+        query = [(key, value) for key, value in parse_qsl(url.query, keep_blank_values=True) if key != "page"]
+        if page != 1:
+            query.append(("page", str(page)))
+        return urlunsplit(url._replace(query=urlencode(query)))
+
+    @staticmethod
+    def build_product_info(row):
+        """Converts one raw card row (asin, name, price, rating, url) into the product dict schema."""
+        url = row.get("url") or "N/A"
+        return {
+            "ASIN": row.get("asin") or SearchResultPage.asin_from_url(url),
+            "Name": row.get("name") or "N/A",
+            "Price": f"Rs. {row['price']}" if row.get("price") else "N/A",
+            "Rating": row["rating"].split()[0] if row.get("rating") else "N/A",
+            "URL": url
+        }
+
+    @staticmethod
+    def asin_from_url(url):
+        """Parses the ASIN out of a product URL, or returns "N/A"."""
+        match = SearchResultPage.URL_ASIN_PATTERN.search(url or "")
+        return match.group(1) if match else "N/A"
+
+    @staticmethod
+    def dedupe_by_asin(products_info, seen_asins=None):
+        """
+        Drops products whose ASIN was already seen, e.g. a listing repeated on the next result page.
+
+        :param seen_asins: Set of ASINs seen so far; updated in place, so it can span several pages.
+        :returns: list: The products with a new or unknown ASIN, in their original order.
+        """
+        seen_asins = set() if seen_asins is None else seen_asins
+        unique = []
+        for product in products_info:
+            asin = product.get("ASIN", "N/A")
+            if asin != "N/A":
+                if asin in seen_asins:
+                    continue
+                seen_asins.add(asin)
+            unique.append(product)
+        return unique
+
+    def _extract_product_information_per_element(self):
+        """Extracts product information with one WebDriver call per element (fallback path)."""
         self._log("Starting to extract product information.")
         products_info = []
 
@@ -32,11 +441,13 @@ class SearchResultPage(BasePage):
             self._log("Found product details in the search results.")
 
             for i in range(len(products)):
+                url = urls[i].get_attribute("href") if i < len(urls) else "N/A"
                 product_info = {
+                    "ASIN": products[i].get_attribute("data-asin") or self.asin_from_url(url),
                     "Name": names[i].text.strip(),
                     "Price": f"Rs. {prices[i].text.strip()}" if i < len(prices) else "N/A",
                     "Rating": ratings[i].get_attribute("aria-label").split()[0] if i < len(ratings) else "N/A",
-                    "URL": urls[i].get_attribute("href") if i < len(urls) else "N/A"
+                    "URL": url
                 }
                 products_info.append(product_info)
 
@@ -50,45 +461,27 @@ class SearchResultPage(BasePage):
         self._log("Finished extracting product information.")
         return products_info
     
-    def get_csv_file_path(self):
-        """Constructs and returns the file path for the CSV file."""
-        return os.path.join(os.path.dirname(os.path.abspath(__file__).replace('page_objects'+ os.sep, '')),'test_data', 'product_info.csv')
-
-    def write_product_info_to_csv(self, file_path, product_name, device, product_info):
-        """Writes the product information to the CSV file."""
+    @traced()
+    def save_product_information(self, sink, search_term, device, product_info):
+        """Hands the extracted product information to the session's product sink."""
+        self._log(f"Saving product information for {search_term}.")
         try:
-            file_exists = os.path.isfile(file_path)
-
-            with open(file_path, 'a', newline='', encoding='utf-8') as csvfile:
-                csvfile.write(f'Product Name: {product_name}\n')
-                csvfile.write(f'Browser Name: {self.browser_name}\n')
-                csvfile.write(f'Device Name: {device}\n')
-                fieldnames = ['Name', 'Price', 'Rating', 'URL']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-                if not file_exists:
-                    writer.writeheader()
-
-                for product in product_info:
-                    writer.writerow(product)
-
-            self._log(f"Product information for {product_name} saved successfully.")
+            sink.add(search_term, self.browser_name, device, product_info)
+            self._log(f"Product information for {search_term} saved successfully.")
         except Exception as e:
             self._log("Error saving product information", is_error=True)
             raise e
 
-    def save_product_information_to_csv(self, product_name, device, product_info):
-        """Saves extracted product information to a CSV file."""
-        self._log(f"Saving product information for {product_name}.")
-        file_path = self.get_csv_file_path()
-        self.write_product_info_to_csv(file_path, product_name, device, product_info)
-
+    @traced()
     def click_next_page(self):
         """Clicks the "Next Page" button to navigate search results."""
         self._log("Attempting to click the Next Page link.")
 
         try:
-            self.wait.until(EC.element_to_be_clickable((By.XPATH, self.LINK_NEXT_PAGE_XPATH))).click()
+            next_link = self.wait.until(EC.element_to_be_clickable((By.XPATH, self.LINK_NEXT_PAGE_XPATH)))
+            if self.navigate(next_link.click, self.LOGO_ID, wait_for_unload=True) == PageState.TRAFFIC_ERROR:
+                raise TimeoutException("Next result page kept showing the traffic error page.")
+            self.capture_search_response()
             self._log("Successfully clicked the Next Page link.")
         except (TimeoutException, NoSuchElementException) as e:
             self._log("Next Page link not found or not clickable. Possibly the last page.", is_error=True)
@@ -105,11 +498,14 @@ class SearchResultPage(BasePage):
             self._log("Failed to switch to the new tab.", is_error=True)
             raise e
 
+    @traced()
     def click_first_product(self):
         """Clicks on the first product in the list."""
         self._log("Attempting to click the first product.")
         try:
-            self.wait.until(EC.element_to_be_clickable((By.XPATH, self.TEXT_PRODUCT_URL_XPATH))).click()
+            product_link = self.wait.until(EC.element_to_be_clickable((By.XPATH, self.TEXT_PRODUCT_URL_XPATH)))
+            self.rate_limiter.acquire()
+            product_link.click()
             self._log("First product link clicked successfully.")
             self.switch_to_new_tab()
         except (TimeoutException, NoSuchElementException) as e:
@@ -1,30 +1,198 @@
 import pytest
+import os
+import uuid
 from datetime import datetime
 from pathlib import Path
-from utilities.utilities import SingletonLogger, BrowserFactory, DateFactory, ScreenshotManager
+from configs.configs import (
+    BASE_URL, USE_STAND_IN, DURATION_SCHEDULING, SNAPSHOT_CACHE_ENABLED, PRODUCT_DIFF_PATH, PRODUCT_SUMMARY_PATH,
+    ANALYTICS_MIN_OVERLAP, ANALYTICS_CHECK, IMPORT_PROFILE, REPORT_RETENTION
+)
+from utilities.stand_in_server import StandInServer
+from utilities.duration_scheduler import DurationScheduler
+from utilities.product_sink import ProductSink, get_shard_dir
+from utilities.product_index import ProductIndex
+from page_objects.search_result_page import SearchResultPage
+from utilities.rate_limiter import HostRateLimiter
+from utilities.import_profile import ImportProfiler, format_profile
+from utilities.report_artifacts import ReportArtifacts
+from utilities.screenshot_pipeline import ScreenshotPipeline
+from utilities.snapshot_cache import SnapshotCache
+from utilities.tracing import Tracer, summarize_steps
+from utilities.utilities import (
+    SingletonLogger, DateFactory, DriverPool, DriverBinaryResolver, get_worker_id
+)
+
+# Statistics published by session fixtures, merged across xdist workers on the controller
+SESSION_STATS = {}
+
+def publish_session_stats(config, name, stats):
+    """Hands fixture statistics to the xdist controller, or records them directly without xdist."""
+    if hasattr(config, "workeroutput"):
+        config.workeroutput.setdefault("session_stats", {})[name] = {get_worker_id(): dict(stats)}
+    else:
+        SESSION_STATS.setdefault(name, {})[get_worker_id()] = dict(stats)
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    for name, per_worker in getattr(node, "workeroutput", {}).get("session_stats", {}).items():
+        SESSION_STATS.setdefault(name, {}).update(per_worker)
+
+def pytest_terminal_summary(terminalreporter):
+    pool_stats = SESSION_STATS.get("driver_pool")
+    if pool_stats:
+        terminalreporter.section("Driver pool")
+        for worker, stats in sorted(pool_stats.items()):
+            leases = stats["hits"] + stats["misses"]
+            hit_ratio = stats["hits"] / leases if leases else 0.0
+            terminalreporter.write_line(
+                f"{worker}: hits={stats['hits']} misses={stats['misses']} recycled={stats['recycled']} "
+                f"reset_failures={stats['reset_failures']} hit_ratio={hit_ratio:.0%}")
+
+    resolver_stats = SESSION_STATS.get("driver_resolver")
+    if resolver_stats:
+        terminalreporter.section("Driver binaries")
+        for worker, stats in sorted(resolver_stats.items()):
+            terminalreporter.write_line(
+                f"{worker}: manifest_hits={stats['hits']} resolved={stats['misses']} "
+                f"startup_saved={stats['seconds_saved']:.1f}s")
+
+    limiter_stats = SESSION_STATS.get("rate_limiter")
+    if limiter_stats:
+        terminalreporter.section("Rate limiter")
+        for worker, stats in sorted(limiter_stats.items()):
+            terminalreporter.write_line(
+                f"{worker}: navigations={stats['navigations']} waited={stats['waited']:.1f}s "
+                f"traffic_errors={stats['traffic_errors']} circuit_opened={stats['circuit_opened']}")
+
+    extraction_stats = SESSION_STATS.get("extraction")
+    if extraction_stats:
+        terminalreporter.section("Extraction paths")
+        for worker, stats in sorted(extraction_stats.items()):
+            paths = []
+            for path in ("network", "dom"):
+                pages = stats[path]["pages"]
+                average = stats[path]["seconds"] * 1000 / pages if pages else 0.0
+                paths.append(f"{path}={pages} pages ({average:.0f} ms/page)")
+            terminalreporter.write_line(f"{worker}: {' '.join(paths)} fallbacks={stats['fallbacks']}")
+
+    screenshot_stats = SESSION_STATS.get("screenshots")
+    if screenshot_stats:
+        terminalreporter.section("Screenshots")
+        for worker, stats in sorted(screenshot_stats.items()):
+            terminalreporter.write_line(
+                f"{worker}: captured={stats['captured']} written={stats['written']} "
+                f"deduplicated={stats['deduplicated']} write_errors={stats['write_errors']}")
+
+    diff = getattr(terminalreporter.config, "product_diff", None)
+    if diff:
+        terminalreporter.section("Product index")
+        terminalreporter.write_line(
+            f"new={len(diff['new'])} removed={len(diff['removed'])} price_changed={len(diff['price_changed'])} "
+            f"updated={diff['updated']} unchanged={diff['unchanged']} without_asin={diff['without_asin']} "
+            f"(diff: {PRODUCT_DIFF_PATH})")
+
+    consistency = getattr(terminalreporter.config, "product_consistency", None)
+    if consistency is not None and not consistency.empty:
+        terminalreporter.section("Cross-browser consistency")
+        for row in consistency.itertuples():
+            terminalreporter.write_line(
+                f"{row.term}/{row.device}: {row.shared}/{row.asins} ASINs found by all {row.browsers} browsers "
+                f"({row.overlap:.0%})", red=row.overlap < ANALYTICS_MIN_OVERLAP)
+        inconsistent = getattr(terminalreporter.config, "product_inconsistent", 0)
+        if inconsistent:
+            terminalreporter.write_line(
+                f"FAILED: {inconsistent} term/device result sets overlap less than {ANALYTICS_MIN_OVERLAP:.0%} "
+                f"across browsers (ANALYTICS_CHECK=0 only reports them)", red=True, bold=True)
+
+    analytics_error = getattr(terminalreporter.config, "product_analytics_error", None)
+    if analytics_error:
+        terminalreporter.section("Product analytics")
+        terminalreporter.write_line(f"Product analytics failed: {analytics_error}", red=True)
+
+    cache_stats = SESSION_STATS.get("snapshot_cache")
+    if cache_stats:
+        terminalreporter.section("Snapshot cache")
+        terminalreporter.write_line(snapshot_cache_summary(cache_stats))
+
+    profiles = import_profiles(terminalreporter.config)
+    if profiles:
+        terminalreporter.section("Import time")
+        for label, profile in profiles.items():
+            terminalreporter.write_line(f"{label}: {format_profile(profile)}")
+
+def import_profiles(config):
+    """The import-time profile started in pytest_configure, once its background run has finished."""
+    import_profiler = getattr(config, "import_profiler", None)
+    return import_profiler.results(timeout=60) if import_profiler else {}
+
+def snapshot_cache_summary(cache_stats):
+    """One line of snapshot cache counters summed over every worker."""
+    totals = {}
+    for stats in cache_stats.values():
+        for counter, value in stats.items():
+            totals[counter] = totals.get(counter, 0) + value
+    lookups = totals["hits"] + totals["misses"]
+    hit_ratio = totals["hits"] / lookups if lookups else 0.0
+    return (f"hits={totals['hits']} misses={totals['misses']} expired={totals['expired']} "
+            f"stored={totals['stored']} evicted={totals['evicted']} hit_ratio={hit_ratio:.0%}")
 
 # --------------------------
 # Pytest Hooks & Fixtures
 # --------------------------
+@pytest.fixture(scope="session")
+def driver_pool(request):
+    """Per-worker pool of warm browser sessions shared by every test class."""
+    pool = DriverPool()
+    yield pool
+    pool.close()
+    publish_session_stats(request.config, "driver_pool", pool.stats)
+    publish_session_stats(request.config, "driver_resolver", DriverBinaryResolver.stats)
+    publish_session_stats(request.config, "rate_limiter", HostRateLimiter.for_url(BASE_URL).stats)
+    publish_session_stats(request.config, "extraction", SearchResultPage.extraction_stats)
+
+@pytest.fixture(scope="session")
+def product_sink(request):
+    """Per-worker product sink; the controller merges every worker's shard at session end."""
+    config = request.config
+    run_id = config.workerinput["product_run_id"] if hasattr(config, "workerinput") else config.product_run_id
+    sink = ProductSink(get_shard_dir(run_id), get_worker_id())
+    yield sink
+    sink.close()
+
+@pytest.fixture(scope="session")
+def snapshot_cache(request):
+    """Search result snapshot cache shared by all workers and runs, or None unless SNAPSHOT_CACHE=1."""
+    if not SNAPSHOT_CACHE_ENABLED:
+        yield None
+        return
+    cache = SnapshotCache()
+    yield cache
+    publish_session_stats(request.config, "snapshot_cache", cache.stats)
+
+@pytest.fixture(autouse=True)
+def log_context(request):
+    """Tags every log record of the test with its browser, device and search term."""
+    params = getattr(request.node, "callspec", None)
+    params = params.params if params else {}
+    singleton_logger = SingletonLogger()
+    singleton_logger.bind(browser=params.get("setup"), device=params.get("device"), search_term=params.get("search_term"))
+    yield
+    singleton_logger.bind(browser=None, device=None, search_term=None)
+
 @pytest.fixture(scope="class", params=["edge", "chrome", "firefox"])
-def setup(request):
+def setup(request, driver_pool):
     browser_name = request.param
-    browser = BrowserFactory.get_browser(browser_name)
-    
-    if not browser:
-        raise ValueError(f"Unsupported browser: {browser_name}")
-    
-    driver = browser.create_driver()
+    driver = driver_pool.acquire(browser_name)
     logger = SingletonLogger().get_logger()
-    logger.info(f"Launching {browser_name.capitalize()} Browser")
+    logger.info(f"Leasing {browser_name.capitalize()} Browser")
     
     request.cls.driver = driver
     request.cls.logger = logger
 
     yield driver, logger
 
-    driver.quit()
-    logger.info(f"Closing {browser_name.capitalize()} Browser")
+    driver_pool.release(driver)
+    logger.info(f"Releasing {browser_name.capitalize()} Browser")
 
 # Rest of your hooks (pytest_runtest_makereport, etc.)
 @pytest.hookimpl(hookwrapper=True)
@@ -37,22 +205,143 @@ def pytest_runtest_makereport(item, call):
     
     if report.when in ['call', 'setup']:
         driver = getattr(item.instance, 'driver', None)
-        if driver:
-            screenshot_manager = ScreenshotManager(driver)
-            file_name = screenshot_manager.take_screenshot("screenshot")
-            if file_name:
-                html = f'<div><img src="{file_name}" alt="screenshot" style="width:304px;height:228px;" ' \
-                       'onclick="window.open(this.src)" align="right"/></div>'
-                extra.append(pytest_html.extras.html(html))
+        if driver and get_screenshot_pipeline(item.config).should_capture(report):
+            with Tracer().span("ScreenshotPipeline.capture"):
+                file_names = get_screenshot_pipeline(item.config).capture(driver)
+            html = f'<div><img src="{file_names["thumbnail"]}" alt="screenshot" loading="lazy" ' \
+                   f'style="width:304px;height:228px;" onclick="window.open(\'{file_names["full"]}\')" align="right"/></div>'
+            extra.append(pytest_html.extras.html(html))
         report.extras = extra
 
+def get_screenshot_pipeline(config):
+    """Returns the process's screenshot pipeline, starting its writer thread on first use."""
+    if getattr(config, "screenshot_pipeline", None) is None:
+        config.screenshot_pipeline = ScreenshotPipeline()
+    return config.screenshot_pipeline
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    node.workerinput["product_run_id"] = node.config.product_run_id
+
+def pytest_sessionfinish(session):
+    config = session.config
+    screenshot_pipeline = getattr(config, "screenshot_pipeline", None)
+    if screenshot_pipeline:
+        screenshot_pipeline.close()
+        publish_session_stats(config, "screenshots", screenshot_pipeline.stats)
+
+    tracer = Tracer()
+    if tracer.enabled and tracer.spans:
+        report_dir = os.path.join('Reports', DateFactory.get_current_date("%Y_%m_%d"))
+        tracer.export_chrome_trace(os.path.join(report_dir, f"trace_{get_worker_id()}.json"))
+        publish_session_stats(config, "trace_steps", tracer.durations_by_step())
+
+    shard_dir = get_shard_dir(getattr(config, "product_run_id", ""))
+    if not hasattr(config, "workerinput") and os.path.isdir(shard_dir):
+        try:
+            index = ProductIndex()
+            try:
+                diff = index.apply_run(ProductSink.iter_shard_rows(shard_dir), config.product_run_id)
+            finally:
+                index.close()
+            ProductIndex.write_diff(diff, PRODUCT_DIFF_PATH)
+            config.product_diff = diff
+        finally:
+            # The run's products are merged and its shards removed even if indexing them failed
+            outputs = ProductSink.merge(shard_dir)
+            SingletonLogger().get_logger().info(f"Merged {outputs['rows']} product rows into {outputs}")
+        analyse_products(session, outputs)
+
+def analyse_products(session, outputs):
+    """
+    Writes the per-group product aggregates and keeps the cross-browser consistency report.
+
+    With ANALYTICS_CHECK, result sets that overlap less than ANALYTICS_MIN_OVERLAP across browsers fail
+    the session. A failure of the analytics itself is shown in the terminal summary.
+    """
+    config = session.config
+    table_path = outputs.get("parquet") or outputs.get("csv")
+    if not table_path:
+        return
+    # pandas is only needed here, on the controller, so xdist workers do not pay for importing it
+    from utilities.product_analytics import load_products, aggregate, cross_browser_consistency, inconsistent_groups
+    try:
+        frame = load_products(table_path)
+        aggregate(frame).to_csv(PRODUCT_SUMMARY_PATH, index=False)
+        config.product_consistency = cross_browser_consistency(frame)
+    except Exception as e:
+        config.product_analytics_error = repr(e)
+        SingletonLogger().get_logger().error(f"Product analytics failed: {e!r}")
+        return
+
+    if ANALYTICS_CHECK:
+        config.product_inconsistent = len(inconsistent_groups(config.product_consistency))
+        if config.product_inconsistent and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
 @pytest.hookimpl(tryfirst=True)
 def pytest_configure(config):
+    if not hasattr(config, "workerinput"):
+        config.product_run_id = uuid.uuid4().hex
+        if IMPORT_PROFILE:
+            config.import_profiler = ImportProfiler().start()
+    # The stand-in runs in the controller process so every xdist worker shares it
+    if USE_STAND_IN and not hasattr(config, "workerinput"):
+        try:
+            config.stand_in_server = StandInServer().start()
+        except OSError:
+            # Already served by a stand-alone `python -m utilities.stand_in_server`
+            config.stand_in_server = None
+    if DURATION_SCHEDULING:
+        # Plain -n runs are balanced by recorded durations instead of handing out tests blindly
+        if getattr(config.option, "dist", "no") == "load":
+            config.option.dist = "loadgroup"
+        config.pluginmanager.register(DurationScheduler(config), "duration_scheduler")
+
+    report_artifacts = ReportArtifacts()
+    if REPORT_RETENTION and not hasattr(config, "workerinput"):
+        for path in report_artifacts.enforce_retention():
+            SingletonLogger().get_logger().info(f"Report retention removed {path}")
+
     now = datetime.now()
-    report_dir = Path('Reports', DateFactory.get_current_date("%Y_%m_%d"))
+    report_dir = Path(report_artifacts.day_dir())
     report_dir.mkdir(parents=True, exist_ok=True)
     config.option.htmlpath = report_dir / f"report_{now.strftime('%H%M%S')}.html"
     config.option.self_contained_html = True
 
+def pytest_unconfigure(config):
+    stand_in_server = getattr(config, "stand_in_server", None)
+    if stand_in_server:
+        stand_in_server.stop()
+
 def pytest_html_report_title(report):
-    report.title = "Automation Report"
\ No newline at end of file
+    report.title = "Automation Report"
+
+def pytest_html_results_summary(prefix, summary, postfix, session):
+    """Adds the snapshot cache hit ratio, the import-time profile and the per-step p50/p95 table of traced actions."""
+    cache_stats = SESSION_STATS.get("snapshot_cache")
+    if cache_stats:
+        prefix.append(f"<p>Snapshot cache: {snapshot_cache_summary(cache_stats)}</p>")
+
+    profiles = import_profiles(session.config)
+    if profiles:
+        rows = "".join(
+            f"<tr><td>{label}</td><td>{format_profile(profile)}</td></tr>" for label, profile in profiles.items()
+        )
+        prefix.append(f"<h2>Import time</h2><table><tr><th>Import</th><th>Profile</th></tr>{rows}</table>")
+
+    durations_by_step = {}
+    for worker_steps in SESSION_STATS.get("trace_steps", {}).values():
+        for step, durations in worker_steps.items():
+            durations_by_step.setdefault(step, []).extend(durations)
+    if not durations_by_step:
+        return
+
+    rows = "".join(
+        f"<tr><td>{step}</td><td>{count}</td><td>{p50:.0f}</td><td>{p95:.0f}</td><td>{total / 1000:.1f}</td></tr>"
+        for step, count, p50, p95, total in summarize_steps(durations_by_step)
+    )
+    prefix.append(
+        "<h2>Step timings</h2><table><tr><th>Step</th><th>Calls</th><th>p50 (ms)</th>"
+        f"<th>p95 (ms)</th><th>Total (s)</th></tr>{rows}</table>"
+    )
@@ -0,0 +1,65 @@
+import logging
+import pytest
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from page_objects.base_page import BasePage
+
+LOCATORS = {"logo": (By.ID, "nav-logo-sprites"), "search box": (By.ID, "twotabsearchtextbox")}
+
+class FakeLocateDriver:
+    """Answers LOCATE_ALL_SCRIPT with the queued results, repeating the last one."""
+    def __init__(self, *results):
+        self.capabilities = {"browserName": "chrome"}
+        self.results = list(results)
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append(args)
+        return self.results.pop(0) if len(self.results) > 1 else self.results[0]
+
+def make_page(driver):
+    return BasePage(driver, logging.getLogger("test_base_page"))
+
+class TestWaitForAll:
+
+    def test_report_is_returned_once_every_element_is_located(self):
+        """
+        Test that the wait polls every locator in one call until all of them are present and returns the report.
+        """
+        driver = FakeLocateDriver(
+            {"report": {"logo": "displayed", "search box": "missing"}},
+            {"report": {"logo": "displayed", "search box": "present"}})
+
+        report = make_page(driver).wait_for_all(LOCATORS, timeout=5, poll_interval=0.01)
+
+        assert report == {"logo": "displayed", "search box": "present"}
+        assert len(driver.calls) == 2
+        assert driver.calls[0][0] == {"logo": ("id", "nav-logo-sprites"), "search box": ("id", "twotabsearchtextbox")}
+
+    def test_timeout_lists_the_missing_elements(self):
+        """
+        Test that the timeout names only the elements that never showed up, and that a present but hidden
+        element counts as missing when displayed elements are required.
+        """
+        driver = FakeLocateDriver({"report": {"logo": "displayed", "search box": "present"}})
+
+        with pytest.raises(TimeoutException) as error:
+            make_page(driver).wait_for_all(LOCATORS, timeout=0.05, require_displayed=True, poll_interval=0.01)
+
+        assert "Elements not located within 0.05s: search box" in error.value.msg
+        assert "logo" not in error.value.msg
+
+    @pytest.mark.parametrize("blocked_by", ["captcha", "traffic_error"])
+    def test_blocked_page_fails_without_waiting(self, blocked_by):
+        """
+        Test that a CAPTCHA or traffic error page ends the wait on the first poll instead of at the timeout.
+
+        :param blocked_by: The error page the browser-side check reports.
+        """
+        driver = FakeLocateDriver({"blockedBy": blocked_by})
+
+        with pytest.raises(TimeoutException) as error:
+            make_page(driver).wait_for_all(LOCATORS, timeout=30)
+
+        assert len(driver.calls) == 1
+        assert error.value.msg == f"Page shows the {blocked_by} page instead of: logo, search box"
@@ -1,62 +1,73 @@
 import pytest
-import os
 from page_objects.home_page import HomePage
 from page_objects.search_result_page import SearchResultPage
-from configs.configs import SEARCH_ITEMS, SCREEN_SIZES
+from utilities.http_crawler import HttpCrawlEngine
+from utilities.crawl_checkpoint import CrawlCheckpoint
+from configs.configs import SEARCH_ITEMS, SCREEN_SIZES, USE_STAND_IN
 
 @pytest.mark.usefixtures("setup")
 class TestBasicCrawling:
 
-    @classmethod
-    @pytest.fixture(scope="session", autouse=True)
-    def remove_csv_file_once(cls):
-        """
-        Removes the existing CSV file before running tests, ensuring this runs only once.
-        """
-        dir_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test_data')
-        file_path = os.path.join(dir_path, 'product_info.csv')
-
-        # Remove the existing CSV file
-        if os.path.exists(file_path):
-            os.remove(file_path)
-
-        # Create the directory if it doesn't exist
-        if not os.path.exists(dir_path):
-            os.makedirs(dir_path)
-
     @pytest.fixture(autouse=True)
-    def setup_pages(self):
+    def setup_pages(self, snapshot_cache):
         """
         Set up page objects for the test.
         This fixture runs automatically before each test.
         """
         self.home_page = HomePage(self.driver, self.logger)
-        self.search_result_page = SearchResultPage(self.driver, self.logger)
+        self.search_result_page = SearchResultPage(self.driver, self.logger, snapshot_cache)
 
     @pytest.mark.parametrize("device", SCREEN_SIZES)
     @pytest.mark.parametrize("search_term", SEARCH_ITEMS)
-    def test_amazon_product_search_and_product_details(self, search_term, device):
+    def test_amazon_product_search_and_product_details(self, search_term, device, product_sink):
         """
         Test to search for a product and verify its details on Amazon.
 
         :param search_term: The search term to look for products.
         :param device: The device type (e.g., desktop, tablet, mobile).
+        :param product_sink: The session's product sink.
         """
-        # Open Amazon homepage
-        assert self.home_page.open_amazon_website(device), "Failed to open Amazon homepage"
+        # A fresh snapshot of the same search at this viewport skips the browser steps
+        products_info = self.search_result_page.load_cached_result_pages(search_term, device)
+        if products_info is not None:
+            assert products_info, f"No products found for search term {search_term}"
+            self.search_result_page.save_product_information(product_sink, search_term, device, products_info)
+        else:
+            # Open Amazon homepage
+            assert self.home_page.open_amazon_website(device), "Failed to open Amazon homepage"
 
-        # Step 1: Search for the product based on the given search term
-        self.home_page.search_product(search_term)
-        assert search_term in self.driver.current_url, f"Failed to search for the product {search_term}"
+            # Step 1: Search for the product based on the given search term
+            self.home_page.search_product(search_term)
+            assert search_term in self.driver.current_url, f"Failed to search for the product {search_term}"
 
-        # Step 2: Extract product information from the search results
-        products_info = self.search_result_page.extract_product_information()
-        assert products_info, f"No products found for search term {search_term}"
+            # Step 2: Stream the result pages into the product sink page by page, loading later pages in
+            # parallel tabs; a crawl that failed earlier resumes after its last completed page
+            checkpoint = CrawlCheckpoint(search_term, device, self.search_result_page.browser_name)
+            products_found = 0
+            for _, page_products in self.search_result_page.iter_result_pages(
+                    search_term=search_term, device=device, checkpoint=checkpoint):
+                self.search_result_page.save_product_information(product_sink, search_term, device, page_products)
+                products_found += len(page_products)
+            assert products_found, f"No products found for search term {search_term}"
+
+        assert self.search_result_page.crawl_stats["last_page"] > 1, f"Failed to crawl past the first page for {search_term}"
+
+@pytest.mark.skipif(not USE_STAND_IN, reason="Amazon throttles plain HTTP clients; run with USE_STAND_IN=1")
+class TestHttpCrawling:
+
+    @pytest.mark.parametrize("search_term", SEARCH_ITEMS)
+    def test_amazon_product_search_over_http(self, search_term, product_sink):
+        """
+        Test to crawl the first two search result pages without a browser.
+
+        :param search_term: The search term to look for products.
+        :param product_sink: The session's product sink.
+        """
+        engine = HttpCrawlEngine()
+        products_info = engine.crawl(search_term, pages=2)
 
-        # Step 3: Navigate to the next page of search results and extract product information
-        self.search_result_page.click_next_page()
-        products_info.extend(self.search_result_page.extract_product_information())
+        assert not engine.stats["errors"], f"Failed to fetch search result pages for {search_term}"
         assert products_info, f"No products found for search term {search_term}"
+        assert all(product["Name"] != "N/A" for product in products_info), "Product without a name extracted"
 
-        # Step 4: Save all the extracted product information to a CSV file
-        self.search_result_page.save_product_information_to_csv(search_term, device, products_info)
+        product_sink.add(search_term, "http", "desktop", products_info)
@@ -0,0 +1,38 @@
+from benchmarks.baseline import compare_runs, format_table, failing_rows
+
+class TestBenchmarkBaseline:
+
+    def test_metrics_slower_than_the_threshold_are_regressions(self):
+        """
+        Test that each metric is judged against its own threshold and that added or dropped metrics are reported.
+        """
+        baseline = {"metrics": {
+            "search_product[chrome]": {"median": 1.0},
+            "driver_startup[chrome]": {"median": 2.0},
+            "sink_write[rows=10000]": {"median": 0.1},
+            "logger[records=5000]": {"median": 0.2}
+        }}
+        current = {"metrics": {
+            "search_product[chrome]": {"median": 1.3},
+            # Driver startup may vary by up to 50 % before it counts
+            "driver_startup[chrome]": {"median": 2.8},
+            "sink_write[rows=10000]": {"median": 0.05},
+            "screenshot_encode": {"median": 0.7}
+        }}
+
+        rows = compare_runs(baseline, current, threshold=0.2, overrides={"driver_startup": 0.5})
+        statuses = {row["metric"]: row["status"] for row in rows}
+
+        assert statuses == {
+            "search_product[chrome]": "regressed",
+            "driver_startup[chrome]": "ok",
+            "sink_write[rows=10000]": "improved",
+            "logger[records=5000]": "missing",
+            "screenshot_encode": "new"
+        }
+        table = format_table(rows)
+        assert "+30%" in table and "1300.0" in table
+
+        # A metric the later run did not measure fails the gate unless missing metrics are allowed
+        assert {row["metric"] for row in failing_rows(rows)} == {"search_product[chrome]", "logger[records=5000]"}
+        assert [row["metric"] for row in failing_rows(rows, allow_missing=True)] == ["search_product[chrome]"]
@@ -0,0 +1,88 @@
+import logging
+import os
+import time
+from types import SimpleNamespace
+from page_objects.base_page import PageState
+from page_objects.search_result_page import SearchResultPage
+from utilities.crawl_checkpoint import CrawlCheckpoint
+
+def make_products(page):
+    return [SearchResultPage.build_product_info({"asin": f"B00000{page}00{index}", "name": f"Page {page} #{index}",
+                                                 "url": f"/dp/B00000{page}00{index}"}) for index in range(2)]
+
+class FakeResultPages:
+    """Serves result pages 1..last_page to iter_result_pages without a browser."""
+    def __init__(self, last_page):
+        self.last_page = last_page
+        self.current = 1
+        self.driver = SimpleNamespace(
+            capabilities={"browserName": "chrome"}, current_window_handle="origin",
+            current_url="http://shop/s?k=mobile", switch_to=SimpleNamespace(window=self.switch_to), close=lambda: None)
+
+    def switch_to(self, handle):
+        if handle != "origin":
+            self.current = handle
+
+    def search_result_page(self):
+        page = SearchResultPage(self.driver, logging.getLogger("test_crawl_checkpoint"))
+        page.wait = SimpleNamespace(until=lambda condition: True)
+        page.check_for_traffic_error = lambda ready_element_id: PageState.READY
+        page._open_pages_in_tabs = lambda first_page_url, pages: list(pages)
+        page._extract_page = lambda: (make_products(self.current), self.current < self.last_page)
+        return page
+
+class TestCrawlCheckpoint:
+
+    def test_checkpoint_round_trip_and_expiry(self, tmp_path):
+        """
+        Test that a saved crawl position is restored per term, device and browser until it goes stale.
+        """
+        checkpoint = CrawlCheckpoint("Mobile", "desktop", "chrome", checkpoint_dir=str(tmp_path), max_age=60)
+        assert checkpoint.load() is None
+
+        checkpoint.save(3, "https://www.amazon.in/s?k=mobile", {"B000000002", "B000000001"}, {"f1", "f2", "f3"})
+        state = CrawlCheckpoint("mobile", "desktop", "chrome", checkpoint_dir=str(tmp_path)).load()
+        assert state["page"] == 3
+        assert state["seen_asins"] == ["B000000001", "B000000002"]
+        assert CrawlCheckpoint("mobile", "desktop", "firefox", checkpoint_dir=str(tmp_path)).load() is None
+
+        checkpoint.max_age = 0
+        time.sleep(0.01)
+        assert checkpoint.load() is None
+        assert not os.path.exists(checkpoint.path)
+
+    def test_checkpointed_pages_are_yielded_again_on_resume(self, tmp_path):
+        """
+        Test that a resumed crawl yields the products of the pages completed before the failure, then
+        loads the remaining pages, and that the checkpoint and its pages are removed once it completes.
+        """
+        checkpoint = CrawlCheckpoint("mobile", "desktop", "chrome", checkpoint_dir=str(tmp_path))
+        first_run = FakeResultPages(last_page=3).search_result_page().iter_result_pages(
+            max_pages=3, concurrency=1, checkpoint=checkpoint)
+        assert next(first_run)[0] == 1
+        assert next(first_run)[0] == 2
+        # The crawl fails while page 2 is being stored, so only page 1 is checkpointed
+        first_run.close()
+        assert checkpoint.load()["page"] == 1
+
+        resumed = list(FakeResultPages(last_page=3).search_result_page().iter_result_pages(
+            max_pages=3, concurrency=1, checkpoint=checkpoint))
+
+        assert [(page, products) for page, products in resumed] == [(page, make_products(page)) for page in (1, 2, 3)]
+        assert not os.path.exists(checkpoint.path)
+        assert not os.path.exists(checkpoint.pages_path)
+
+    def test_checkpoint_of_a_finished_crawl_is_not_resumed(self, tmp_path):
+        """
+        Test that a checkpoint at max_pages or at the last result page starts the crawl over from page 1.
+        """
+        checkpoint = CrawlCheckpoint("mobile", "desktop", "chrome", checkpoint_dir=str(tmp_path))
+        for page, has_next, max_pages in ((2, True, 2), (1, False, 3)):
+            checkpoint.save(page, "http://shop/s?k=mobile", set(), set(), make_products(page), has_next)
+            assert checkpoint.is_complete(checkpoint.load(), max_pages)
+
+            pages = [page for page, _ in FakeResultPages(last_page=2).search_result_page().iter_result_pages(
+                max_pages=max_pages, concurrency=1, checkpoint=checkpoint)]
+
+            assert pages == [1, 2]
+            assert checkpoint.load() is None
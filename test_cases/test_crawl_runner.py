@@ -0,0 +1,27 @@
+import csv
+import io
+from utilities.crawl_runner import build_jobs, run_crawl
+from utilities.stand_in_server import StandInServer
+
+class TestCrawlRunner:
+
+    def test_jobs_are_crawled_in_worker_processes(self, tmp_path, monkeypatch):
+        """
+        Test that the runner crawls every job in its process pool and merges the products into one table.
+        """
+        with StandInServer(port=0) as server:
+            # Pool processes are spawned, so they read the stand-in's address from the environment
+            monkeypatch.setenv("USE_STAND_IN", "1")
+            monkeypatch.setenv("STAND_IN_PORT", str(server.port))
+            monkeypatch.setenv("RATE_LIMIT", "0")
+            jobs = build_jobs(["mobile", "laptop"], ["http"], ["desktop", "mobile"])
+            result = run_crawl(jobs, pages=3, workers=2, output_dir=str(tmp_path), formats=["csv"],
+                               progress_interval=0.1, out=io.StringIO())
+
+        assert jobs == [("mobile", "http", "desktop"), ("laptop", "http", "desktop")]
+        assert not result["failed"]
+        assert (result["progress"]["jobs"], result["progress"]["pages"]) == (2, 6)
+        with open(result["outputs"]["csv"], newline="", encoding="utf-8") as product_file:
+            rows = list(csv.DictReader(product_file))
+        assert len(rows) == result["outputs"]["rows"] == result["progress"]["products"] == 2 * 3 * 16
+        assert {row["term"] for row in rows} == {"mobile", "laptop"}
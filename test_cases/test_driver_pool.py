@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+from utilities.utilities import BrowserFactory, DriverPool
+
+class FakeDriver:
+    """Records what the pool does to a session; reset fails when fail_reset is set."""
+    def __init__(self):
+        self.window_handles = ["main", "popup"]
+        self.current_handle = "main"
+        self.switch_to = SimpleNamespace(window=self.switch_to_window)
+        self.fail_reset = False
+        self.cookies_deleted = 0
+        self.window_size = None
+        self.url = "https://www.amazon.in/s?k=mobile"
+        self.quit_calls = 0
+
+    def switch_to_window(self, handle):
+        self.current_handle = handle
+
+    def close(self):
+        self.window_handles.remove(self.current_handle)
+
+    def delete_all_cookies(self):
+        if self.fail_reset:
+            raise RuntimeError("session is gone")
+        self.cookies_deleted += 1
+
+    def set_window_size(self, width, height):
+        self.window_size = (width, height)
+
+    def get(self, url):
+        self.url = url
+
+    def quit(self):
+        self.quit_calls += 1
+
+class FakeBrowser:
+    """A Browser that hands out FakeDrivers and keeps every one it created."""
+    created = []
+
+    def __init__(self, load_profile):
+        self.load_profile = load_profile
+
+    def create_driver(self):
+        driver = FakeDriver()
+        FakeBrowser.created.append(driver)
+        return driver
+
+class TestDriverPool:
+
+    def setup_method(self):
+        FakeBrowser.created = []
+
+    def register_fake_browser(self, monkeypatch):
+        monkeypatch.setitem(BrowserFactory._registry, "fake", FakeBrowser)
+
+    def test_released_sessions_are_reset_and_reused_until_max_uses(self, monkeypatch):
+        """
+        Test that a released session is reset and leased again, and is quit once it reaches max_uses.
+        """
+        self.register_fake_browser(monkeypatch)
+        pool = DriverPool(max_uses=2, window_size=(1280, 800))
+
+        driver = pool.acquire("Fake")
+        pool.release(driver)
+        assert driver.window_handles == ["main"] and driver.current_handle == "main"
+        assert (driver.cookies_deleted, driver.window_size, driver.url) == (1, (1280, 800), "about:blank")
+
+        assert pool.acquire("fake") is driver
+        pool.release(driver)
+        assert driver.quit_calls == 1
+
+        replacement = pool.acquire("fake")
+        assert replacement is not driver and len(FakeBrowser.created) == 2
+        assert pool.stats == {"hits": 1, "misses": 2, "recycled": 1, "reset_failures": 0}
+
+    def test_session_that_cannot_be_reset_is_quit(self, monkeypatch):
+        """
+        Test that a session whose reset fails is quit instead of going back to the pool.
+        """
+        self.register_fake_browser(monkeypatch)
+        pool = DriverPool(max_uses=5)
+
+        driver = pool.acquire("fake")
+        driver.fail_reset = True
+        pool.release(driver)
+
+        assert driver.quit_calls == 1
+        assert pool.acquire("fake") is not driver
+        assert pool.stats == {"hits": 0, "misses": 2, "recycled": 1, "reset_failures": 1}
+
+    def test_close_quits_the_idle_sessions(self, monkeypatch):
+        """
+        Test that closing the pool quits the idle sessions and leaves leased ones alone.
+        """
+        self.register_fake_browser(monkeypatch)
+        pool = DriverPool(max_uses=5)
+        idle, leased = pool.acquire("fake"), pool.acquire("fake")
+        pool.release(idle)
+
+        pool.close()
+
+        assert (idle.quit_calls, leased.quit_calls) == (1, 0)
+        assert pool.acquire("fake") is not idle
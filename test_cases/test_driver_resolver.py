@@ -0,0 +1,81 @@
+import json
+import shutil
+from types import SimpleNamespace
+import pytest
+from utilities.utilities import DriverBinaryResolver
+
+class FakeManager:
+    """Stands in for a webdriver_manager class: reports a browser version and "installs" a file."""
+    installs = []
+
+    def __init__(self, install_dir, version="120.0.6099"):
+        self.install_dir = install_dir
+        self.driver = SimpleNamespace(get_browser_version_from_os=lambda: version)
+
+    def install(self):
+        path = self.install_dir / f"chromedriver-{len(FakeManager.installs)}"
+        path.write_text("binary", encoding="utf-8")
+        FakeManager.installs.append(str(path))
+        return str(path)
+
+class TestDriverBinaryResolver:
+
+    @pytest.fixture(autouse=True)
+    def fresh_resolver_state(self, monkeypatch):
+        """Resolutions and stats are kept per process, so every test starts from empty ones."""
+        monkeypatch.setattr(DriverBinaryResolver, "_resolved", {})
+        monkeypatch.setattr(DriverBinaryResolver, "stats", {"hits": 0, "misses": 0, "seconds_saved": 0.0})
+        monkeypatch.delenv("CHROMEDRIVER_PATH", raising=False)
+        FakeManager.installs = []
+
+    def test_manifest_entries_are_reused_and_their_install_time_counted(self, tmp_path, monkeypatch):
+        """
+        Test that the first resolution installs the driver into the manifest and a later process reuses
+        it, counting the install time it saved; a driver whose binary is gone is installed again.
+        """
+        manifest_path = tmp_path / "manifest.json"
+        manager_factory = lambda: FakeManager(tmp_path)
+
+        first = DriverBinaryResolver(str(manifest_path), offline=False).resolve("chrome", manager_factory)
+        assert FakeManager.installs == [first]
+        assert DriverBinaryResolver.stats == {"hits": 0, "misses": 1, "seconds_saved": 0.0}
+
+        # Pretend the install took 2.5 s, then resolve again as a new process would
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        manifest["drivers"]["chrome:120.0.6099"]["install_seconds"] = 2.5
+        manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+        monkeypatch.setattr(DriverBinaryResolver, "_resolved", {})
+
+        assert DriverBinaryResolver(str(manifest_path), offline=False).resolve("chrome", manager_factory) == first
+        assert len(FakeManager.installs) == 1
+        assert DriverBinaryResolver.stats == {"hits": 1, "misses": 1, "seconds_saved": 2.5}
+        assert json.loads(manifest_path.read_text(encoding="utf-8"))["seconds_saved"] == 2.5
+
+        # Within the process the path is served without reading the manifest again
+        assert DriverBinaryResolver(str(manifest_path), offline=False).resolve("chrome", manager_factory) == first
+        assert DriverBinaryResolver.stats["hits"] == 1
+
+        monkeypatch.setattr(DriverBinaryResolver, "_resolved", {})
+        (tmp_path / "chromedriver-0").unlink()
+        second = DriverBinaryResolver(str(manifest_path), offline=False).resolve("chrome", manager_factory)
+        assert second != first and FakeManager.installs == [first, second]
+
+    def test_offline_resolution_falls_back_to_the_path(self, tmp_path, monkeypatch):
+        """
+        Test that offline resolution takes the driver from the PATH without installing anything, and fails
+        when the PATH has none.
+        """
+        manifest_path = tmp_path / "manifest.json"
+        manager_factory = lambda: FakeManager(tmp_path, version="121.0")
+        monkeypatch.setattr(shutil, "which", lambda name: None)
+
+        with pytest.raises(RuntimeError, match="DRIVER_OFFLINE"):
+            DriverBinaryResolver(str(manifest_path), offline=True).resolve("chrome", manager_factory)
+
+        monkeypatch.setattr(shutil, "which", lambda name: f"/usr/local/bin/{name}")
+        path = DriverBinaryResolver(str(manifest_path), offline=True).resolve("chrome", manager_factory)
+
+        assert path == "/usr/local/bin/chromedriver"
+        assert not FakeManager.installs
+        entry = json.loads(manifest_path.read_text(encoding="utf-8"))["drivers"]["chrome:121.0"]
+        assert (entry["path"], entry["install_seconds"]) == (path, 0.0)
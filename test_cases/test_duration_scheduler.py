@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+from utilities.duration_scheduler import DurationStore, plan_bins
+
+def make_items(browsers, search_terms):
+    return [
+        SimpleNamespace(
+            nodeid=f"test_cases/test_basic_crawling.py::TestBasicCrawling::test_search[{term}-{browser}]",
+            callspec=SimpleNamespace(params={"setup": browser, "search_term": term})
+        )
+        for browser in browsers for term in search_terms
+    ]
+
+class TestDurationScheduler:
+
+    def test_slow_browser_is_spread_over_workers(self):
+        """
+        Test that a slow browser's tests are split across bins while fast browsers stay in one bin each.
+        """
+        items = make_items(["edge", "chrome", "firefox"], ["mobile", "laptop", "headphones"])
+        durations = {item.nodeid: 30.0 if item.callspec.params["setup"] == "firefox" else 10.0 for item in items}
+
+        assignment, loads = plan_bins(items, 3, durations)
+
+        bins_by_browser = {}
+        for item in items:
+            bins_by_browser.setdefault(item.callspec.params["setup"], set()).add(assignment[item.nodeid])
+        assert len(bins_by_browser["firefox"]) > 1
+        assert len(bins_by_browser["edge"]) == len(bins_by_browser["chrome"]) == 1
+        assert max(loads) == 60.0
+
+    def test_round_robin_without_history(self):
+        """
+        Test that without history each browser chunk goes to the next bin in turn.
+        """
+        items = make_items(["edge", "chrome", "firefox"], ["mobile"])
+
+        assignment, _ = plan_bins(items, 2, {})
+
+        assert [assignment[item.nodeid] for item in items] == [0, 1, 0]
+
+    def test_history_is_a_moving_average(self, tmp_path):
+        """
+        Test that recorded durations are averaged with the previous runs.
+        """
+        store = DurationStore(str(tmp_path / "durations.json"), weight=0.5)
+        store.update({"test_a": 10.0})
+        store.update({"test_a": 20.0, "test_b": 4.0})
+
+        assert store.load() == {"test_a": 15.0, "test_b": 4.0}
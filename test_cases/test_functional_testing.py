@@ -40,8 +40,5 @@ class TestFunctionalTesting:
         self.search_result_page.click_first_product()
         self.product_details_page.verify_product_page_loaded(product_name)
 
-        # Step 4: Verify the presence of essential elements on the product details page
-        self.product_details_page.verify_presence_of_add_to_cart()
-        self.product_details_page.verify_presence_of_product_overview()
-        self.product_details_page.verify_presence_of_product_details()
-        self.product_details_page.verify_presence_of_image_gallery()
+        # Step 4: Verify the presence of essential elements on the product details page in one composite wait
+        self.product_details_page.verify_presence_of_product_sections()
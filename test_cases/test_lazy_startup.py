@@ -0,0 +1,64 @@
+import subprocess
+import sys
+import pytest
+from configs.configs import PROJECT_ROOT
+from utilities.import_profile import ImportProfiler, parse_importtime
+
+class TestLazyStartup:
+
+    def test_only_the_requested_browser_is_loaded(self):
+        """
+        Test that the factory builds just the requested Browser and that neither importing the utilities nor
+        building a Firefox browser loads the Chromium driver modules or their driver managers.
+        """
+        script = (
+            "import sys\n"
+            "from utilities.utilities import BrowserFactory, FirefoxBrowser\n"
+            "assert 'selenium.webdriver.remote.webdriver' not in sys.modules\n"
+            "assert isinstance(BrowserFactory.get_browser('Firefox'), FirefoxBrowser)\n"
+            "assert BrowserFactory.get_browser('safari') is None\n"
+            "print(sorted(BrowserFactory.browser_names()))\n"
+            "print([name for name in sys.modules if name.startswith(('selenium.webdriver.chrom', 'webdriver_manager'))])\n"
+        )
+        completed = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, capture_output=True, text=True)
+
+        assert completed.returncode == 0, completed.stderr
+        assert completed.stdout.splitlines() == ["['chrome', 'edge', 'firefox']", "[]"]
+
+    def test_import_time_is_summed_per_package(self):
+        """
+        Test that -X importtime output is summed by top-level package, heaviest first.
+        """
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       300 |        300 |     selenium.common\n"
+            "import time:      1200 |       1500 |   selenium.webdriver\n"
+            "import time:       100 |       1600 | selenium\n"
+            "import time:      1000 |       1000 | lxml.html\n"
+            "import time:        50 |         50 | json\n"
+        )
+        profile = parse_importtime(output, top=2)
+
+        assert profile["modules"] == 5
+        assert profile["seconds"] == pytest.approx(0.00265)
+        assert profile["heaviest"] == [("selenium", pytest.approx(0.0016)), ("lxml", pytest.approx(0.001))]
+
+    def test_failed_roots_are_reported_without_stopping_the_profiler(self, monkeypatch):
+        """
+        Test that a child that fails with an empty stderr is reported by its exit code, that a root which
+        cannot be started is reported as well, and that the roots after them are still profiled.
+        """
+        def fake_run(command, **kwargs):
+            modules = command[-1]
+            if "crashes" in modules:
+                return subprocess.CompletedProcess(command, -9, stdout="", stderr="")
+            if "unstartable" in modules:
+                raise OSError("cannot start the interpreter")
+            return subprocess.CompletedProcess(command, 0, stdout="", stderr="import time:  100 |  100 | json\n")
+        monkeypatch.setattr(subprocess, "run", fake_run)
+
+        profiles = ImportProfiler({"crash": ["crashes"], "start": ["unstartable"], "json": ["json"]}).start().results()
+
+        assert profiles["crash"] == {"error": "exited with code -9"}
+        assert profiles["start"] == {"error": "OSError('cannot start the interpreter')"}
+        assert profiles["json"]["modules"] == 1
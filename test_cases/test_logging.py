@@ -0,0 +1,110 @@
+import io
+import json
+import logging
+import os
+import queue
+from datetime import datetime
+from logging.handlers import QueueListener
+from utilities.log_merge import find_log_files, merge_logs
+from utilities.utilities import ContextFilter, JsonLogFormatter, LocalQueueHandler
+
+def make_logger(name, formatter):
+    """A logger wired like SingletonLogger's, writing to a string buffer."""
+    output = io.StringIO()
+    stream_handler = logging.StreamHandler(output)
+    stream_handler.setFormatter(formatter)
+    context_filter = ContextFilter()
+    queue_handler = LocalQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(context_filter)
+    logger = logging.getLogger(name)
+    logger.handlers = [queue_handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger, context_filter, QueueListener(queue_handler.queue, stream_handler), output
+
+def write_log(path, lines):
+    path.write_text("".join(f"{line}\n" for line in lines), encoding="utf-8")
+
+class TestLogging:
+
+    def test_structured_records_keep_context_and_exception(self, monkeypatch):
+        """
+        Test that a JSON record carries the bound context, that explicit extras win over it, and that an
+        exception is written as its own field rather than into the message.
+        """
+        # Pinned, so the record's worker is known under xdist as well
+        monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw7")
+        logger, context_filter, listener, output = make_logger("test_logging.json", JsonLogFormatter())
+        context_filter.context.update({"browser": "chrome", "device": "desktop", "search_term": "mobile"})
+        listener.start()
+        logger.info("Searching for %s", "mobile", extra={"step": "search_product", "device": "tablet"})
+        try:
+            raise ValueError("no results")
+        except ValueError:
+            logger.exception("Search failed")
+        listener.stop()
+
+        info, error = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert (info["message"], info["level"], info["worker"]) == ("Searching for mobile", "INFO", "gw7")
+        assert (info["browser"], info["device"], info["search_term"], info["step"]) == (
+            "chrome", "tablet", "mobile", "search_product")
+        assert "exception" not in info
+        assert error["message"] == "Search failed"
+        assert error["exception"].startswith("Traceback") and error["exception"].endswith("ValueError: no results")
+
+    def test_text_records_keep_the_traceback(self):
+        """
+        Test that plain text records still end with the traceback of a logged exception.
+        """
+        logger, _, listener, output = make_logger("test_logging.text", logging.Formatter("%(levelname)s: %(message)s"))
+        listener.start()
+        try:
+            raise ValueError("no results")
+        except ValueError:
+            logger.exception("Search failed")
+        listener.stop()
+
+        lines = output.getvalue().splitlines()
+        assert lines[0] == "ERROR: Search failed"
+        assert lines[1] == "Traceback (most recent call last):"
+        assert lines[-1] == "ValueError: no results"
+
+    def test_worker_logs_merge_in_time_order(self, tmp_path):
+        """
+        Test that every worker's log and its rotated backups are merged oldest first, that tracebacks stay
+        with their record, that JSON records are ordered by "ts" and that an earlier merged log is skipped.
+        """
+        write_log(tmp_path / "automation.gw0.log.1", ["02/12/2025 10:00:01 AM: INFO: gw0 first"])
+        write_log(tmp_path / "automation.gw0.log", [
+            "02/12/2025 10:00:04 AM: ERROR: gw0 failed",
+            "Traceback (most recent call last):",
+            "ValueError: no results"
+        ])
+        write_log(tmp_path / "automation.gw1.log", [
+            "02/12/2025 10:00:02 AM: INFO: gw1 second",
+            "02/12/2025 10:00:05 AM: INFO: gw1 last"
+        ])
+        # Text timestamps are local time, so the JSON record's ts is taken in local time as well
+        json_record = json.dumps({"ts": datetime(2025, 2, 12, 10, 0, 3).timestamp(), "message": "gw2 json"})
+        write_log(tmp_path / "automation.gw2.log", [json_record])
+        write_log(tmp_path / "automation.merged.log", ["02/12/2025 09:00:00 AM: INFO: stale merge"])
+
+        groups = find_log_files(str(tmp_path))
+        assert [os.path.basename(path) for path in groups["automation.gw0.log"]] == [
+            "automation.gw0.log.1", "automation.gw0.log"]
+        assert "automation.merged.log" not in groups
+
+        output_path = tmp_path / "merged.txt"
+        records = merge_logs(str(output_path), str(tmp_path))
+
+        merged = output_path.read_text(encoding="utf-8").splitlines()
+        assert records == 5
+        assert merged == [
+            "02/12/2025 10:00:01 AM: INFO: gw0 first",
+            "02/12/2025 10:00:02 AM: INFO: gw1 second",
+            json_record,
+            "02/12/2025 10:00:04 AM: ERROR: gw0 failed",
+            "Traceback (most recent call last):",
+            "ValueError: no results",
+            "02/12/2025 10:00:05 AM: INFO: gw1 last"
+        ]
@@ -0,0 +1,142 @@
+import base64
+import json
+import logging
+import urllib.request
+from selenium.common.exceptions import WebDriverException
+from page_objects.search_result_page import SearchResultPage
+from utilities.network_capture import NetworkCapture
+from utilities.stand_in_server import StandInServer
+
+def devtools_event(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+def response_received(request_id, url, status=200, resource_type="Document"):
+    return devtools_event("Network.responseReceived", requestId=request_id, type=resource_type,
+                          response={"url": url, "status": status})
+
+class FakeDevToolsDriver:
+    """Serves performance log entries and the response bodies of the current tab like a Chromium session."""
+    def __init__(self, current_url="http://shop/s?k=mobile"):
+        self.capabilities = {"browserName": "chrome"}
+        self.current_url = current_url
+        self.log = []
+        self.bodies = {}
+
+    def get_log(self, log_type):
+        entries, self.log = self.log, []
+        return entries
+
+    def execute_cdp_cmd(self, command, params):
+        if params["requestId"] not in self.bodies:
+            raise WebDriverException("No resource with given identifier found")
+        return self.bodies[params["requestId"]]
+
+class TestNetworkExtraction:
+
+    def test_search_responses_are_parsed_into_the_product_schema(self):
+        """
+        Test that a search response body parses into the DOM path's product dicts and next page flag.
+        """
+        with StandInServer(port=0, pages=2) as server:
+            first_url = SearchResultPage.build_search_url(server.url, "laptop")
+            last_url = SearchResultPage.build_search_url(server.url, "laptop", page=2)
+            first_page = urllib.request.urlopen(first_url).read().decode("utf-8")
+            last_page = urllib.request.urlopen(last_url).read().decode("utf-8")
+
+        products_info, has_next_page = SearchResultPage.parse_result_page(first_page, first_url)
+        assert has_next_page
+        assert len(products_info) == 16
+        assert set(products_info[0]) == {"ASIN", "Name", "Price", "Rating", "URL"}
+        assert products_info[0]["URL"].startswith(server.url)
+        assert all(product["ASIN"] != "N/A" and product["Name"] != "N/A" for product in products_info)
+
+        assert SearchResultPage.parse_result_page(last_page, last_url)[1] is False
+
+    def test_only_finished_search_documents_are_captured(self):
+        """
+        Test that only search documents answered with 200 are kept, that a body is read once its response
+        finished loading, and that take() hands it out once, ignoring the URL fragment.
+        """
+        driver = FakeDevToolsDriver()
+        capture = NetworkCapture(driver)
+        driver.log = [
+            response_received("1", "http://shop/s?k=mobile"),
+            response_received("2", "http://shop/s?k=laptop", status=503),
+            response_received("3", "http://shop/s?k=mobile&ajax=1", resource_type="XHR"),
+            response_received("4", "http://shop/dp/B000000001"),
+            response_received("5", "http://shop/s?k=mobile&page=2"),
+            devtools_event("Network.loadingFinished", requestId="1"),
+            devtools_event("Network.loadingFinished", requestId="2"),
+            devtools_event("Network.loadingFinished", requestId="4"),
+        ]
+        driver.bodies = {
+            "1": {"body": "<html>page 1</html>", "base64Encoded": False},
+            "2": {"body": "busy", "base64Encoded": False},
+            "4": {"body": "product", "base64Encoded": False},
+            "5": {"body": base64.b64encode(b"<html>page 2</html>").decode(), "base64Encoded": True},
+        }
+        capture.poll()
+
+        assert capture.take("http://shop/s?k=mobile#results") == "<html>page 1</html>"
+        assert capture.take("http://shop/s?k=mobile") is None
+        assert capture.take("http://shop/s?k=laptop") is None
+        assert capture.take("http://shop/dp/B000000001") is None
+        # Page 2 has not finished loading yet
+        assert capture.take("http://shop/s?k=mobile&page=2") is None
+
+        driver.log = [devtools_event("Network.loadingFinished", requestId="5")]
+        capture.poll()
+        assert capture.take("http://shop/s?k=mobile&page=2") == "<html>page 2</html>"
+
+    def test_bodies_of_other_tabs_wait_and_old_responses_are_evicted(self):
+        """
+        Test that a body the current tab cannot read is retried on a later poll, and that pending responses
+        and bodies beyond max_responses are dropped oldest first.
+        """
+        driver = FakeDevToolsDriver()
+        capture = NetworkCapture(driver, max_responses=2)
+        driver.log = [response_received("1", "http://shop/s?k=mobile&page=1"),
+                      devtools_event("Network.loadingFinished", requestId="1")]
+        capture.poll()
+        assert capture.take("http://shop/s?k=mobile&page=1") is None
+
+        # Switched to the tab that loaded it
+        driver.bodies["1"] = {"body": "page 1", "base64Encoded": False}
+        capture.poll()
+        assert capture.take("http://shop/s?k=mobile&page=1") == "page 1"
+
+        for request_id in ("2", "3", "4"):
+            driver.log.append(response_received(request_id, f"http://shop/s?k=mobile&page={request_id}"))
+            driver.log.append(devtools_event("Network.loadingFinished", requestId=request_id))
+            driver.bodies[request_id] = {"body": f"page {request_id}", "base64Encoded": False}
+        for request_id in ("5", "6", "7"):
+            driver.log.append(response_received(request_id, f"http://shop/s?k=mobile&page={request_id}"))
+        capture.poll()
+
+        assert capture.take("http://shop/s?k=mobile&page=2") is None
+        assert [capture.take(f"http://shop/s?k=mobile&page={page}") for page in (3, 4)] == ["page 3", "page 4"]
+        assert list(capture._requests) == ["6", "7"]
+
+    def test_pages_without_a_captured_response_fall_back_to_the_dom(self, monkeypatch):
+        """
+        Test that a captured search response is parsed without the DOM, that a page without one is read
+        from the DOM, and that both paths and the fallback are counted.
+        """
+        with StandInServer(port=0) as server:
+            url = SearchResultPage.build_search_url(server.url, "mobile")
+            body = urllib.request.urlopen(url).read().decode("utf-8")
+        monkeypatch.setattr(SearchResultPage, "extraction_stats", {
+            "network": {"pages": 0, "seconds": 0.0}, "dom": {"pages": 0, "seconds": 0.0}, "fallbacks": 0})
+        driver = FakeDevToolsDriver(url)
+        search_result_page = SearchResultPage(driver, logging.getLogger("test_network_extraction"))
+        dom_page = ([{"ASIN": "B000000009"}], False)
+        monkeypatch.setattr(search_result_page, "_extract_from_dom", lambda mode: dom_page)
+
+        driver.log = [response_received("1", url), devtools_event("Network.loadingFinished", requestId="1")]
+        driver.bodies["1"] = {"body": body, "base64Encoded": False}
+        products_info, has_next_page = search_result_page._extract_page("network")
+        assert len(products_info) == 16 and has_next_page
+
+        assert search_result_page._extract_page("network") == dom_page
+        stats = SearchResultPage.extraction_stats
+        assert (stats["network"]["pages"], stats["dom"]["pages"], stats["fallbacks"]) == (1, 1, 1)
@@ -0,0 +1,65 @@
+import pytest
+from pathlib import Path
+from time import perf_counter
+from page_objects.base_page import PageState
+from page_objects.home_page import HomePage
+
+PAGES_DIR = Path(__file__).resolve().parent.parent / 'test_data' / 'pages'
+
+@pytest.mark.usefixtures("setup")
+class TestPageState:
+
+    @pytest.fixture(autouse=True)
+    def setup_pages(self):
+        """
+        Set up page objects for the test.
+        This fixture runs automatically before each test.
+        """
+        self.home_page = HomePage(self.driver, self.logger)
+
+    def open_fixture(self, page_name):
+        """Loads one of the recorded pages from test_data/pages."""
+        self.driver.get((PAGES_DIR / page_name).as_uri())
+
+    @pytest.mark.parametrize("page_name, expected_state", [
+        ("home.html", PageState.READY),
+        ("captcha.html", PageState.CAPTCHA),
+        ("rush_hour.html", PageState.TRAFFIC_ERROR),
+        ("loading.html", PageState.LOADING),
+    ])
+    def test_page_state_is_classified(self, page_name, expected_state):
+        """
+        Test that each recorded page is classified into the expected state.
+
+        :param page_name: The recorded page to load.
+        :param expected_state: The PageState the detector should return.
+        """
+        self.open_fixture(page_name)
+        assert self.home_page.detect_page_state(HomePage.LOGO_ID, timeout=1) == expected_state
+
+    def test_healthy_home_page_is_classified_without_waiting(self):
+        """
+        Test that a healthy home page no longer waits out the CAPTCHA timeout.
+        """
+        self.open_fixture("home.html")
+
+        start = perf_counter()
+        state = self.home_page.detect_page_state(HomePage.LOGO_ID)
+        elapsed = perf_counter() - start
+
+        assert state == PageState.READY
+        assert elapsed < 1, f"Healthy home page took {elapsed:.2f}s to classify"
+
+    def test_page_without_captcha_is_not_refreshed(self):
+        """
+        Test that refresh_if_captcha returns the state of a healthy page without refreshing it first.
+        """
+        self.open_fixture("home.html")
+
+        start = perf_counter()
+        state = self.home_page.refresh_if_captcha()
+        elapsed = perf_counter() - start
+
+        # A refresh waits at least two seconds before reloading
+        assert state == PageState.READY
+        assert elapsed < 1, f"Healthy home page took {elapsed:.2f}s, so it was refreshed"
@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+from utilities.product_analytics import (
+    prepare, aggregate, cross_browser_consistency, inconsistent_groups, assert_cross_browser_consistency
+)
+
+def make_frame(rows):
+    return prepare(pd.DataFrame(rows, columns=["term", "browser", "device", "asin", "price", "rating"]))
+
+class TestProductAnalytics:
+
+    def test_prices_and_ratings_are_parsed_and_aggregated(self):
+        """
+        Test that text prices and ratings become numbers and are aggregated per term, browser and device.
+        """
+        frame = make_frame([
+            ("mobile", "chrome", "desktop", "B000000001", "Rs. 1,299", "4.2"),
+            ("mobile", "chrome", "desktop", "B000000002", "N/A", "3.9"),
+            ("mobile", "chrome", "desktop", "B000000003", "Rs. 15,999.50", "N/A"),
+            ("mobile", "edge", "desktop", "B000000001", "Rs. 1,299", "4.2"),
+        ])
+
+        assert frame["price_value"].iloc[[0, 2]].tolist() == [1299.0, 15999.5]
+        assert frame["price_value"].isna().sum() == 1
+        assert frame["rating_value"].dtype == "float64"
+
+        summary = aggregate(frame).set_index(["term", "browser", "device"])
+        chrome = summary.loc[("mobile", "chrome", "desktop")]
+        assert (chrome["count"], chrome["priced"], chrome["rated"]) == (3, 2, 2)
+        assert chrome["price_p50"] == pytest.approx((1299 + 15999.5) / 2)
+        assert (chrome["rating_3_4"], chrome["rating_4_5"]) == (1, 1)
+
+    def test_browsers_disagreeing_on_results_are_reported(self):
+        """
+        Test that the consistency check flags a term and device whose browsers found different products.
+        """
+        frame = make_frame([
+            ("mobile", "chrome", "desktop", "B000000001", "N/A", "N/A"),
+            ("mobile", "chrome", "desktop", "B000000002", "N/A", "N/A"),
+            ("mobile", "firefox", "desktop", "B000000001", "N/A", "N/A"),
+            ("mobile", "firefox", "desktop", "B000000003", "N/A", "N/A"),
+            ("mobile", "http", "desktop", "B000000009", "N/A", "N/A"),
+            ("laptop", "chrome", "tablet", "B000000004", "N/A", "N/A"),
+            ("laptop", "firefox", "tablet", "B000000004", "N/A", "N/A"),
+        ])
+
+        report = cross_browser_consistency(frame).set_index(["term", "device"])
+        assert report.loc[("mobile", "desktop"), "overlap"] == pytest.approx(1 / 3)
+        assert report.loc[("laptop", "tablet"), "overlap"] == 1.0
+        assert inconsistent_groups(report.reset_index(), min_overlap=0.8)["term"].tolist() == ["mobile"]
+
+        with pytest.raises(AssertionError, match="mobile"):
+            assert_cross_browser_consistency(frame, min_overlap=0.8)
@@ -0,0 +1,72 @@
+from utilities.product_index import ProductIndex
+
+def make_row(term, asin, price, name=None):
+    return {
+        "term": term, "browser": "chrome", "device": "desktop", "asin": asin, "name": name or f"Product {asin}",
+        "price": price, "rating": "4.0", "url": f"https://www.amazon.in/dp/{asin}"
+    }
+
+class TestProductIndex:
+
+    def test_runs_are_diffed_by_asin(self, tmp_path):
+        """
+        Test that a second run reports new, removed and price-changed products and leaves the rest alone.
+        """
+        index = ProductIndex(str(tmp_path / "index.sqlite3"))
+        first = index.apply_run([
+            make_row("mobile", "B000000001", "Rs. 999"),
+            make_row("mobile", "B000000002", "Rs. 1,299"),
+            # Seen again on the next page and in another browser, stored once
+            make_row("mobile", "B000000002", "Rs. 1,299"),
+            make_row("laptop", "B000000003", "Rs. 45,999"),
+            make_row("mobile", "N/A", "Rs. 10")
+        ], "run-1")
+
+        assert first["inserted"] == 3
+        assert first["without_asin"] == 1
+        assert len(first["new"]) == 3
+
+        second = index.apply_run([
+            make_row("mobile", "B000000002", "Rs. 1,199"),
+            make_row("mobile", "B000000004", "Rs. 599")
+        ], "run-2")
+        index.close()
+
+        assert second["new"] == [["mobile", "B000000004"]]
+        # The laptop listing was not crawled in this run, so it is not reported as removed
+        assert second["removed"] == [["mobile", "B000000001"]]
+        assert second["price_changed"] == [
+            {"asin": "B000000002", "name": "Product B000000002", "old_price": "Rs. 1,299", "new_price": "Rs. 1,199"}
+        ]
+        assert (second["inserted"], second["updated"], second["unchanged"]) == (1, 1, 0)
+
+    def test_unchanged_products_are_not_rewritten(self, tmp_path):
+        """
+        Test that re-crawling an unchanged product leaves its index row untouched.
+        """
+        index = ProductIndex(str(tmp_path / "index.sqlite3"))
+        index.apply_run([make_row("mobile", "B000000001", "Rs. 999")], "run-1")
+        diff = index.apply_run([make_row("mobile", "B000000001", "Rs. 999")], "run-2")
+        changed_run = index.connection.execute(
+            "SELECT changed_run FROM products WHERE asin = 'B000000001'").fetchone()[0]
+        index.close()
+
+        assert (diff["inserted"], diff["updated"], diff["unchanged"]) == (0, 0, 1)
+        assert not diff["new"] and not diff["removed"] and not diff["price_changed"]
+        assert changed_run == "run-1"
+
+    def test_per_request_url_parameters_are_not_changes(self, tmp_path):
+        """
+        Test that product URLs are stored as /dp/<ASIN>, so per-request ref and qid parameters are no change.
+        """
+        index = ProductIndex(str(tmp_path / "index.sqlite3"))
+        row = make_row("mobile", "B000000001", "Rs. 999")
+        row["url"] = "https://www.amazon.in/Phone-A/dp/B000000001/ref=sr_1_1?qid=1700000000&sr=8-1"
+        index.apply_run([row], "run-1")
+        row["url"] = "https://www.amazon.in/Phone-A/dp/B000000001/ref=sr_1_4?qid=1700086400&sr=8-4"
+        diff = index.apply_run([row], "run-2")
+        product = index.lookup("B000000001")
+        index.close()
+
+        assert (diff["updated"], diff["unchanged"]) == (0, 1)
+        assert product["url"] == "https://www.amazon.in/dp/B000000001"
@@ -0,0 +1,95 @@
+import csv
+import json
+import pytest
+from utilities.product_sink import ProductSink, PRODUCT_COLUMNS
+
+PRODUCTS_INFO = [
+    {"ASIN": "B000000001", "Name": "Phone A", "Price": "Rs. 1,299", "Rating": "4.2", "URL": "https://www.amazon.in/dp/B000000001"},
+    {"ASIN": "B000000002", "Name": "Phone B", "Price": "N/A", "Rating": "3.9", "URL": "https://www.amazon.in/dp/B000000002"},
+    {"ASIN": "B000000003", "Name": "Phone C", "Price": "Rs. 15,999", "Rating": "N/A", "URL": "https://www.amazon.in/dp/B000000003"},
+]
+
+class TestProductSink:
+
+    def test_worker_shards_are_merged_into_one_table(self, tmp_path):
+        """
+        Test that rows from several worker shards are merged into clean CSV and JSON Lines tables.
+        """
+        shard_dir = tmp_path / "shards" / "run"
+        first_worker = ProductSink(str(shard_dir), "gw0", flush_rows=2)
+        second_worker = ProductSink(str(shard_dir), "gw1", flush_rows=2)
+
+        first_worker.add("mobile", "chrome", "desktop", PRODUCTS_INFO)
+        second_worker.add("mobile", "firefox", "tablet", PRODUCTS_INFO[:1])
+        first_worker.close()
+        second_worker.close()
+
+        outputs = ProductSink.merge(str(shard_dir), str(tmp_path), formats=["csv", "jsonl"])
+
+        assert outputs["rows"] == 4
+        assert not shard_dir.exists(), "Shards were not removed after the merge"
+
+        with open(outputs["csv"], newline='', encoding='utf-8') as csv_file:
+            rows = list(csv.reader(csv_file))
+        assert rows[0] == PRODUCT_COLUMNS
+        assert all(len(row) == len(PRODUCT_COLUMNS) for row in rows)
+        assert rows[1] == ["mobile", "chrome", "desktop", "B000000001", "Phone A", "Rs. 1,299", "4.2", PRODUCTS_INFO[0]["URL"]]
+
+        with open(outputs["jsonl"], encoding='utf-8') as jsonl_file:
+            records = [json.loads(line) for line in jsonl_file]
+        assert [record["browser"] for record in records] == ["chrome", "chrome", "chrome", "firefox"]
+
+    def test_rows_are_buffered_until_the_flush_threshold(self, tmp_path):
+        """
+        Test that rows stay in memory until the flush threshold is reached.
+        """
+        sink = ProductSink(str(tmp_path), "gw0", flush_rows=10)
+        sink.add("laptop", "edge", "mobile", PRODUCTS_INFO)
+        assert sink.rows_written == 0
+
+        sink.close()
+        assert sink.rows_written == len(PRODUCTS_INFO)
+
+    def test_parquet_table_is_typed(self, tmp_path):
+        """
+        Test that the Parquet table dictionary-encodes the grouping columns and adds the parsed price and rating.
+        """
+        pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+        shard_dir = tmp_path / "shards" / "run"
+        sink = ProductSink(str(shard_dir), "gw0")
+        sink.add("mobile", "chrome", "desktop", PRODUCTS_INFO)
+        sink.close()
+
+        outputs = ProductSink.merge(str(shard_dir), str(tmp_path), formats=["parquet"])
+        table = pyarrow_parquet.read_table(outputs["parquet"])
+
+        assert str(table.schema.field("browser").type) == "dictionary<values=string, indices=int32, ordered=0>"
+        assert str(table.schema.field("price_value").type) == "double"
+        assert table.column("price").to_pylist() == ["Rs. 1,299", "N/A", "Rs. 15,999"]
+        assert table.column("price_value").to_pylist() == [1299.0, None, 15999.0]
+        assert table.column("rating_value").to_pylist() == [4.2, 3.9, None]
+
+    def test_opened_writers_are_closed_when_a_later_one_fails(self, tmp_path, monkeypatch):
+        """
+        Test that a writer which cannot be opened closes the writers opened before it and keeps the shards.
+        """
+        shard_dir = tmp_path / "shards" / "run"
+        sink = ProductSink(str(shard_dir), "gw0")
+        sink.add("mobile", "chrome", "desktop", PRODUCTS_INFO)
+        sink.close()
+
+        opened = []
+        open_writer = ProductSink._open_writer
+
+        def open_or_fail(output_format, output_dir):
+            if output_format == "parquet":
+                raise ImportError("Parquet output needs pyarrow")
+            opened.append(open_writer(output_format, output_dir))
+            return opened[-1]
+        monkeypatch.setattr(ProductSink, "_open_writer", staticmethod(open_or_fail))
+
+        with pytest.raises(ImportError):
+            ProductSink.merge(str(shard_dir), str(tmp_path), formats=["csv", "jsonl", "parquet"])
+
+        assert len(opened) == 2 and all(writer._file.closed for writer in opened)
+        assert shard_dir.exists(), "Shards were removed although the merge failed"
@@ -0,0 +1,53 @@
+import pytest
+from utilities.http_crawler import HttpCrawlEngine
+from utilities.rate_limiter import HostRateLimiter
+from utilities.stand_in_server import StandInServer
+
+class TestHostRateLimiter:
+
+    def test_slots_are_shared_between_processes(self, tmp_path):
+        """
+        Test that limiters sharing a state file hand out consecutive slots of one bucket.
+        """
+        first = HostRateLimiter("amazon.in", str(tmp_path), rate=10, burst=2, enabled=True)
+        second = HostRateLimiter("amazon.in", str(tmp_path), rate=10, burst=2, enabled=True)
+
+        delays = [first.reserve(), second.reserve(), first.reserve(), second.reserve()]
+
+        # The burst goes out at once, then one slot every 0.1 s whichever process asks
+        assert delays[0] == pytest.approx(0, abs=0.02)
+        assert delays[1] == pytest.approx(0, abs=0.02)
+        assert delays[2] == pytest.approx(0.1, abs=0.02)
+        assert delays[3] == pytest.approx(0.2, abs=0.02)
+
+    def test_circuit_breaker_pauses_every_process(self, tmp_path):
+        """
+        Test that consecutive traffic errors slow the bucket down and open the circuit for all limiters.
+        """
+        first = HostRateLimiter("amazon.in", str(tmp_path), rate=8, threshold=3, cooldown=5, enabled=True)
+        second = HostRateLimiter("amazon.in", str(tmp_path), rate=8, threshold=3, cooldown=5, enabled=True)
+
+        backoffs = [first.record_traffic_error() for _ in range(2)]
+        assert first.read_state()["rate"] == 2
+        assert backoffs[1] > backoffs[0] / 2
+
+        assert first.record_traffic_error() == pytest.approx(5, abs=0.1)
+        assert second.reserve() == pytest.approx(5, abs=0.1)
+        assert first.stats["circuit_opened"] == 1
+
+        second.record_success()
+        state = second.read_state()
+        assert not state["half_open"] and state["rate"] > 1
+
+    def test_traffic_errors_of_the_stand_in_are_retried(self, tmp_path):
+        """
+        Test that the rush hour pages injected by the stand-in are retried instead of failing the crawl.
+        """
+        limiter = HostRateLimiter("stand-in", str(tmp_path), rate=100, backoff_base=0.01, threshold=100, enabled=True)
+        with StandInServer(port=0, error_mode="traffic", error_rate=0.3, seed=1) as server:
+            engine = HttpCrawlEngine(server.url, rate_limiter=limiter)
+            products_info = engine.crawl("laptop", pages=5)
+
+        assert not engine.stats["errors"]
+        assert engine.stats["retries"] == limiter.stats["traffic_errors"] > 0
+        assert len(products_info) == 5 * 16
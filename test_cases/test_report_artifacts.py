@@ -0,0 +1,58 @@
+import io
+import os
+import tarfile
+from datetime import date
+import pytest
+from utilities.report_artifacts import ReportArtifacts
+
+def write_file(path, data=b""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as output_file:
+        output_file.write(data)
+
+class TestReportArtifacts:
+
+    def test_days_past_the_age_or_size_limit_are_removed(self, tmp_path):
+        """
+        Test that retention removes days older than the limit, then the oldest days until the tree fits,
+        together with their bundles, and never touches today's run or unrelated files.
+        """
+        for day, size in (("2026_09_01", 10), ("2026_10_10", 600 * 1024), ("2026_10_15", 600 * 1024),
+                          ("2026_10_18", 600 * 1024)):
+            write_file(str(tmp_path / day / "report_100000.html"), b"x" * size)
+        write_file(str(tmp_path / "2026_10_10.tar.gz"), b"x")
+        write_file(str(tmp_path / "notes.txt"), b"x" * 1024 * 1024)
+
+        removed = ReportArtifacts(str(tmp_path)).enforce_retention(
+            max_age_days=14, max_total_mb=1.5, today=date(2026, 10, 18))
+
+        assert sorted(os.path.basename(path) for path in removed) == ["2026_09_01", "2026_10_10", "2026_10_10.tar.gz"]
+        assert sorted(os.listdir(tmp_path)) == ["2026_10_15", "2026_10_18", "notes.txt"]
+
+    def test_compacted_day_bundles_with_lazy_thumbnails(self, tmp_path):
+        """
+        Test that PNG screenshots become WebP images and thumbnails, that the report loads the thumbnail
+        lazily, and that a thumbnails-only bundle leaves out the full-size image.
+        """
+        image = pytest.importorskip("PIL.Image")
+        frame = io.BytesIO()
+        image.effect_noise((1280, 800), 64).convert("RGB").save(frame, format="PNG")
+        day_dir = tmp_path / "2026_10_18"
+        write_file(str(day_dir / "shot.png"), frame.getvalue())
+        write_file(str(day_dir / "report_100000.html"),
+                   b'<img src="shot.png" onclick="window.open(this.src)"/><img src="other.png"/>')
+
+        artifacts = ReportArtifacts(str(tmp_path))
+        stats = artifacts.compact("2026_10_18")
+
+        assert (stats["converted"], stats["reports"]) == (1, 1)
+        assert stats["after"] < stats["before"]
+        assert sorted(os.listdir(day_dir)) == ["report_100000.html", "shot.webp", "shot_thumb.webp"]
+        assert (day_dir / "report_100000.html").read_text() == (
+            '<img src="shot_thumb.webp" data-full="shot.webp" loading="lazy" '
+            'onclick="window.open(this.dataset.full || this.src)"/><img src="other.png"/>')
+
+        bundle_path = artifacts.bundle("2026_10_18", compression="gzip", thumbnails_only=True)
+        assert bundle_path == str(tmp_path / "2026_10_18.tar.gz")
+        with tarfile.open(bundle_path) as bundle:
+            assert sorted(bundle.getnames()) == ["2026_10_18/report_100000.html", "2026_10_18/shot_thumb.webp"]
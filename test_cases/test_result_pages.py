@@ -0,0 +1,81 @@
+import logging
+from types import SimpleNamespace
+from page_objects.base_page import PageState
+from page_objects.search_result_page import SearchResultPage
+
+def make_products(*asins):
+    return [SearchResultPage.build_product_info({"asin": asin, "name": f"Product {asin}", "url": f"/dp/{asin}"})
+            for asin in asins]
+
+class StubbedResultPages:
+    """Serves the given pages (page number to product dicts) to iter_result_pages without a browser."""
+    def __init__(self, pages):
+        self.pages = pages
+        self.current = 1
+        self.extracted = []
+        self.driver = SimpleNamespace(
+            capabilities={"browserName": "chrome"}, current_window_handle="origin",
+            current_url="http://shop/s?k=mobile", switch_to=SimpleNamespace(window=self.switch_to), close=lambda: None)
+
+    def switch_to(self, handle):
+        if handle != "origin":
+            self.current = handle
+
+    def extract_page(self):
+        self.extracted.append(self.current)
+        return self.pages[self.current], self.current < len(self.pages)
+
+    def crawl(self, max_pages, concurrency):
+        page = SearchResultPage(self.driver, logging.getLogger("test_result_pages"))
+        page.wait = SimpleNamespace(until=lambda condition: True)
+        page.check_for_traffic_error = lambda ready_element_id: PageState.READY
+        page._open_pages_in_tabs = lambda first_page_url, pages: list(pages)
+        page._extract_page = self.extract_page
+        return page, list(page.iter_result_pages(max_pages=max_pages, concurrency=concurrency))
+
+class TestResultPages:
+
+    def test_crawl_stops_at_the_depth_limit(self):
+        """
+        Test that no page past max_pages is loaded, even when a tab batch would reach further.
+        """
+        stub = StubbedResultPages({page: make_products(f"B00000000{page}") for page in range(1, 10)})
+
+        page, crawled = stub.crawl(max_pages=3, concurrency=2)
+
+        assert [number for number, _ in crawled] == [1, 2, 3]
+        assert stub.extracted == [1, 2, 3]
+        assert (page.crawl_stats["pages"], page.crawl_stats["last_page"]) == (3, 3)
+
+    def test_crawl_stops_at_the_page_without_a_next_link(self):
+        """
+        Test that the last result page ends the crawl before max_pages and that repeated listings are dropped.
+        """
+        stub = StubbedResultPages({
+            1: make_products("B000000001", "B000000002"),
+            2: make_products("B000000002", "B000000003")
+        })
+
+        page, crawled = stub.crawl(max_pages=5, concurrency=3)
+
+        assert crawled == [(1, make_products("B000000001", "B000000002")), (2, make_products("B000000003"))]
+        assert stub.extracted == [1, 2]
+        assert page.crawl_stats["last_page"] == 2
+
+    def test_crawl_stops_at_a_repeated_page(self):
+        """
+        Test that a page repeating an earlier one ends the crawl without yielding it or the pages after it.
+        """
+        stub = StubbedResultPages({
+            1: make_products("B000000001"),
+            2: make_products("B000000002"),
+            # Past the real last page the site serves the last page again
+            3: make_products("B000000002"),
+            4: make_products("B000000004")
+        })
+
+        page, crawled = stub.crawl(max_pages=5, concurrency=3)
+
+        assert [number for number, _ in crawled] == [1, 2]
+        assert stub.extracted == [1, 2, 3]
+        assert page.crawl_stats["last_page"] == 2
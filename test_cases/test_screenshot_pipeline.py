@@ -0,0 +1,78 @@
+import hashlib
+import random
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+from utilities.screenshot_pipeline import ScreenshotPipeline
+from utilities.utilities import PNGStrategy
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+class FakeDriver:
+    """Returns the queued frames from get_screenshot_as_png, one per call."""
+    def __init__(self, *frames):
+        self.frames = list(frames)
+
+    def get_screenshot_as_png(self):
+        return self.frames.pop(0)
+
+def frame_name(png_bytes):
+    return hashlib.blake2b(png_bytes, digest_size=12).hexdigest()
+
+class TestScreenshotPipeline:
+
+    @pytest.mark.parametrize("policy, passed_captured, failed_captured", [
+        ("always", True, True),
+        ("on-failure", False, True),
+    ])
+    def test_capture_policy(self, tmp_path, policy, passed_captured, failed_captured):
+        """
+        Test that "always" captures every phase and "on-failure" only failed ones.
+
+        :param policy: The SCREENSHOT_POLICY under test.
+        :param passed_captured: Whether a passed phase is captured.
+        :param failed_captured: Whether a failed phase is captured.
+        """
+        pipeline = ScreenshotPipeline(PNGStrategy(), policy=policy, base_dir=str(tmp_path))
+        pipeline.close()
+
+        assert pipeline.should_capture(SimpleNamespace(failed=False)) is passed_captured
+        assert pipeline.should_capture(SimpleNamespace(failed=True)) is failed_captured
+
+    def test_sampled_policy_captures_failures_and_a_share_of_the_rest(self, tmp_path, monkeypatch):
+        """
+        Test that "sampled" always captures a failure and captures a passed phase with the sample rate.
+        """
+        pipeline = ScreenshotPipeline(PNGStrategy(), policy="sampled", sample_rate=0.25, base_dir=str(tmp_path))
+        pipeline.close()
+
+        monkeypatch.setattr(random, "random", lambda: 0.2)
+        assert pipeline.should_capture(SimpleNamespace(failed=False))
+        monkeypatch.setattr(random, "random", lambda: 0.3)
+        assert not pipeline.should_capture(SimpleNamespace(failed=False))
+        assert pipeline.should_capture(SimpleNamespace(failed=True))
+
+        with pytest.raises(ValueError):
+            ScreenshotPipeline(PNGStrategy(), policy="never", base_dir=str(tmp_path))
+
+    def test_identical_frames_are_stored_once_and_flushed_on_close(self, tmp_path):
+        """
+        Test that frames are stored under their content hash, that repeated frames and frames already on
+        disk are not written again, and that close() waits until every queued frame is written.
+        """
+        home, results, stored_earlier = PNG_HEADER + b"home", PNG_HEADER + b"results", PNG_HEADER + b"captcha"
+        pipeline = ScreenshotPipeline(PNGStrategy(), policy="always", base_dir=str(tmp_path))
+        report_dir = Path(pipeline.dir_path)
+        # Another worker stored this frame already today
+        report_dir.mkdir(parents=True, exist_ok=True)
+        (report_dir / f"{frame_name(stored_earlier)}.png").write_bytes(stored_earlier)
+        driver = FakeDriver(home, results, home, stored_earlier)
+
+        file_names = [pipeline.capture(driver) for _ in range(4)]
+        pipeline.close()
+
+        assert file_names[0] == file_names[2] == {"full": f"{frame_name(home)}.png",
+                                                  "thumbnail": f"{frame_name(home)}.png"}
+        assert (report_dir / file_names[0]["full"]).read_bytes() == home
+        assert (report_dir / file_names[1]["full"]).read_bytes() == results
+        assert pipeline.stats == {"captured": 4, "deduplicated": 2, "written": 2, "write_errors": 0}
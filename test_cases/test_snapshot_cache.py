@@ -0,0 +1,78 @@
+import json
+import os
+import time
+from utilities.snapshot_cache import SnapshotCache
+
+PRODUCTS_INFO = [
+    {"Name": "Phone A", "Price": "1,299", "Rating": "4.2", "URL": "https://www.amazon.in/dp/B000000001"},
+    {"Name": "Phone B", "Price": "N/A", "Rating": "3.9", "URL": "https://www.amazon.in/dp/B000000002"},
+]
+DESKTOP = (1920, 1080)
+
+class TestSnapshotCache:
+
+    def test_fresh_snapshots_are_served_and_expired_ones_dropped(self, tmp_path):
+        """
+        Test that a snapshot is served per (term, page, viewport) to every browser until it outlives the TTL.
+        """
+        cache = SnapshotCache(str(tmp_path), ttl=60, store_html=True)
+        cache.put("mobile", 1, DESKTOP, "chrome", PRODUCTS_INFO, True, "<html>mobile</html>")
+
+        # The entry is keyed without the browser, so a Firefox run is served what Chrome extracted
+        entry = cache.get("Mobile ", 1, DESKTOP)
+        assert (entry["products"], entry["browser"]) == (PRODUCTS_INFO, "chrome")
+        assert cache.get_html("mobile", 1, DESKTOP) == "<html>mobile</html>"
+        assert cache.get("mobile", 1, (375, 667)) is None
+        assert cache.get("mobile", 2, DESKTOP) is None
+
+        cache.ttl = 0
+        time.sleep(0.01)
+        assert cache.get("mobile", 1, DESKTOP) is None
+        assert cache.stats == {"hits": 1, "misses": 3, "expired": 1, "stored": 1, "evicted": 0}
+
+    def test_least_recently_used_snapshots_are_evicted_over_the_size_cap(self, tmp_path):
+        """
+        Test that the size cap evicts the snapshot that was used least recently.
+        """
+        cache = SnapshotCache(str(tmp_path), ttl=60)
+        cache.put("mobile", 1, DESKTOP, "chrome", PRODUCTS_INFO, False)
+        cache.put("laptop", 1, DESKTOP, "chrome", PRODUCTS_INFO, False)
+        entry_size = os.path.getsize(cache._path(cache.key("mobile", 1, DESKTOP)))
+
+        # Use "mobile" last, so "laptop" is the least recently used snapshot
+        laptop_path = cache._path(cache.key("laptop", 1, DESKTOP))
+        os.utime(laptop_path, (time.time() - 10, time.time() - 10))
+        cache.get("mobile", 1, DESKTOP)
+
+        cache.max_bytes = entry_size * 2 + 100
+        cache.put("headphones", 1, DESKTOP, "chrome", PRODUCTS_INFO, False)
+
+        assert cache.get("laptop", 1, DESKTOP) is None
+        assert cache.get("mobile", 1, DESKTOP) is not None
+        assert cache.get("headphones", 1, DESKTOP) is not None
+        assert cache.stats["evicted"] == 1
+
+    def test_the_cache_is_only_walked_over_the_size_cap(self, tmp_path, monkeypatch):
+        """
+        Test that puts keep a running total of the cache size and walk the entries only once it exceeds the cap.
+        """
+        cache = SnapshotCache(str(tmp_path), ttl=60)
+        cache.put("mobile", 1, DESKTOP, "chrome", PRODUCTS_INFO, False)
+        mobile_path = cache._path(cache.key("mobile", 1, DESKTOP))
+        entry_size = os.path.getsize(mobile_path)
+        os.utime(mobile_path, (time.time() - 10, time.time() - 10))
+
+        scans = []
+        scan = cache._scan
+        monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or scan())
+        cache.max_bytes = entry_size * 2 + 100
+        cache.put("laptop", 1, DESKTOP, "chrome", PRODUCTS_INFO, False)
+        # Storing the same snapshot again replaces its bytes instead of adding them
+        cache.put("laptop", 1, DESKTOP, "firefox", PRODUCTS_INFO, False)
+        assert not scans
+
+        cache.put("headphones", 1, DESKTOP, "chrome", PRODUCTS_INFO, False)
+        assert len(scans) == 1 and cache.stats["evicted"] == 1
+        assert cache.get("mobile", 1, DESKTOP) is None
+        remaining = sum(os.path.getsize(cache._path(cache.key(term, 1, DESKTOP))) for term in ("laptop", "headphones"))
+        assert json.loads((tmp_path / SnapshotCache.SIZE_FILE).read_text())["bytes"] == remaining
@@ -0,0 +1,52 @@
+from urllib.error import HTTPError
+from urllib.parse import quote_plus
+from urllib.request import urlopen
+import pytest
+from utilities.stand_in_server import StandInServer, build_product
+
+class TestStandInServer:
+
+    @staticmethod
+    def fetch(url):
+        """Returns the status and body of a GET, including error responses."""
+        try:
+            with urlopen(url, timeout=5) as response:
+                return response.status, response.read().decode("utf-8")
+        except HTTPError as e:
+            return e.code, e.read().decode("utf-8")
+
+    @pytest.mark.parametrize("path, expected_status", [
+        ("dp/B12", 404),
+        ("dp/BXYZ001002", 404),
+        ("s?k=laptop&page=two", 400),
+        ("s?k=laptop&page=0", 400),
+        ("s?k=laptop&cards=-1", 400),
+        ("s?k=laptop&cards=many", 400),
+    ])
+    def test_malformed_requests_are_rejected(self, path, expected_status):
+        """
+        Test that malformed ASINs and page or card counts get an error response instead of breaking the handler.
+
+        :param path: The request path relative to the stand-in root.
+        :param expected_status: The HTTP status the stand-in should answer with.
+        """
+        with StandInServer(port=0) as server:
+            status, _ = self.fetch(server.url + path)
+            # The server keeps serving after the rejected request
+            assert self.fetch(server.url)[0] == 200
+
+        assert status == expected_status
+
+    def test_product_names_are_escaped(self):
+        """
+        Test that a search term with markup is escaped in the search result cards and product pages.
+        """
+        term = "<b>laptop</b>"
+        asin = build_product(term, 1, 0)["asin"]
+        with StandInServer(port=0) as server:
+            _, search_body = self.fetch(f"{server.url}s?k={quote_plus(term)}&cards=1")
+            _, product_body = self.fetch(f"{server.url}dp/{asin}?keywords={quote_plus(term)}")
+
+        for body in (search_body, product_body):
+            assert "&lt;B&gt;Laptop&lt;/B&gt; Stand-in Model 1-1" in body
+            assert "<B>" not in body
@@ -0,0 +1,52 @@
+import json
+from utilities.tracing import Tracer, percentile, summarize_steps
+
+class TestTracing:
+
+    def test_percentiles_use_the_nearest_rank(self):
+        """
+        Test that p50 and p95 are the smallest values with that share of the durations at or below them.
+        """
+        assert percentile([2, 1], 0.5) == 1
+        assert percentile([6, 5, 4, 3, 2, 1], 0.5) == 3
+        assert percentile([1, 2, 3, 4, 5], 0.5) == 3
+        assert percentile(list(range(1, 21)), 0.95) == 19
+        assert percentile(list(range(1, 11)), 0.95) == 10
+        assert percentile([7], 0.0) == percentile([7], 1.0) == 7
+
+    def test_steps_are_summarized_slowest_total_first(self):
+        """
+        Test that every step gets its call count, p50, p95 and total, and steps without spans are left out.
+        """
+        rows = summarize_steps({
+            "HomePage.search_product": [10.0, 30.0, 20.0, 40.0],
+            "SearchResultPage.extract_product_information": [100.0, 300.0],
+            "HomePage.open_amazon_website": []
+        })
+
+        assert rows == [
+            ("SearchResultPage.extract_product_information", 2, 100.0, 300.0, 400.0),
+            ("HomePage.search_product", 4, 20.0, 40.0, 100.0)
+        ]
+
+    def test_spans_export_as_chrome_trace_events(self, tmp_path, monkeypatch):
+        """
+        Test that recorded spans become complete ("X") trace events in microseconds with their tags.
+        """
+        monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw7")
+        tracer = Tracer()
+        monkeypatch.setattr(tracer, "spans", [])
+        monkeypatch.setattr(tracer, "_epoch_offset_ns", 1_000_000_000)
+        tracer.record("HomePage.search_product", 2_000_000, 1_500_000, {"browser": "chrome", "search_term": "mobile"})
+
+        path = tmp_path / "trace" / "trace_gw7.json"
+        tracer.export_chrome_trace(str(path))
+        trace = json.loads(path.read_text(encoding="utf-8"))
+
+        metadata, event = trace["traceEvents"]
+        assert metadata["ph"] == "M" and metadata["args"]["name"] == "gw7"
+        assert (event["name"], event["ph"]) == ("HomePage.search_product", "X")
+        assert (event["ts"], event["dur"]) == (1_002_000, 1_500)
+        assert event["args"] == {"browser": "chrome", "search_term": "mobile"}
+        assert event["pid"] == metadata["pid"]
+        assert tracer.durations_by_step() == {"HomePage.search_product": [1.5]}
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import time
+from configs.configs import CRAWL_CHECKPOINT_DIR, CRAWL_CHECKPOINT_MAX_AGE
+from utilities.utilities import write_atomically
+
+class CrawlCheckpoint:
+    """
+    Last completed result page of one search term, device and browser, so a failed crawl can resume.
+
+    The checkpoint also keeps the first page URL, the ASINs and the page fingerprints seen so far,
+    so a resumed crawl keeps de-duplicating against the pages before it. The products of every
+    completed page are appended to a pages file next to it; a resumed crawl yields them again, because
+    the run that crawled them merged them into a table the next run overwrites. Checkpoints older
+    than max_age seconds are ignored.
+    """
+    def __init__(self, search_term: str, device: str, browser_name: str,
+                 checkpoint_dir: str = CRAWL_CHECKPOINT_DIR, max_age: float = CRAWL_CHECKPOINT_MAX_AGE):
+        key = json.dumps([search_term.strip().lower(), device, browser_name.lower()])
+        self.path = os.path.join(checkpoint_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+        self.pages_path = f"{os.path.splitext(self.path)[0]}.pages.jsonl"
+        self.max_age = max_age
+
+    def load(self):
+        """
+        Returns the saved crawl state, or None when there is no recent checkpoint.
+
+        :returns: dict: "page" (last completed page), "has_next" (whether that page links to another one),
+            "first_page_url", "seen_asins", "seen_pages".
+        """
+        try:
+            with open(self.path, encoding="utf-8") as checkpoint_file:
+                state = json.load(checkpoint_file)
+        except (OSError, ValueError):
+            return None
+        if time.time() - state.get("saved", 0) > self.max_age:
+            self.clear()
+            return None
+        return state
+
+    def is_complete(self, state: dict, max_pages: int) -> bool:
+        """A crawl that reached max_pages or the last result page has nothing left to resume."""
+        return state["page"] >= max_pages or not state.get("has_next", True)
+
+    def iter_pages(self, state: dict):
+        """Yields (page number, product dicts) of the pages completed up to the checkpointed page."""
+        yielded = set()
+        try:
+            with open(self.pages_path, encoding="utf-8") as pages_file:
+                for line in pages_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by the crash that ended the earlier crawl
+                        continue
+                    if record["page"] <= state["page"] and record["page"] not in yielded:
+                        yielded.add(record["page"])
+                        yield record["page"], record["products"]
+        except FileNotFoundError:
+            return
+
+    def save(self, page: int, first_page_url: str, seen_asins, seen_pages, products_info=(), has_next=True):
+        """Records a completed page and its products."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.pages_path, "a", encoding="utf-8") as pages_file:
+            pages_file.write(json.dumps({"page": page, "products": list(products_info)}) + "\n")
+        state = {
+            "page": page,
+            "has_next": has_next,
+            "first_page_url": first_page_url,
+            "seen_asins": sorted(seen_asins),
+            "seen_pages": sorted(seen_pages),
+            "saved": time.time()
+        }
+        write_atomically(self.path, json.dumps(state))
+
+    def clear(self):
+        """Removes the checkpoint and its pages once the crawl has completed."""
+        for path in (self.path, self.pages_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
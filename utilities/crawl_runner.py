@@ -0,0 +1,222 @@
+"""
+Crawls search terms across browsers and devices in a pool of worker processes, outside pytest.
+
+Every worker process keeps its own warm browser sessions and streams the products of each result
+page into its product sink shard; the shards are merged into product_info.<format> at the end.
+"http" as a browser uses the browser-free HTTP crawl engine instead.
+
+Usage:
+    python -m utilities.crawl_runner --terms mobile laptop --browsers chrome firefox --devices desktop mobile \\
+        --pages 5 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait
+from itertools import product
+from multiprocessing.util import Finalize
+from configs.configs import (
+    SEARCH_ITEMS, SCREEN_SIZES, CRAWL_PAGE_DEPTH, CRAWL_RUNNER_WORKERS, CRAWL_RUNNER_PROGRESS_INTERVAL,
+    PRODUCT_SINK_DIR, PRODUCT_SINK_FORMATS
+)
+from page_objects.home_page import HomePage
+from page_objects.search_result_page import SearchResultPage
+from utilities.crawl_checkpoint import CrawlCheckpoint
+from utilities.http_crawler import HttpCrawlEngine
+from utilities.product_sink import ProductSink, get_shard_dir
+from utilities.utilities import SingletonLogger, DriverPool, get_worker_id
+
+# Per-process state of a pool worker, set up by init_worker
+_worker = {}
+
+
+class CrawlProgress:
+    """Running totals of a crawl and the throughput derived from them."""
+    def __init__(self, total_jobs: int):
+        self.total_jobs = total_jobs
+        self.pages = 0
+        self.products = 0
+        self.jobs_done = 0
+        self.jobs_failed = 0
+        self.start = time.perf_counter()
+
+    def update(self, pages=0, products=0, finished=False, failed=False):
+        self.pages += pages
+        self.products += products
+        self.jobs_done += finished
+        self.jobs_failed += failed
+
+    def as_dict(self) -> dict:
+        elapsed = time.perf_counter() - self.start
+        return {
+            "jobs": self.jobs_done,
+            "failed": self.jobs_failed,
+            "pages": self.pages,
+            "products": self.products,
+            "seconds": elapsed,
+            "pages_per_second": self.pages / elapsed if elapsed else 0.0,
+            "products_per_second": self.products / elapsed if elapsed else 0.0,
+            "error_rate": self.jobs_failed / self.jobs_done if self.jobs_done else 0.0
+        }
+
+    def line(self) -> str:
+        stats = self.as_dict()
+        return (f"[{stats['seconds']:6.1f}s] jobs {stats['jobs']}/{self.total_jobs} | pages {stats['pages']} "
+                f"({stats['pages_per_second']:.2f}/s) | products {stats['products']} "
+                f"({stats['products_per_second']:.1f}/s) | error rate {stats['error_rate']:.0%}")
+
+
+def build_jobs(terms, browsers, devices):
+    """Returns one (term, browser, device) job per combination; the HTTP engine only crawls as desktop."""
+    jobs = []
+    for term, browser_name, device in product(terms, browsers, devices):
+        job = (term, browser_name, "desktop" if browser_name == "http" else device)
+        if job not in jobs:
+            jobs.append(job)
+    return jobs
+
+
+def init_worker(progress_queue, shard_dir):
+    """Gives the pool process its worker id, log file, product sink shard and driver pool."""
+    os.environ["CRAWL_RUNNER_WORKER"] = f"crawl-{os.getpid()}"
+    singleton_logger = SingletonLogger()
+    _worker["progress"] = progress_queue
+    _worker["sink"] = ProductSink(shard_dir, get_worker_id())
+    _worker["driver_pool"] = DriverPool()
+    # Pool processes leave through multiprocessing's exit handlers, which skip atexit
+    Finalize(_worker["driver_pool"], _worker["driver_pool"].close, exitpriority=10)
+    Finalize(singleton_logger, singleton_logger.stop, exitpriority=0)
+
+
+def crawl_job(job, pages):
+    """
+    Crawls one (term, browser, device) job in the pool process.
+
+    :returns: dict: The job and the number of pages and products crawled, or the error that ended it.
+    """
+    term, browser_name, device = job
+    singleton_logger = SingletonLogger()
+    singleton_logger.bind(browser=browser_name, device=device, search_term=term)
+    logger = singleton_logger.get_logger()
+    crawled = {"pages": 0, "products": 0}
+
+    def page_crawled(browser, products_info, page_count=1):
+        _worker["sink"].add(term, browser, device, products_info)
+        crawled["pages"] += page_count
+        crawled["products"] += len(products_info)
+        _worker["progress"].put({"pages": page_count, "products": len(products_info)})
+
+    try:
+        if browser_name == "http":
+            crawl_over_http(term, pages, page_crawled)
+        else:
+            crawl_in_browser(term, browser_name, device, pages, logger, page_crawled)
+        _worker["sink"].flush()
+    except Exception as e:
+        logger.error(f"ERROR :: {browser_name} :: Crawl of {term} on {device} failed: {e!r}")
+        _worker["sink"].flush()
+        _worker["progress"].put({"finished": True, "failed": True})
+        return {"job": job, **crawled, "error": repr(e)}
+    finally:
+        singleton_logger.bind(browser=None, device=None, search_term=None)
+
+    _worker["progress"].put({"finished": True})
+    return {"job": job, **crawled, "error": None}
+
+
+def crawl_in_browser(term, browser_name, device, pages, logger, page_crawled):
+    """Searches for the term in a pooled session and streams every result page to page_crawled."""
+    driver = _worker["driver_pool"].acquire(browser_name)
+    try:
+        home_page = HomePage(driver, logger)
+        search_result_page = SearchResultPage(driver, logger)
+        if not home_page.open_amazon_website(device):
+            raise RuntimeError("Failed to open Amazon homepage")
+        if not home_page.search_product(term):
+            raise RuntimeError(f"Failed to search for {term}")
+
+        checkpoint = CrawlCheckpoint(term, device, search_result_page.browser_name)
+        for _, page_products in search_result_page.iter_result_pages(
+                max_pages=pages, search_term=term, device=device, checkpoint=checkpoint):
+            page_crawled(search_result_page.browser_name, page_products)
+    finally:
+        _worker["driver_pool"].release(driver)
+
+
+def crawl_over_http(term, pages, page_crawled):
+    """Fetches the result pages of the term with the HTTP crawl engine."""
+    engine = HttpCrawlEngine()
+    products_info = engine.crawl(term, pages=pages)
+    if engine.stats["errors"]:
+        raise RuntimeError(f"{engine.stats['errors']} of {pages} result pages could not be fetched")
+    page_crawled("http", products_info, page_count=engine.stats["pages"])
+
+
+def run_crawl(jobs, pages=CRAWL_PAGE_DEPTH, workers=CRAWL_RUNNER_WORKERS, output_dir=PRODUCT_SINK_DIR,
+              formats=PRODUCT_SINK_FORMATS, progress_interval=CRAWL_RUNNER_PROGRESS_INTERVAL, out=sys.stdout):
+    """
+    Runs the jobs in a process pool, printing live throughput every progress_interval seconds.
+
+    :returns: dict: Final "progress" totals, the merged "outputs" and the "failed" job results.
+    """
+    # Spawned processes start without the parent's threads and logger, which forked ones would inherit
+    context = multiprocessing.get_context("spawn")
+    progress_queue = context.Queue()
+    shard_dir = get_shard_dir(uuid.uuid4().hex, output_dir)
+    progress = CrawlProgress(len(jobs))
+    live = out.isatty()
+
+    def drain(timeout):
+        try:
+            progress.update(**progress_queue.get(timeout=timeout))
+            while True:
+                progress.update(**progress_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)) or 1, mp_context=context,
+                             initializer=init_worker, initargs=(progress_queue, shard_dir)) as executor:
+        futures = [executor.submit(crawl_job, job, pages) for job in jobs]
+        next_report = time.monotonic() + progress_interval
+        pending = futures
+        while pending:
+            pending = wait(pending, timeout=0)[1]
+            drain(0.2)
+            if time.monotonic() >= next_report:
+                print(progress.line(), end="\r" if live else "\n", file=out, flush=True)
+                next_report += progress_interval
+        results = [future.result() for future in futures]
+    drain(0.2)
+    print(progress.line(), file=out)
+
+    outputs = ProductSink.merge(shard_dir, output_dir, formats)
+    print(f"Merged {outputs['rows']} products into "
+          f"{', '.join(path for output_format, path in outputs.items() if output_format != 'rows')}", file=out)
+    failed = [result for result in results if result["error"]]
+    for result in failed:
+        print(f"Failed: {' / '.join(result['job'])}: {result['error']}", file=out)
+    return {"progress": progress.as_dict(), "outputs": outputs, "failed": failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms", nargs="+", default=SEARCH_ITEMS)
+    parser.add_argument("--browsers", nargs="+", default=["chrome"], choices=["chrome", "edge", "firefox", "http"])
+    parser.add_argument("--devices", nargs="+", default=["desktop"], choices=list(SCREEN_SIZES))
+    parser.add_argument("--pages", type=int, default=CRAWL_PAGE_DEPTH, help="Result pages crawled per search")
+    parser.add_argument("--workers", type=int, default=CRAWL_RUNNER_WORKERS, help="Worker processes")
+    parser.add_argument("--output-dir", default=PRODUCT_SINK_DIR)
+    parser.add_argument("--formats", default=",".join(PRODUCT_SINK_FORMATS), help="Comma-separated: csv,jsonl,parquet")
+    args = parser.parse_args()
+
+    result = run_crawl(build_jobs(args.terms, args.browsers, args.devices), args.pages, args.workers,
+                       args.output_dir, args.formats.split(","))
+    sys.exit(1 if result["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import json
+import re
+import statistics
+import time
+import pytest
+from configs.configs import DURATION_STORE_PATH, DURATION_HISTORY_WEIGHT
+from utilities.utilities import FileLock, write_atomically
+
+BIN_GROUP_PREFIX = "duration_bin_"
+# xdist appends "@<group>" to the node ids of grouped tests
+GROUP_SUFFIX = re.compile(r"@[^:/\[\]]+$")
+
+class DurationStore:
+    """Moving-average duration of every test node id, kept in a JSON file shared by all runs."""
+    def __init__(self, path: str = DURATION_STORE_PATH, weight: float = DURATION_HISTORY_WEIGHT):
+        self.path = path
+        self.weight = weight
+
+    def load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as store_file:
+                return json.load(store_file).get("durations", {})
+        except (OSError, ValueError):
+            return {}
+
+    def update(self, observed: dict):
+        """Folds the durations observed in this run into the history."""
+        with FileLock(f"{self.path}.lock"):
+            durations = self.load()
+            for nodeid, seconds in observed.items():
+                previous = durations.get(nodeid)
+                durations[nodeid] = seconds if previous is None else \
+                    self.weight * seconds + (1 - self.weight) * previous
+            write_atomically(self.path, json.dumps({"durations": durations}, indent=1, sort_keys=True))
+
+def chunk_key(item, split_by_search_term=False):
+    """Tests of one class and browser form a chunk, so a worker keeps the browser session warm."""
+    params = item.callspec.params if hasattr(item, "callspec") else {}
+    key = ("::".join(item.nodeid.split("::")[:2]), params.get("setup"))
+    return key + (params.get("search_term"),) if split_by_search_term else key
+
+def plan_bins(items, bin_count: int, durations: dict):
+    """
+    Splits items into bin_count bins of near-equal predicted duration (longest processing time first).
+
+    Chunks longer than an even share are split by search term. Tests without history are estimated
+    from the median of their browser, or of all tests; with no history at all chunks go round-robin.
+
+    :returns: tuple: The bin index of every item's node id and the predicted seconds of every bin.
+    """
+    known = {}
+    for item in items:
+        if item.nodeid in durations:
+            known.setdefault(chunk_key(item)[1], []).append(durations[item.nodeid])
+    all_known = [seconds for values in known.values() for seconds in values]
+
+    def estimate(item):
+        if item.nodeid in durations:
+            return durations[item.nodeid]
+        browser_known = known.get(chunk_key(item)[1])
+        return statistics.median(browser_known or all_known) if all_known else 1.0
+
+    chunks = {}
+    for item in items:
+        chunks.setdefault(chunk_key(item), []).append(item)
+
+    if all_known:
+        share = sum(estimate(item) for item in items) / bin_count
+        for key, chunk_items in list(chunks.items()):
+            if sum(estimate(item) for item in chunk_items) > share:
+                del chunks[key]
+                for item in chunk_items:
+                    chunks.setdefault(chunk_key(item, split_by_search_term=True), []).append(item)
+        order = sorted(chunks, key=lambda key: sum(estimate(item) for item in chunks[key]), reverse=True)
+    else:
+        order = list(chunks)
+
+    loads = [0.0] * bin_count
+    browsers = [set() for _ in range(bin_count)]
+    assignment = {}
+    for position, key in enumerate(order):
+        chunk_seconds = sum(estimate(item) for item in chunks[key])
+        if all_known:
+            # Least loaded bin; on a tie prefer one that already runs this browser
+            bin_index = min(range(bin_count), key=lambda index: (loads[index], key[1] not in browsers[index]))
+        else:
+            bin_index = position % bin_count
+        loads[bin_index] += chunk_seconds
+        browsers[bin_index].add(key[1])
+        for item in chunks[key]:
+            assignment[item.nodeid] = bin_index
+    return assignment, loads
+
+class DurationScheduler:
+    """
+    Balances the browser x device x search term matrix over xdist workers using recorded durations.
+
+    The worker processes mark every test with an xdist_group bin planned from the history, and the
+    controller runs them with --dist loadgroup, so each worker receives one bin. The controller
+    records every test's duration and reports predicted against actual wall time.
+    """
+    def __init__(self, config, store: DurationStore = None):
+        self.config = config
+        self.store = store or DurationStore()
+        self.observed = {}
+        self.skipped = set()
+        self.worker_seconds = {}
+        self.plan = None
+        self.started = None
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        if node.config.option.dist == "loadgroup":
+            node.workerinput["duration_history"] = self.store.load()
+
+    def pytest_sessionstart(self, session):
+        self.started = time.perf_counter()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_collection_modifyitems(self, config, items):
+        # Plan only the tests left after -k/-m deselection and any reordering
+        yield
+        workerinput = getattr(config, "workerinput", None)
+        if not workerinput or "duration_history" not in workerinput:
+            return
+        items_to_plan = [item for item in items if not item.get_closest_marker("xdist_group")]
+        history = workerinput["duration_history"]
+        assignment, loads = plan_bins(items_to_plan, workerinput["workercount"], history)
+        known = sum(item.nodeid in history for item in items_to_plan)
+        for item in items_to_plan:
+            group = f"{BIN_GROUP_PREFIX}{assignment[item.nodeid]}"
+            item.add_marker(pytest.mark.xdist_group(group))
+            # The suffix the loadgroup scheduler reads the group from, as xdist's worker adds it for static marks
+            item._nodeid = f"{item.nodeid}@{group}"
+        config.workeroutput["duration_plan"] = {
+            "bins": loads,
+            "known": known,
+            "tests": len(items_to_plan)
+        }
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        self.plan = self.plan or getattr(node, "workeroutput", {}).get("duration_plan")
+
+    def pytest_runtest_logreport(self, report):
+        if hasattr(self.config, "workerinput"):
+            return
+        nodeid = GROUP_SUFFIX.sub("", report.nodeid)
+        if report.skipped:
+            self.skipped.add(nodeid)
+        self.observed[nodeid] = self.observed.get(nodeid, 0.0) + report.duration
+        match = re.search(rf"@{BIN_GROUP_PREFIX}(\d+)$", report.nodeid)
+        if match:
+            bin_index = int(match.group(1))
+            self.worker_seconds[bin_index] = self.worker_seconds.get(bin_index, 0.0) + report.duration
+
+    def pytest_sessionfinish(self, session):
+        if hasattr(self.config, "workerinput"):
+            return
+        self.wall_seconds = time.perf_counter() - self.started
+        observed = {nodeid: seconds for nodeid, seconds in self.observed.items() if nodeid not in self.skipped}
+        if observed:
+            self.store.update(observed)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.plan:
+            return
+        terminalreporter.section("Duration scheduling")
+        if not self.plan["known"]:
+            terminalreporter.write_line(f"no duration history yet, round-robin; actual={self.wall_seconds:.1f}s")
+            return
+        terminalreporter.write_line(
+            f"predicted={max(self.plan['bins']):.1f}s actual={self.wall_seconds:.1f}s "
+            f"history={self.plan['known']}/{self.plan['tests']} tests")
+        for bin_index, predicted in enumerate(self.plan["bins"]):
+            terminalreporter.write_line(
+                f"bin {bin_index}: predicted={predicted:.1f}s actual={self.worker_seconds.get(bin_index, 0.0):.1f}s")
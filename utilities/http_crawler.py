@@ -0,0 +1,112 @@
+import asyncio
+import time
+from configs.configs import BASE_URL, TIMEOUT, HTTP_CRAWL_CONCURRENCY, HTTP_CRAWL_HEADERS, RATE_LIMIT_MAX_RETRIES
+from page_objects.base_page import BasePage
+from page_objects.search_result_page import SearchResultPage
+from utilities.rate_limiter import HostRateLimiter
+from utilities.utilities import SingletonLogger
+
+def parse_search_results(page_source, base_url=BASE_URL):
+    """
+    Parses search result cards out of a page's HTML with the XPaths defined on SearchResultPage.
+
+    :param page_source: HTML of a search result page.
+    :param base_url: URL relative product links are resolved against.
+    :returns: list: Product dicts in the same schema as SearchResultPage.extract_product_information.
+    """
+    return SearchResultPage.parse_result_page(page_source, base_url)[0]
+
+class HttpCrawlEngine:
+    """
+    Crawls search result pages over pooled HTTP connections instead of driving a browser.
+
+    Search and "&page=N" URLs are built directly and fetched concurrently; the cards are parsed
+    with the SearchResultPage XPaths, so the product dicts match the browser path. Requests draw from
+    the same host rate limiter as the browser sessions and back off on the traffic error page.
+    """
+    def __init__(self, base_url: str = BASE_URL, concurrency: int = HTTP_CRAWL_CONCURRENCY, timeout: float = TIMEOUT,
+                 rate_limiter: HostRateLimiter = None):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or HostRateLimiter.for_url(base_url)
+        self.logger = SingletonLogger().get_logger()
+        self.stats = {"pages": 0, "errors": 0, "retries": 0, "seconds": 0.0}
+
+    def _log(self, message, is_error=False):
+        """Centralized logging method."""
+        log_method = self.logger.error if is_error else self.logger.info
+        log_method(f"{'ERROR' if is_error else 'INFO'} :: http :: {message}")
+
+    def crawl(self, search_term, pages=2):
+        """
+        Fetches the first pages of results for one search term.
+
+        :returns: list: Product dicts of all pages, in page order.
+        """
+        return self.crawl_many([search_term], pages)[search_term]
+
+    def crawl_many(self, search_terms, pages=2):
+        """
+        Fetches the first pages of results for every search term concurrently.
+
+        :returns: dict: Search term to its product dicts in page order, each ASIN once.
+        """
+        start = time.perf_counter()
+        results = asyncio.run(self._crawl(search_terms, pages))
+        self.stats["seconds"] += time.perf_counter() - start
+        self._log(f"Fetched {self.stats['pages']} pages at {self.pages_per_second:.1f} pages/s "
+                  f"({self.stats['errors']} errors).")
+        return results
+
+    @property
+    def pages_per_second(self):
+        return self.stats["pages"] / self.stats["seconds"] if self.stats["seconds"] else 0.0
+
+    async def _crawl(self, search_terms, pages):
+        # aiohttp is imported on first use, so collecting tests that never crawl over HTTP skips it
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HTTP_CRAWL_HEADERS) as session:
+            jobs = [
+                self._fetch_page(session, term, page)
+                for term in search_terms
+                for page in range(1, pages + 1)
+            ]
+            page_results = await asyncio.gather(*jobs)
+
+        results = {term: [] for term in search_terms}
+        seen_asins = {term: set() for term in search_terms}
+        for term, products_info in page_results:
+            results[term].extend(SearchResultPage.dedupe_by_asin(products_info, seen_asins[term]))
+        return results
+
+    async def _fetch_page(self, session, search_term, page):
+        import aiohttp
+
+        url = SearchResultPage.build_search_url(self.base_url, search_term, page)
+        try:
+            for retry in range(RATE_LIMIT_MAX_RETRIES + 1):
+                # The limiter's state is shared through a FileLock that blocks while it is contended, so
+                # its calls run in the default executor instead of stalling every fetch on the event loop
+                await asyncio.sleep(await asyncio.to_thread(self.rate_limiter.reserve))
+                async with session.get(url) as response:
+                    page_source = await response.text()
+                    if BasePage.TEXT_TRAFFIC_ERROR not in page_source:
+                        response.raise_for_status()
+                        await asyncio.to_thread(self.rate_limiter.record_success)
+                        break
+                backoff = await asyncio.to_thread(self.rate_limiter.record_traffic_error)
+                if retry == RATE_LIMIT_MAX_RETRIES:
+                    raise aiohttp.ClientError(f"traffic error page after {RATE_LIMIT_MAX_RETRIES} retries")
+                self.stats["retries"] += 1
+                await asyncio.sleep(backoff)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.stats["errors"] += 1
+            self._log(f"Failed to fetch page {page} for {search_term}: {e!r}", is_error=True)
+            return search_term, []
+
+        self.stats["pages"] += 1
+        return search_term, parse_search_results(page_source, str(response.url))
@@ -0,0 +1,89 @@
+"""
+Profiles how long the test session and each browser driver take to import.
+
+Every root is imported in a fresh interpreter started with -X importtime, so modules already loaded
+by the running session do not hide their cost.
+
+Usage:
+    python -m utilities.import_profile
+"""
+import subprocess
+import sys
+import threading
+from configs.configs import PROJECT_ROOT, IMPORT_PROFILE_ROOTS, IMPORT_PROFILE_TOP
+
+
+def parse_importtime(output: str, top: int = IMPORT_PROFILE_TOP) -> dict:
+    """
+    Parses the "import time: self [us] | cumulative | imported package" lines of -X importtime.
+
+    :returns: dict: "seconds" spent importing in total, "modules" imported, and the "heaviest" top
+        (package, seconds) pairs, summing the own import time of every module under a top-level package.
+    """
+    by_package = {}
+    modules = 0
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        by_package[package] = by_package.get(package, 0.0) + int(self_us) / 1e6
+        modules += 1
+
+    heaviest = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {"seconds": sum(by_package.values()), "modules": modules, "heaviest": heaviest}
+
+
+def profile_imports(modules, top: int = IMPORT_PROFILE_TOP) -> dict:
+    """Imports the modules in a fresh interpreter; returns its parse_importtime profile, or the "error"."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if completed.returncode:
+        # The last stderr line is the exception; a child killed before writing one leaves only its exit code
+        stderr_lines = completed.stderr.strip().splitlines()
+        return {"error": stderr_lines[-1] if stderr_lines else f"exited with code {completed.returncode}"}
+    return parse_importtime(completed.stderr, top)
+
+
+class ImportProfiler:
+    """Profiles every root in a background thread, so the report gets it without delaying the tests."""
+    def __init__(self, roots=IMPORT_PROFILE_ROOTS, top: int = IMPORT_PROFILE_TOP):
+        self.roots = roots
+        self.top = top
+        self.profiles = {}
+        self._thread = threading.Thread(target=self._run, name="import-profile", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        for label, modules in self.roots.items():
+            # A root that cannot be profiled is reported without losing the roots after it
+            try:
+                self.profiles[label] = profile_imports(modules, self.top)
+            except Exception as e:
+                self.profiles[label] = {"error": repr(e)}
+
+    def results(self, timeout=None) -> dict:
+        """Waits for the profiles; roots not profiled within the timeout are left out."""
+        self._thread.join(timeout)
+        return dict(self.profiles)
+
+
+def format_profile(profile: dict) -> str:
+    if "error" in profile:
+        return f"failed: {profile['error']}"
+    heaviest = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in profile["heaviest"])
+    return f"{profile['seconds'] * 1000:.0f} ms for {profile['modules']} modules (heaviest: {heaviest})"
+
+
+def main():
+    for label, profile in ImportProfiler().start().results().items():
+        print(f"{label}: {format_profile(profile)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Merges the per-worker log files in logs/ into one time-ordered log.
+
+Text records are ordered by their timestamp (second resolution, ties keep file order); structured
+JSON records (LOG_STRUCTURED=1) are ordered by their exact "ts" field. Rotated backups are read
+oldest first and every file is streamed, so memory use does not grow with the log size.
+
+Usage:
+    python -m utilities.log_merge --output logs/automation.merged.log
+"""
+import argparse
+import heapq
+import json
+import os
+import re
+from datetime import datetime
+from glob import glob
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
+TEXT_TIMESTAMP_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+TEXT_TIMESTAMP_LENGTH = len("02/12/2025 10:04:27 AM")
+MERGED_LOG_NAME = "automation.merged.log"
+
+
+def find_log_files(log_dir=LOG_DIR):
+    """Groups every worker's log with its rotated backups, oldest backup first."""
+    groups = {}
+    for path in glob(os.path.join(log_dir, "automation*.log*")):
+        name = os.path.basename(path)
+        if name.startswith(MERGED_LOG_NAME) or name.endswith(".tmp"):
+            continue
+        match = re.match(r"(?P<base>.+?\.log)(?:\.(?P<backup>\d+))?$", name)
+        if match:
+            backup = int(match.group("backup") or 0)
+            groups.setdefault(match.group("base"), []).append((backup, path))
+    return {base: [path for _, path in sorted(paths, reverse=True)] for base, paths in groups.items()}
+
+
+def record_timestamp(line):
+    """Returns the epoch timestamp of a record's first line, or None for a continuation line."""
+    if line.startswith("{"):
+        try:
+            return float(json.loads(line)["ts"])
+        except (ValueError, KeyError, TypeError):
+            return None
+    try:
+        return datetime.strptime(line[:TEXT_TIMESTAMP_LENGTH], TEXT_TIMESTAMP_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+def iter_records(paths):
+    """Streams (timestamp, record) pairs; continuation lines such as tracebacks stay with their record."""
+    timestamp, lines = None, []
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as log_file:
+            for line in log_file:
+                line_timestamp = record_timestamp(line)
+                if line_timestamp is None and lines:
+                    lines.append(line)
+                    continue
+                if lines:
+                    yield timestamp, "".join(lines)
+                timestamp, lines = line_timestamp or 0.0, [line]
+    if lines:
+        yield timestamp, "".join(lines)
+
+
+def merge_logs(output_path, log_dir=LOG_DIR):
+    """
+    Writes every worker's records into output_path in time order.
+
+    :returns: int: The number of records merged.
+    """
+    streams = [iter_records(paths) for paths in find_log_files(log_dir).values()]
+    records = 0
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        for _, record in heapq.merge(*streams, key=lambda item: item[0]):
+            output_file.write(record if record.endswith("\n") else record + "\n")
+            records += 1
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log-dir", default=LOG_DIR)
+    parser.add_argument("--output", default=os.path.join(LOG_DIR, MERGED_LOG_NAME))
+    args = parser.parse_args()
+    records = merge_logs(args.output, args.log_dir)
+    print(f"Merged {records} records into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import base64
+import json
+import re
+import weakref
+from collections import OrderedDict
+from selenium.common.exceptions import WebDriverException
+from configs.configs import EXTRACTION_MODE, NETWORK_CAPTURE_URL_PATTERN, NETWORK_CAPTURE_MAX_RESPONSES
+
+class NetworkCapture:
+    """
+    Search result documents a Chrome or Edge session received, read from its DevTools performance log.
+
+    The browsers are started with performance logging when EXTRACTION_MODE is "network". poll() drains
+    the log, keeps only finished responses whose URL matches NETWORK_CAPTURE_URL_PATTERN and fetches
+    their bodies with Network.getResponseBody while the page that loaded them is still open; every
+    other event is dropped right away. At most NETWORK_CAPTURE_MAX_RESPONSES bodies are kept.
+    """
+    _captures = weakref.WeakKeyDictionary()
+
+    def __init__(self, driver, url_pattern: str = NETWORK_CAPTURE_URL_PATTERN,
+                 max_responses: int = NETWORK_CAPTURE_MAX_RESPONSES):
+        self.driver = driver
+        self.url_pattern = re.compile(url_pattern)
+        self.max_responses = max_responses
+        # Request id to URL of matching responses, until they finished loading and their body was read
+        self._requests = OrderedDict()
+        self._finished = set()
+        self._bodies = OrderedDict()
+
+    @classmethod
+    def for_driver(cls, driver, mode: str = EXTRACTION_MODE):
+        """Returns the session's capture, or None when the mode or browser does not capture responses."""
+        if mode != "network" or not hasattr(driver, "execute_cdp_cmd"):
+            return None
+        if driver not in cls._captures:
+            cls._captures[driver] = cls(driver)
+        return cls._captures[driver]
+
+    def poll(self):
+        """Drains the performance log and reads the bodies of the matching responses that finished loading."""
+        try:
+            entries = self.driver.get_log("performance")
+        except WebDriverException:
+            return
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            params = message.get("params", {})
+            if message["method"] == "Network.responseReceived":
+                response = params["response"]
+                if (params.get("type") == "Document" and response.get("status") == 200
+                        and self.url_pattern.search(response["url"])):
+                    self._requests[params["requestId"]] = response["url"]
+            elif message["method"] == "Network.loadingFinished" and params["requestId"] in self._requests:
+                self._finished.add(params["requestId"])
+
+        for request_id in [request_id for request_id in self._requests if request_id in self._finished]:
+            body = self._read_body(request_id)
+            if body is None:
+                continue
+            url = self._requests.pop(request_id)
+            self._finished.discard(request_id)
+            self._bodies[url] = body
+            self._bodies.move_to_end(url)
+
+        # Responses of tabs that were closed before their body was read are given up on
+        while len(self._requests) > self.max_responses:
+            self._finished.discard(self._requests.popitem(last=False)[0])
+        while len(self._bodies) > self.max_responses:
+            self._bodies.popitem(last=False)
+
+    def take(self, url: str):
+        """Returns and forgets the captured body of the document loaded from url, or None."""
+        return self._bodies.pop(url.split("#")[0], None)
+
+    def _read_body(self, request_id):
+        """Reads a response body from the current tab; None if it belongs to another tab or is gone."""
+        try:
+            result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except WebDriverException:
+            return None
+        if result.get("base64Encoded"):
+            return base64.b64decode(result["body"]).decode("utf-8", errors="replace")
+        return result["body"]
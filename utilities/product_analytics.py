@@ -0,0 +1,175 @@
+"""
+Columnar post-processing of the product sink output.
+
+Loads product_info.parquet (or .csv) into a pandas frame, parses prices and ratings into numeric
+columns with vectorized string operations, and computes per term/browser/device aggregates and a
+cross-browser consistency report of the result sets.
+
+Usage:
+    python -m utilities.product_analytics --input test_data/product_info.csv --check
+"""
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+from configs.configs import PRODUCT_SINK_DIR, ANALYTICS_MIN_OVERLAP, PRODUCT_SUMMARY_PATH
+
+GROUP_COLUMNS = ["term", "browser", "device"]
+# Sink columns the analytics read; names and URLs are not loaded
+ANALYSIS_COLUMNS = GROUP_COLUMNS + ["asin", "price", "rating"]
+RATING_BINS = [0, 1, 2, 3, 4, 5]
+RATING_LABELS = ["rating_0_1", "rating_1_2", "rating_2_3", "rating_3_4", "rating_4_5"]
+
+
+def find_product_table(data_dir=PRODUCT_SINK_DIR):
+    """Returns the merged product table to analyse, preferring Parquet over CSV."""
+    for extension in ("parquet", "csv"):
+        path = os.path.join(data_dir, f"product_info.{extension}")
+        if os.path.isfile(path):
+            return path
+    raise FileNotFoundError(f"No product_info.parquet or product_info.csv in {data_dir}")
+
+
+def load_products(path):
+    """Loads the analysed columns of a merged product table; CSV values are text, Parquet adds parsed numbers."""
+    if path.endswith(".parquet"):
+        # The Parquet table is typed: its price_value and rating_value columns are already parsed
+        frame = pd.read_parquet(path, columns=ANALYSIS_COLUMNS + ["price_value", "rating_value"])
+    else:
+        dtypes = {column: "category" if column in GROUP_COLUMNS else str for column in ANALYSIS_COLUMNS}
+        frame = pd.read_csv(path, usecols=ANALYSIS_COLUMNS, dtype=dtypes, keep_default_na=False)
+    return prepare(frame)
+
+
+def parse_distinct(values, parser):
+    """
+    Applies a vectorized text parser to the distinct values only and maps the results back.
+
+    Prices and ratings repeat heavily across terms, browsers and devices, so this parses a small
+    fraction of the rows; missing values (factorize code -1) pick the NaN appended at the end.
+    """
+    codes, distinct = pd.factorize(values)
+    parsed = np.append(parser(pd.Series(distinct, dtype=object).astype(str)).to_numpy(dtype="float64"), np.nan)
+    return pd.Series(parsed[codes], index=values.index)
+
+
+def parse_prices(prices):
+    """Parses "Rs. 1,299"-style prices into float64; "N/A" and other text become NaN."""
+    def parser(distinct):
+        digits = distinct.str.extract(r"(\d[\d,]*(?:\.\d+)?)", expand=False)
+        return pd.to_numeric(digits.str.replace(",", "", regex=False), errors="coerce")
+    return parse_distinct(prices, parser)
+
+
+def parse_ratings(ratings):
+    """Parses rating tokens such as "4.2" into float64; "N/A" becomes NaN."""
+    return parse_distinct(ratings, lambda distinct: pd.to_numeric(distinct, errors="coerce"))
+
+
+def prepare(frame):
+    """Adds numeric price_value and rating_value columns unless already typed; makes grouping columns categorical."""
+    missing = [column for column in ANALYSIS_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Product table is missing columns: {missing}")
+    frame = frame.copy()
+    for column in GROUP_COLUMNS:
+        frame[column] = frame[column].astype("category")
+    if "price_value" not in frame.columns:
+        frame["price_value"] = parse_prices(frame["price"])
+    if "rating_value" not in frame.columns:
+        frame["rating_value"] = parse_ratings(frame["rating"])
+    return frame
+
+
+def aggregate(frame):
+    """
+    Computes per term/browser/device product counts, price percentiles and the rating distribution.
+
+    :returns: DataFrame: One row per group with count, priced, price_p10/p50/p90, rating_mean and
+        the number of products in each rating band.
+    """
+    grouped = frame.groupby(GROUP_COLUMNS, observed=True)
+    summary = grouped.agg(
+        count=("asin", "size"),
+        priced=("price_value", "count"),
+        rated=("rating_value", "count"),
+        rating_mean=("rating_value", "mean")
+    )
+
+    percentiles = grouped["price_value"].quantile([0.1, 0.5, 0.9]).unstack()
+    percentiles.columns = ["price_p10", "price_p50", "price_p90"]
+
+    bands = pd.cut(frame["rating_value"], bins=RATING_BINS, labels=RATING_LABELS, include_lowest=True)
+    distribution = pd.crosstab([frame[column] for column in GROUP_COLUMNS], bands).reindex(
+        columns=RATING_LABELS, fill_value=0)
+
+    return summary.join(percentiles).join(distribution).fillna({label: 0 for label in RATING_LABELS}).reset_index()
+
+
+def cross_browser_consistency(frame, exclude_browsers=("http",)):
+    """
+    Compares the ASIN sets different browsers extracted for the same term and device.
+
+    Rows of the browser-free HTTP engine are left out by default; it crawls a different page depth.
+
+    :returns: DataFrame: One row per term and device crawled by more than one browser, with the number
+        of browsers, distinct ASINs, ASINs every browser found, and overlap (shared / distinct).
+    """
+    rows = (frame["asin"] != "N/A") & ~frame["browser"].isin(exclude_browsers)
+    listings = frame.loc[rows, ["term", "device", "browser", "asin"]].drop_duplicates()
+    browsers = listings.groupby(["term", "device"], observed=True)["browser"].nunique().rename("browsers")
+    found_by = listings.groupby(["term", "device", "asin"], observed=True)["browser"].nunique().rename("found_by")
+    found_by = found_by.reset_index().join(browsers, on=["term", "device"])
+    found_by["shared"] = found_by["found_by"] == found_by["browsers"]
+
+    report = found_by.groupby(["term", "device"], observed=True).agg(
+        browsers=("browsers", "first"),
+        asins=("asin", "size"),
+        shared=("shared", "sum")
+    )
+    report["overlap"] = report["shared"] / report["asins"]
+    return report[report["browsers"] > 1].reset_index()
+
+
+def inconsistent_groups(report, min_overlap=ANALYTICS_MIN_OVERLAP):
+    """Returns the rows of a cross_browser_consistency report whose overlap is below min_overlap."""
+    return report[report["overlap"] < min_overlap]
+
+
+def assert_cross_browser_consistency(frame, min_overlap=ANALYTICS_MIN_OVERLAP):
+    """Raises AssertionError listing every term and device whose browsers disagree on the result set."""
+    report = cross_browser_consistency(frame)
+    inconsistent = inconsistent_groups(report, min_overlap)
+    assert inconsistent.empty, (
+        f"Result sets differ between browsers (overlap below {min_overlap:.0%}):\n"
+        f"{inconsistent.to_string(index=False)}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="Merged product table (defaults to test_data/product_info.parquet or .csv)")
+    parser.add_argument("--output", default=PRODUCT_SUMMARY_PATH, help="CSV file for the per-group aggregates")
+    parser.add_argument("--check", action="store_true", help="Fail when browsers disagree on a result set")
+    parser.add_argument("--min-overlap", type=float, default=ANALYTICS_MIN_OVERLAP)
+    args = parser.parse_args()
+
+    frame = load_products(args.input or find_product_table())
+    summary = aggregate(frame)
+    summary.to_csv(args.output, index=False)
+    print(f"Wrote aggregates of {len(frame)} products in {len(summary)} groups to {args.output}")
+
+    report = cross_browser_consistency(frame)
+    if not report.empty:
+        print(report.to_string(index=False))
+    if args.check:
+        try:
+            assert_cross_browser_consistency(frame, args.min_overlap)
+        except AssertionError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
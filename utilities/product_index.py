@@ -0,0 +1,144 @@
+import json
+import os
+import sqlite3
+import time
+from urllib.parse import urlsplit
+from configs.configs import PRODUCT_INDEX_PATH
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS products (
+        asin TEXT PRIMARY KEY,
+        name TEXT,
+        price TEXT,
+        rating TEXT,
+        url TEXT,
+        first_seen_run TEXT NOT NULL,
+        changed_run TEXT NOT NULL
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS listings (
+        term TEXT NOT NULL,
+        asin TEXT NOT NULL,
+        first_seen_run TEXT NOT NULL,
+        PRIMARY KEY (term, asin)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS listings_by_asin ON listings (asin);
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id TEXT PRIMARY KEY,
+        finished REAL NOT NULL,
+        diff TEXT NOT NULL
+    );
+"""
+
+def canonical_url(url: str, asin: str) -> str:
+    """
+    Returns the stable product URL, <scheme>://<host>/dp/<ASIN>.
+
+    Result links carry per-request parameters (ref, qid, sr, ...) and a slug that vary between runs,
+    so comparing them as crawled would count every product as changed.
+    """
+    if not url or url == "N/A":
+        return url
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/dp/{asin}" if parts.netloc else f"/dp/{asin}"
+
+class ProductIndex:
+    """
+    Persistent SQLite index of crawled products keyed by ASIN, with the terms each one is listed under.
+
+    A run's rows are staged in temporary tables and compared with set-based queries, so only new,
+    changed and removed products are written: unchanged products cost a read, not a write.
+    """
+    def __init__(self, path: str = PRODUCT_INDEX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def apply_run(self, rows, run_id: str) -> dict:
+        """
+        Folds one run's product rows (dicts with the sink columns) into the index.
+
+        Removals are only reported for the search terms the run crawled.
+
+        :returns: dict: The run's diff: "new" and "removed" (term, ASIN) listings, "price_changed"
+            products with old and new price, and counts of "updated", "unchanged" and "without_asin" rows.
+        """
+        connection = self.connection
+        without_asin = 0
+        with connection:
+            connection.execute("CREATE TEMP TABLE IF NOT EXISTS run_products "
+                               "(asin TEXT PRIMARY KEY, name TEXT, price TEXT, rating TEXT, url TEXT)")
+            connection.execute("CREATE TEMP TABLE IF NOT EXISTS run_listings "
+                               "(term TEXT, asin TEXT, PRIMARY KEY (term, asin))")
+            connection.execute("DELETE FROM run_products")
+            connection.execute("DELETE FROM run_listings")
+
+            products, listings = [], []
+            for row in rows:
+                asin = row.get("asin")
+                if not asin or asin == "N/A":
+                    without_asin += 1
+                    continue
+                products.append((asin, row["name"], row["price"], row["rating"], canonical_url(row["url"], asin)))
+                listings.append((row["term"], asin))
+            # The first sighting of an ASIN in the run wins, like the crawl's own de-duplication
+            connection.executemany("INSERT OR IGNORE INTO run_products VALUES (?, ?, ?, ?, ?)", products)
+            connection.executemany("INSERT OR IGNORE INTO run_listings VALUES (?, ?)", listings)
+
+            price_changed = [
+                {"asin": asin, "name": name, "old_price": old_price, "new_price": new_price}
+                for asin, name, old_price, new_price in connection.execute(
+                    "SELECT r.asin, r.name, p.price, r.price FROM run_products r "
+                    "JOIN products p ON p.asin = r.asin WHERE p.price IS NOT r.price ORDER BY r.asin")
+            ]
+            updated = connection.execute(
+                "UPDATE products SET (name, price, rating, url, changed_run) = "
+                "(SELECT r.name, r.price, r.rating, r.url, ? FROM run_products r WHERE r.asin = products.asin) "
+                "WHERE asin IN (SELECT r.asin FROM run_products r JOIN products p ON p.asin = r.asin "
+                "WHERE p.name IS NOT r.name OR p.price IS NOT r.price OR p.rating IS NOT r.rating "
+                "OR p.url IS NOT r.url)", (run_id,)).rowcount
+            inserted = connection.execute(
+                "INSERT INTO products SELECT r.asin, r.name, r.price, r.rating, r.url, ?, ? FROM run_products r "
+                "WHERE NOT EXISTS (SELECT 1 FROM products p WHERE p.asin = r.asin)", (run_id, run_id)).rowcount
+
+            new = [list(listing) for listing in connection.execute(
+                "SELECT term, asin FROM run_listings r WHERE NOT EXISTS "
+                "(SELECT 1 FROM listings l WHERE l.term = r.term AND l.asin = r.asin) ORDER BY term, asin")]
+            connection.execute(
+                "INSERT OR IGNORE INTO listings SELECT term, asin, ? FROM run_listings", (run_id,))
+            removed = [list(listing) for listing in connection.execute(
+                "SELECT term, asin FROM listings l WHERE term IN (SELECT DISTINCT term FROM run_listings) "
+                "AND NOT EXISTS (SELECT 1 FROM run_listings r WHERE r.term = l.term AND r.asin = l.asin) "
+                "ORDER BY term, asin")]
+            connection.executemany("DELETE FROM listings WHERE term = ? AND asin = ?", removed)
+
+            run_product_count = connection.execute("SELECT COUNT(*) FROM run_products").fetchone()[0]
+            diff = {
+                "run_id": run_id,
+                "new": new,
+                "removed": removed,
+                "price_changed": price_changed,
+                "inserted": inserted,
+                "updated": updated,
+                "unchanged": run_product_count - inserted - updated,
+                "without_asin": without_asin
+            }
+            connection.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?)",
+                               (run_id, time.time(), json.dumps(diff, ensure_ascii=False)))
+        return diff
+
+    def lookup(self, asin: str):
+        """Returns the indexed product for an ASIN, or None."""
+        row = self.connection.execute(
+            "SELECT asin, name, price, rating, url FROM products WHERE asin = ?", (asin,)).fetchone()
+        return dict(zip(("asin", "name", "price", "rating", "url"), row)) if row else None
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def write_diff(diff: dict, path: str):
+        """Writes a run's diff as compact JSON."""
+        with open(path, "w", encoding="utf-8") as diff_file:
+            json.dump(diff, diff_file, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,182 @@
+import csv
+import functools
+import json
+import os
+import re
+import shutil
+from glob import glob
+from configs.configs import PRODUCT_SINK_DIR, PRODUCT_SINK_FORMATS, PRODUCT_SINK_FLUSH_ROWS
+
+PRODUCT_COLUMNS = ["term", "browser", "device", "asin", "name", "price", "rating", "url"]
+# Product dict keys (as returned by the page objects) for each product column
+PRODUCT_FIELDS = {"asin": "ASIN", "name": "Name", "price": "Price", "rating": "Rating", "url": "URL"}
+# Rows per Parquet row group while merging, which bounds the memory the merge needs
+PARQUET_BATCH_ROWS = 50000
+# Parquet adds the parsed price and rating as float64 next to the raw text, which is kept as extracted
+PARQUET_TYPED_COLUMNS = {"price_value": "price", "rating_value": "rating"}
+PRICE_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+@functools.lru_cache(maxsize=4096)
+def parse_price(price: str):
+    """Parses a "Rs. 1,299"-style price into a float; None for "N/A" and other text."""
+    match = PRICE_PATTERN.search(price or "")
+    return float(match.group().replace(",", "")) if match else None
+
+@functools.lru_cache(maxsize=256)
+def parse_rating(rating: str):
+    """Parses a rating token such as "4.2" into a float; None for "N/A"."""
+    try:
+        return float(rating)
+    except (TypeError, ValueError):
+        return None
+
+def get_shard_dir(run_id: str, base_dir: str = PRODUCT_SINK_DIR) -> str:
+    """Returns the directory holding the worker shards of one test run."""
+    return os.path.join(base_dir, "shards", run_id)
+
+class ProductSink:
+    """
+    Buffers product rows in memory and appends them to one CSV shard per xdist worker.
+
+    Every worker owns its shard, so no two processes write the same file. The shards of a run are
+    merged into one table by ProductSink.merge once all workers are done.
+    """
+    def __init__(self, shard_dir: str, worker_id: str, flush_rows: int = PRODUCT_SINK_FLUSH_ROWS):
+        self.shard_path = os.path.join(shard_dir, f"product_info.{worker_id}.csv")
+        self.flush_rows = flush_rows
+        self.rows_written = 0
+        self._buffer = []
+        os.makedirs(shard_dir, exist_ok=True)
+
+    def add(self, term, browser, device, products_info):
+        """Adds the products extracted for one search term, browser and device."""
+        for product in products_info:
+            row = [term, browser, device]
+            row.extend(product.get(PRODUCT_FIELDS[column], "N/A") for column in PRODUCT_COLUMNS[3:])
+            self._buffer.append(row)
+        if len(self._buffer) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        """Appends the buffered rows to the shard."""
+        if not self._buffer:
+            return
+        write_header = not os.path.isfile(self.shard_path)
+        with open(self.shard_path, 'a', newline='', encoding='utf-8') as shard_file:
+            writer = csv.writer(shard_file)
+            if write_header:
+                writer.writerow(PRODUCT_COLUMNS)
+            writer.writerows(self._buffer)
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+
+    @staticmethod
+    def iter_shard_rows(shard_dir: str):
+        """Streams the rows of every shard in a run directory as dicts."""
+        for shard_path in sorted(glob(os.path.join(shard_dir, "product_info.*.csv"))):
+            with open(shard_path, newline='', encoding='utf-8') as shard_file:
+                yield from csv.DictReader(shard_file)
+
+    @classmethod
+    def merge(cls, shard_dir: str, output_dir: str = PRODUCT_SINK_DIR, formats=PRODUCT_SINK_FORMATS,
+              remove_shards: bool = True) -> dict:
+        """
+        Merges the shards of a run into product_info.<format> files, streaming rows so memory stays bounded.
+
+        :returns: dict: Output format to the path written and the number of rows merged.
+        """
+        writers = {}
+        rows_merged = 0
+        try:
+            # Opened one by one inside the try, so a writer that cannot open closes the ones before it
+            for output_format in formats:
+                writers[output_format] = cls._open_writer(output_format, output_dir)
+            for row in cls.iter_shard_rows(shard_dir):
+                for writer in writers.values():
+                    writer.write(row)
+                rows_merged += 1
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        if remove_shards:
+            shutil.rmtree(shard_dir, ignore_errors=True)
+        return {"rows": rows_merged, **{output_format: writer.path for output_format, writer in writers.items()}}
+
+    @staticmethod
+    def _open_writer(output_format: str, output_dir: str):
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"product_info.{output_format}")
+        writer_classes = {"csv": CsvTableWriter, "jsonl": JsonLinesTableWriter, "parquet": ParquetTableWriter}
+        if output_format not in writer_classes:
+            raise ValueError(f"Unsupported product sink format: {output_format}")
+        return writer_classes[output_format](path)
+
+# --------------------------
+# Table Writers
+# --------------------------
+class CsvTableWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=PRODUCT_COLUMNS)
+        self._writer.writeheader()
+
+    def write(self, row: dict):
+        self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+
+class JsonLinesTableWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, row: dict):
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self._file.close()
+
+class ParquetTableWriter:
+    """
+    Writes row groups of PARQUET_BATCH_ROWS rows; needs the optional pyarrow package.
+
+    The table is typed: term, browser and device are dictionary-encoded, and price_value and
+    rating_value hold the parsed price and rating as nullable float64 next to the raw text.
+    """
+    def __init__(self, path: str):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from e
+        self.path = path
+        self._pyarrow = pyarrow
+        category = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+        self._schema = pyarrow.schema(
+            [(column, category if column in ("term", "browser", "device") else pyarrow.string())
+             for column in PRODUCT_COLUMNS]
+            + [(column, pyarrow.float64()) for column in PARQUET_TYPED_COLUMNS]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+        self._batch = []
+
+    def write(self, row: dict):
+        typed = {"price_value": parse_price(row["price"]), "rating_value": parse_rating(row["rating"])}
+        self._batch.append({**row, **typed})
+        if len(self._batch) >= PARQUET_BATCH_ROWS:
+            self._write_batch()
+
+    def _write_batch(self):
+        if self._batch:
+            self._writer.write_table(self._pyarrow.Table.from_pylist(self._batch, schema=self._schema))
+            self._batch = []
+
+    def close(self):
+        self._write_batch()
+        self._writer.close()
@@ -0,0 +1,144 @@
+import json
+import os
+import random
+import re
+import time
+from urllib.parse import urlsplit
+from configs.configs import (
+    RATE_LIMIT_ENABLED, RATE_LIMIT_STATE_DIR, RATE_LIMIT_PER_SECOND, RATE_LIMIT_MIN_PER_SECOND, RATE_LIMIT_RECOVERY,
+    RATE_LIMIT_BURST, RATE_LIMIT_BACKOFF_BASE, RATE_LIMIT_BACKOFF_MAX, CIRCUIT_BREAKER_THRESHOLD,
+    CIRCUIT_BREAKER_COOLDOWN, CIRCUIT_BREAKER_MAX_COOLDOWN
+)
+from utilities.utilities import FileLock, write_atomically
+
+class HostRateLimiter:
+    """
+    Token bucket shared by every process that navigates to one host, with backoff and a circuit breaker.
+
+    The bucket is a small JSON state file updated under a FileLock, so xdist workers and crawl runner
+    processes draw from one budget instead of bursting at the host together. Navigations reserve the
+    next free slot of the bucket (generic cell rate algorithm), so waiting callers queue up in order.
+
+    A traffic error page halves the refill rate and returns an exponential backoff with jitter for
+    the caller; CIRCUIT_BREAKER_THRESHOLD consecutive errors open the circuit, which pauses every
+    process until the cooldown has passed. Successful navigations raise the rate again step by step,
+    so the limiter settles just below the rate the host tolerates.
+    """
+    _shared = {}
+
+    def __init__(self, host: str, state_dir: str = RATE_LIMIT_STATE_DIR, rate: float = RATE_LIMIT_PER_SECOND,
+                 min_rate: float = RATE_LIMIT_MIN_PER_SECOND, burst: int = RATE_LIMIT_BURST,
+                 backoff_base: float = RATE_LIMIT_BACKOFF_BASE, backoff_max: float = RATE_LIMIT_BACKOFF_MAX,
+                 threshold: int = CIRCUIT_BREAKER_THRESHOLD, cooldown: float = CIRCUIT_BREAKER_COOLDOWN,
+                 max_cooldown: float = CIRCUIT_BREAKER_MAX_COOLDOWN, enabled: bool = RATE_LIMIT_ENABLED):
+        self.host = host
+        self.path = os.path.join(state_dir, re.sub(r"[^\w.-]", "_", host) + ".json")
+        self.lock = FileLock(self.path + ".lock", timeout=30)
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.enabled = enabled
+        self.random = random.Random()
+        self.stats = {"navigations": 0, "waited": 0.0, "traffic_errors": 0, "circuit_opened": 0}
+
+    @classmethod
+    def for_url(cls, url: str):
+        """Returns the process-wide limiter of the URL's host."""
+        host = urlsplit(url).netloc or url
+        if host not in cls._shared:
+            cls._shared[host] = cls(host)
+        return cls._shared[host]
+
+    def acquire(self):
+        """
+        Blocks until this process may start a navigation to the host.
+
+        :returns: float: Seconds spent waiting.
+        """
+        waited = 0.0
+        delay = self.reserve()
+        while delay > 0:
+            time.sleep(delay)
+            waited += delay
+            # The circuit may have opened while this caller waited for its slot
+            delay = max(self.read_state()["open_until"] - time.time(), 0.0)
+        self.stats["waited"] += waited
+        return waited
+
+    def reserve(self) -> float:
+        """
+        Takes the next free slot of the bucket without waiting for it.
+
+        :returns: float: Seconds until the reserved slot; asyncio callers sleep this long themselves.
+        """
+        self.stats["navigations"] += 1
+        if not self.enabled:
+            return 0.0
+
+        def take_slot(state, now):
+            interval = 1.0 / state["rate"]
+            start = max(now, state["tat"] - (self.burst - 1) * interval, state["open_until"])
+            state["tat"] = max(state["tat"], start) + interval
+            return start - now
+        return self._update(take_slot)
+
+    def record_success(self):
+        """Closes a half-open circuit and raises the rate towards its maximum after a healthy page."""
+        state = self.read_state()
+        if not state["errors"] and not state["half_open"] and state["rate"] >= self.max_rate:
+            return
+
+        def recover(state, now):
+            state["errors"] = 0
+            state["half_open"] = False
+            state["cooldown"] = self.cooldown
+            state["rate"] = min(self.max_rate, state["rate"] + RATE_LIMIT_RECOVERY * self.max_rate)
+        self._update(recover)
+
+    def record_traffic_error(self) -> float:
+        """
+        Slows every process down after a traffic error page and opens the circuit after too many.
+
+        :returns: float: Seconds the caller should back off before retrying, at least until the
+            circuit closes again.
+        """
+        self.stats["traffic_errors"] += 1
+
+        def slow_down(state, now):
+            state["errors"] += 1
+            state["rate"] = max(self.min_rate, state["rate"] / 2)
+            reopened = state["half_open"] and now >= state["open_until"]
+            if state["errors"] >= self.threshold or reopened:
+                if reopened:
+                    state["cooldown"] = min(state["cooldown"] * 2, self.max_cooldown)
+                state["open_until"] = now + state["cooldown"]
+                state["half_open"] = True
+                state["errors"] = 0
+                self.stats["circuit_opened"] += 1
+            backoff = min(self.backoff_max, self.backoff_base * 2 ** (state["errors"] - 1))
+            # Equal jitter keeps half the backoff and spreads the rest, so retries do not line up
+            backoff = backoff / 2 + self.random.uniform(0, backoff / 2)
+            return max(backoff, state["open_until"] - now)
+        return self._update(slow_down)
+
+    def read_state(self) -> dict:
+        """Reads the shared state; the file is replaced atomically, so no lock is needed."""
+        try:
+            with open(self.path, encoding="utf-8") as state_file:
+                return json.load(state_file)
+        except (OSError, ValueError):
+            return {"rate": self.max_rate, "tat": 0.0, "errors": 0, "open_until": 0.0, "half_open": False,
+                    "cooldown": self.cooldown}
+
+    def _update(self, change):
+        """Applies change(state, now) to the shared state under the lock and returns its result."""
+        with self.lock:
+            state = self.read_state()
+            result = change(state, time.time())
+            write_atomically(self.path, json.dumps(state))
+        return result
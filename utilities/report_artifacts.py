@@ -0,0 +1,223 @@
+"""
+Keeps the Reports/ tree small: compacts a day's PNG screenshots, bundles a day's run into one archive
+and enforces retention by age and total size.
+
+compact converts PNG screenshots into a WebP image and a WebP thumbnail, the way the screenshot pipeline
+stores them, and points that day's HTML reports at the lazily loaded thumbnails. bundle packs a day
+into Reports/<date>.tar.zst, or .tar.gz without the optional zstandard package; --thumbnails-only
+leaves out the full-size images for a small CI upload. retain removes whole days, oldest first.
+
+Usage:
+    python -m utilities.report_artifacts compact 2025_02_12
+    python -m utilities.report_artifacts bundle --thumbnails-only --output-dir report_bundle
+    python -m utilities.report_artifacts retain --max-age-days 7 --max-total-mb 50
+"""
+import argparse
+import os
+import re
+import shutil
+import tarfile
+from datetime import date, datetime, timedelta
+from configs.configs import (
+    REPORTS_DIR, REPORT_RETENTION_DAYS, REPORT_MAX_TOTAL_MB, REPORT_BUNDLE_COMPRESSION
+)
+from utilities.utilities import DateFactory, ThumbnailStrategy, atomic_open
+
+BUNDLE_EXTENSIONS = {"zstd": ".tar.zst", "gzip": ".tar.gz"}
+# Day directories (2026_10_18) and their bundles; nothing else under Reports/ is ever removed
+DAY_ENTRY = re.compile(r"^(\d{4}_\d{2}_\d{2})(?:\.tar\.zst|\.tar\.gz)?$")
+# A PNG screenshot as referenced by a report, also inside the HTML-escaped JSON of pytest-html 4
+PNG_REFERENCE = re.compile(r'src=(?P<quote>\\?&#34;|")(?P<name>[\w.-]+)\.png(?P=quote)')
+
+
+class ReportArtifacts:
+    """Compaction, bundling and retention of the Reports/<date> directories."""
+    def __init__(self, base_dir: str = REPORTS_DIR, strategy: ThumbnailStrategy = None):
+        self.base_dir = base_dir
+        self.strategy = strategy or ThumbnailStrategy()
+
+    def day_dir(self, day: str = None) -> str:
+        return os.path.join(self.base_dir, day or DateFactory.get_current_date("%Y_%m_%d"))
+
+    def compact(self, day: str) -> dict:
+        """
+        Converts the day's PNG screenshots into WebP images and thumbnails and rewrites its reports to match.
+
+        :returns: dict: The number of screenshots "converted", the "reports" rewritten and the day's size
+            in bytes "before" and "after". Nothing is converted when Pillow is not installed.
+        """
+        day_dir = self.day_dir(day)
+        stats = {"converted": 0, "reports": 0, "before": directory_size(day_dir)}
+        if self.strategy._image is not None:
+            converted = set()
+            for file_name in sorted(os.listdir(day_dir)):
+                name, extension = os.path.splitext(file_name)
+                if extension != ".png":
+                    continue
+                png_path = os.path.join(day_dir, file_name)
+                with open(png_path, "rb") as png_file:
+                    self.strategy.write(png_file.read(), day_dir, name)
+                os.remove(png_path)
+                converted.add(name)
+            stats["converted"] = len(converted)
+            if converted:
+                stats["reports"] = self._rewrite_reports(day_dir, converted)
+        stats["after"] = directory_size(day_dir)
+        return stats
+
+    def _rewrite_reports(self, day_dir: str, converted: set) -> int:
+        """Points every img of a converted screenshot at its thumbnail, opening the full image on click."""
+        def thumbnail(match):
+            if match["name"] not in converted:
+                return match[0]
+            quote, file_names = match["quote"], self.strategy.file_names(match["name"])
+            return (f'src={quote}{file_names["thumbnail"]}{quote} data-full={quote}{file_names["full"]}{quote} '
+                    f'loading={quote}lazy{quote}')
+
+        rewritten = 0
+        for file_name in os.listdir(day_dir):
+            if not file_name.endswith(".html"):
+                continue
+            path = os.path.join(day_dir, file_name)
+            with open(path, encoding="utf-8") as report_file:
+                html = report_file.read()
+            compacted = PNG_REFERENCE.sub(thumbnail, html).replace(
+                "window.open(this.src)", "window.open(this.dataset.full || this.src)")
+            if compacted != html:
+                with open(path, "w", encoding="utf-8") as report_file:
+                    report_file.write(compacted)
+                rewritten += 1
+        return rewritten
+
+    def bundle(self, day: str = None, compression: str = REPORT_BUNDLE_COMPRESSION, output_dir: str = None,
+               thumbnails_only: bool = False) -> str:
+        """
+        Packs a day's reports, screenshots and traces into one tar archive.
+
+        :returns: str: The path of <date>.tar.zst or <date>.tar.gz in output_dir (the Reports/ directory
+            by default).
+        """
+        day_dir = self.day_dir(day)
+        if compression == "auto":
+            compression = "zstd" if _zstandard() else "gzip"
+        if compression not in BUNDLE_EXTENSIONS:
+            raise ValueError(f"Unsupported bundle compression: {compression}")
+        output_dir = output_dir or self.base_dir
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, os.path.basename(day_dir) + BUNDLE_EXTENSIONS[compression])
+
+        file_names = sorted(os.listdir(day_dir))
+        if thumbnails_only:
+            file_names = [file_name for file_name in file_names if not self._is_full_size(file_name, file_names)]
+        with atomic_open(path) as bundle_file:
+            if compression == "zstd":
+                zstandard = _zstandard()
+                if zstandard is None:
+                    raise ImportError("zstd bundles need zstandard: pip install zstandard")
+                with zstandard.ZstdCompressor(level=19).stream_writer(bundle_file, closefd=False) as stream:
+                    self._write_tar(tarfile.open(fileobj=stream, mode="w|"), day_dir, file_names)
+            else:
+                self._write_tar(tarfile.open(fileobj=bundle_file, mode="w:gz", compresslevel=9), day_dir, file_names)
+        return path
+
+    def _is_full_size(self, file_name: str, file_names) -> bool:
+        """A screenshot whose thumbnail is stored next to it."""
+        name, extension = os.path.splitext(file_name)
+        if extension not in (".png", ".webp"):
+            return False
+        thumbnail = self.strategy.file_names(name)["thumbnail"]
+        return thumbnail != file_name and thumbnail in file_names
+
+    @staticmethod
+    def _write_tar(archive, day_dir: str, file_names):
+        with archive:
+            for file_name in file_names:
+                path = os.path.join(day_dir, file_name)
+                if os.path.isfile(path) and not file_name.endswith(".tmp"):
+                    archive.add(path, arcname=f"{os.path.basename(day_dir)}/{file_name}")
+
+    def enforce_retention(self, max_age_days: int = REPORT_RETENTION_DAYS,
+                          max_total_mb: float = REPORT_MAX_TOTAL_MB, today: date = None) -> list:
+        """
+        Removes days older than max_age_days, then the oldest days until Reports/ fits in max_total_mb.
+        A day's directory and its bundle go together; today's directory is always kept.
+
+        :returns: list: The removed paths.
+        """
+        today = today or date.today()
+        days = {}
+        for entry in os.listdir(self.base_dir) if os.path.isdir(self.base_dir) else []:
+            match = DAY_ENTRY.match(entry)
+            if match:
+                days.setdefault(match[1], []).append(os.path.join(self.base_dir, entry))
+
+        sizes = {day: sum(entry_size(path) for path in paths) for day, paths in days.items()}
+        total = sum(sizes.values())
+        oldest_allowed = today - timedelta(days=max_age_days)
+        removed = []
+        for day in sorted(days):
+            if day == today.strftime("%Y_%m_%d"):
+                continue
+            too_old = datetime.strptime(day, "%Y_%m_%d").date() < oldest_allowed
+            if not too_old and total <= max_total_mb * 1024 * 1024:
+                continue
+            for path in days[day]:
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+                removed.append(path)
+            total -= sizes[day]
+        return removed
+
+
+def _zstandard():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def entry_size(path: str) -> int:
+    return directory_size(path) if os.path.isdir(path) else os.path.getsize(path)
+
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, file_name))
+               for root, _, file_names in os.walk(path) for file_name in file_names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports-dir", default=REPORTS_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    compact = commands.add_parser("compact", help="Convert a day's PNG screenshots to WebP thumbnails")
+    compact.add_argument("day", nargs="?", help="Reports/<day>, today by default")
+    bundle = commands.add_parser("bundle", help="Pack a day's run into one archive")
+    bundle.add_argument("day", nargs="?", help="Reports/<day>, today by default")
+    bundle.add_argument("--compression", default=REPORT_BUNDLE_COMPRESSION, choices=["auto", "zstd", "gzip"])
+    bundle.add_argument("--output-dir", help="Directory of the archive, Reports/ by default")
+    bundle.add_argument("--thumbnails-only", action="store_true", help="Leave out full-size screenshots")
+    retain = commands.add_parser("retain", help="Remove days past the age or total size limit")
+    retain.add_argument("--max-age-days", type=int, default=REPORT_RETENTION_DAYS)
+    retain.add_argument("--max-total-mb", type=float, default=REPORT_MAX_TOTAL_MB)
+    args = parser.parse_args()
+
+    artifacts = ReportArtifacts(args.reports_dir)
+    if args.command == "compact":
+        stats = artifacts.compact(args.day)
+        print(f"Converted {stats['converted']} screenshots and rewrote {stats['reports']} reports: "
+              f"{stats['before'] / 1024:.0f} KiB -> {stats['after'] / 1024:.0f} KiB")
+    elif args.command == "bundle":
+        day_dir = artifacts.day_dir(args.day)
+        path = artifacts.bundle(args.day, args.compression, args.output_dir, args.thumbnails_only)
+        print(f"Bundled {day_dir} ({directory_size(day_dir) / 1024:.0f} KiB) into {path} "
+              f"({os.path.getsize(path) / 1024:.0f} KiB)")
+    else:
+        for path in artifacts.enforce_retention(args.max_age_days, args.max_total_mb):
+            print(f"Removed {path}")
+
+
+if __name__ == "__main__":
+    main()
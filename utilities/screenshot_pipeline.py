@@ -0,0 +1,80 @@
+import hashlib
+import os
+import queue
+import random
+import threading
+from configs.configs import PROJECT_ROOT, SCREENSHOT_POLICY, SCREENSHOT_SAMPLE_RATE
+from utilities.utilities import DateFactory, ScreenshotStrategy, ThumbnailStrategy
+
+SCREENSHOT_POLICIES = ("always", "on-failure", "sampled")
+
+class ScreenshotPipeline:
+    """
+    Captures screenshots on the test thread and encodes and stores them on a background thread.
+
+    The test only pays for the raw PNG capture. Frames are named by content hash, so identical
+    screenshots are stored once no matter how often they are captured.
+    """
+    def __init__(
+        self,
+        strategy: ScreenshotStrategy = None,
+        policy: str = SCREENSHOT_POLICY,
+        sample_rate: float = SCREENSHOT_SAMPLE_RATE,
+        base_dir: str = "Reports"
+    ):
+        if policy not in SCREENSHOT_POLICIES:
+            raise ValueError(f"Unsupported screenshot policy: {policy}")
+        self.strategy = strategy or ThumbnailStrategy()
+        self.policy = policy
+        self.sample_rate = sample_rate
+        self.dir_path = os.path.join(PROJECT_ROOT, base_dir, DateFactory.get_current_date("%Y_%m_%d"))
+        self.stats = {"captured": 0, "deduplicated": 0, "written": 0, "write_errors": 0}
+        self._stored = set()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write_frames, name="screenshot-writer", daemon=True)
+        self._thread.start()
+
+    def should_capture(self, report) -> bool:
+        """Applies the capture policy to a test phase report."""
+        if self.policy == "always" or report.failed:
+            return True
+        return self.policy == "sampled" and random.random() < self.sample_rate
+
+    def capture(self, driver) -> dict:
+        """
+        Grabs the raw screenshot and queues it for encoding.
+
+        :returns: dict: The full-size and thumbnail file names, relative to the report directory.
+        """
+        png_bytes = driver.get_screenshot_as_png()
+        name = hashlib.blake2b(png_bytes, digest_size=12).hexdigest()
+        self.stats["captured"] += 1
+
+        if name in self._stored:
+            self.stats["deduplicated"] += 1
+        else:
+            self._stored.add(name)
+            self._queue.put((png_bytes, name))
+        return self.strategy.file_names(name)
+
+    def close(self):
+        """Waits until every queued screenshot is written and stops the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _write_frames(self):
+        os.makedirs(self.dir_path, exist_ok=True)
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            png_bytes, name = frame
+            # Another worker (or an earlier run today) may already have stored the same frame
+            if os.path.exists(os.path.join(self.dir_path, self.strategy.file_names(name)["full"])):
+                self.stats["deduplicated"] += 1
+                continue
+            try:
+                self.strategy.write(png_bytes, self.dir_path, name)
+                self.stats["written"] += 1
+            except Exception:
+                self.stats["write_errors"] += 1
@@ -0,0 +1,171 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from configs.configs import SNAPSHOT_CACHE_DIR, SNAPSHOT_CACHE_TTL, SNAPSHOT_CACHE_MAX_BYTES, SNAPSHOT_CACHE_STORE_HTML
+from utilities.utilities import FileLock, write_atomically
+
+class SnapshotCache:
+    """
+    On-disk cache of extracted search result pages, keyed by search term, page number and viewport.
+
+    Entries are stored under the hash of their key, so every worker, browser and run finds the same
+    file. An entry records the browser that extracted it; a run of another browser is served the same
+    products and labels them with its own browser when it re-emits them.
+    An entry is served until it is older than ttl seconds; when the cache grows past max_bytes the
+    least recently used entries are evicted. Reading an entry refreshes its modification time, which
+    is what the eviction orders by. The total size is kept in a small file next to the entries and
+    updated by every put, so the tree is only walked when the cap is exceeded.
+    """
+    SIZE_FILE = ".size"
+
+    def __init__(self, cache_dir: str = SNAPSHOT_CACHE_DIR, ttl: float = SNAPSHOT_CACHE_TTL,
+                 max_bytes: int = SNAPSHOT_CACHE_MAX_BYTES, store_html: bool = SNAPSHOT_CACHE_STORE_HTML):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.store_html = store_html
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "stored": 0, "evicted": 0}
+
+    @staticmethod
+    def key(search_term: str, page: int, viewport) -> str:
+        """Returns the hash a (search term, page, viewport) snapshot is stored under."""
+        width, height = viewport
+        material = json.dumps([search_term.strip().lower(), int(page), f"{width}x{height}"])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str = ".json") -> str:
+        return os.path.join(self.cache_dir, key[:2], key + suffix)
+
+    def get(self, search_term: str, page: int, viewport):
+        """
+        Returns the cached snapshot of a result page, or None when it is missing or expired.
+
+        :returns: dict: "products" (product dicts), "has_next", "browser" (the browser that extracted
+            them) and "created" (epoch seconds).
+        """
+        path = self._path(self.key(search_term, page, viewport))
+        try:
+            with open(path, encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+
+        if time.time() - entry["created"] > self.ttl:
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            self._remove(path)
+            return None
+
+        self.stats["hits"] += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def get_html(self, search_term: str, page: int, viewport):
+        """Returns the raw HTML stored with a snapshot, or None."""
+        html_path = self._path(self.key(search_term, page, viewport), ".html.gz")
+        try:
+            with gzip.open(html_path, "rt", encoding="utf-8") as html_file:
+                return html_file.read()
+        except OSError:
+            return None
+
+    def put(self, search_term: str, page: int, viewport, browser_name: str, products_info, has_next: bool,
+            page_source: str = None):
+        """Stores the products a browser extracted from a result page, plus its HTML when store_html is set."""
+        key = self.key(search_term, page, viewport)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        replaced_size = self._entry_size(path)
+        entry = {
+            "term": search_term,
+            "page": page,
+            "viewport": list(viewport),
+            "browser": browser_name,
+            "created": time.time(),
+            "has_next": has_next,
+            "products": products_info
+        }
+        write_atomically(path, json.dumps(entry, ensure_ascii=False))
+        if self.store_html and page_source is not None:
+            write_atomically(self._path(key, ".html.gz"), gzip.compress(page_source.encode("utf-8")))
+        self.stats["stored"] += 1
+        self._add_size(self._entry_size(path) - replaced_size)
+
+    def _add_size(self, delta: int):
+        """Adds delta to the recorded total size and evicts once it exceeds max_bytes."""
+        with FileLock(os.path.join(self.cache_dir, ".lock")):
+            try:
+                with open(os.path.join(self.cache_dir, self.SIZE_FILE), encoding="utf-8") as size_file:
+                    total = json.load(size_file)["bytes"] + delta
+            except (OSError, ValueError, KeyError):
+                # No record yet: the walk counts the entry just written
+                total = sum(size for _, size, _ in self._scan())
+            if total > self.max_bytes:
+                total = self._evict()
+            self._write_size(total)
+
+    def evict(self):
+        """Removes entries unused for longer than ttl, then least recently used ones until the cache fits max_bytes."""
+        with FileLock(os.path.join(self.cache_dir, ".lock")):
+            self._write_size(self._evict())
+
+    def _evict(self) -> int:
+        """Walks the cache and evicts; the caller holds the lock. Returns the size that is left."""
+        entries = self._scan()
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        for last_used, size, path in sorted(entries):
+            if total <= self.max_bytes and now - last_used <= self.ttl:
+                continue
+            self._remove(path)
+            self.stats["evicted"] += 1
+            total -= size
+        return total
+
+    def _scan(self):
+        """Returns (last used, size, path) for every entry in the cache."""
+        entries = []
+        for dir_path, _, file_names in os.walk(self.cache_dir):
+            for file_name in file_names:
+                if not file_name.endswith(".json"):
+                    continue
+                path = os.path.join(dir_path, file_name)
+                try:
+                    last_used = os.stat(path).st_mtime
+                except OSError:
+                    continue
+                entries.append((last_used, self._entry_size(path), path))
+        return entries
+
+    def _write_size(self, total: int):
+        write_atomically(os.path.join(self.cache_dir, self.SIZE_FILE), json.dumps({"bytes": max(total, 0)}))
+
+    @staticmethod
+    def _entry_size(path: str) -> int:
+        """Returns the bytes of an entry and its HTML, 0 for files that do not exist."""
+        size = 0
+        for entry_path in (path, path[:-len(".json")] + ".html.gz"):
+            try:
+                size += os.path.getsize(entry_path)
+            except OSError:
+                pass
+        return size
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    @staticmethod
+    def _remove(path: str):
+        for entry_path in (path, path[:-len(".json")] + ".html.gz"):
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,280 @@
+"""
+Local Amazon stand-in that serves the recorded pages in test_data/pages.
+
+Serves the home page, paginated search results and product detail pages with the DOM ids and
+XPaths the page objects rely on, so runs do not depend on Amazon's latency, CAPTCHAs or throttling.
+
+Usage:
+    python -m utilities.stand_in_server --port 8765 --latency 0.2 --error-mode traffic --error-rate 0.1
+"""
+import argparse
+import hashlib
+import html
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, quote_plus, urlsplit
+from configs.configs import (
+    STAND_IN_HOST, STAND_IN_PORT, STAND_IN_LATENCY, STAND_IN_ERROR_MODE, STAND_IN_ERROR_RATE
+)
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test_data', 'pages')
+ERROR_MODES = ("traffic", "captcha")
+# build_product ASINs: "B", three hex digits of the term's hash, the page and the card index
+ASIN_PATTERN = re.compile(r"B[0-9A-F]{3}(\d{3})(\d{3})")
+
+CARD_TEMPLATE = Template("""
+    <div data-component-type="s-search-result" data-asin="$asin" data-index="$index" class="s-result-item">
+      <span data-component-type="s-product-image">
+        <a href="/dp/$asin?keywords=$query" target="_blank"><img src="/assets/$asin.jpg" alt="$name" width="218" height="218"></a>
+      </span>
+      <h2 aria-label="$name"><a href="/dp/$asin?keywords=$query" target="_blank"><span>$name</span></a></h2>
+      $rating
+      $price
+    </div>""")
+PRICE_TEMPLATE = Template('<span class="a-price"><span class="a-price-whole">$price</span></span>')
+RATING_TEMPLATE = Template(
+    '<a aria-label="$rating out of 5 stars, rating details" href="#">'
+    '<i data-cy="reviews-ratings-slot" class="a-icon a-icon-star-small"></i></a>')
+# Card images and web fonts are served as filler bytes of a typical product thumbnail's size
+ASSET_BYTES = bytes(48 * 1024)
+ASSET_CONTENT_TYPES = {".jpg": "image/jpeg", ".woff2": "font/woff2"}
+NOT_FOUND_PAGE = "<html><body><h1>Page not found</h1></body></html>"
+BAD_REQUEST_PAGE = "<html><body><h1>Bad request</h1></body></html>"
+NEXT_LINK_TEMPLATE = Template(
+    '    <a href="/s?k=$query&amp;page=$next_page" aria-label="Go to next page, page $next_page" '
+    'class="s-pagination-item s-pagination-next">Next</a>')
+
+
+def load_page(name):
+    """Reads a recorded page template from test_data/pages."""
+    with open(os.path.join(PAGES_DIR, name), encoding='utf-8') as page_file:
+        return Template(page_file.read())
+
+
+def build_product(term, page, index):
+    """Builds the deterministic product shown at a position of a search result page."""
+    digest = hashlib.sha1(term.encode('utf-8')).hexdigest()[:3].upper()
+    return {
+        "asin": f"B{digest}{page % 1000:03d}{index % 1000:03d}",
+        "name": f"{term.title()} Stand-in Model {page}-{index + 1}",
+        # Every fifth card has no price and every seventh no rating, like sponsored/new listings
+        "price": None if index % 5 == 4 else f"{999 + (page * 37 + index * 113) % 90000:,}",
+        "rating": None if index % 7 == 6 else f"{3 + (page + index) % 20 / 10:.1f}",
+    }
+
+
+def product_from_asin(term, asin):
+    """
+    Rebuilds the product a search result card links to from its search term and ASIN.
+
+    :raises: ValueError: If asin was not built by build_product.
+    """
+    match = ASIN_PATTERN.fullmatch(asin)
+    if match is None:
+        raise ValueError(f"Not a stand-in ASIN: {asin!r}")
+    product = build_product(term, int(match.group(1)), int(match.group(2)))
+    product["price"] = product["price"] or "999"
+    return product
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Routes requests to the recorded home, search result and product detail pages."""
+    server_version = "AmazonStandIn/1.0"
+    # Keep-alive lets pooled HTTP clients and browsers reuse connections
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        settings = self.server.settings
+        if settings["latency"]:
+            time.sleep(settings["latency"])
+
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+
+        if url.path.startswith("/assets/"):
+            self._send_asset(url.path)
+            return
+        if self._inject_error(settings):
+            return
+        if url.path in ("/", "/index.html"):
+            self._send(200, self.server.pages["home"].substitute())
+        elif url.path == "/s":
+            self._send_search_results(query, settings)
+        elif url.path.startswith("/dp/"):
+            try:
+                product = product_from_asin(query.get("keywords", [""])[0], url.path[len("/dp/"):].strip("/"))
+            except ValueError:
+                self._send(404, NOT_FOUND_PAGE)
+                return
+            self._send(200, self.server.pages["product"].substitute(product, name=html.escape(product["name"])))
+        else:
+            self._send(404, NOT_FOUND_PAGE)
+
+    def _inject_error(self, settings):
+        """Serves the configured error page for a share of the requests. Returns True if it did."""
+        if settings["error_mode"] not in ERROR_MODES or self.server.random.random() >= settings["error_rate"]:
+            return False
+        self.server.record("errors")
+        if settings["error_mode"] == "traffic":
+            self._send(503, self.server.pages["rush_hour"].substitute())
+        else:
+            self._send(200, self.server.pages["captcha"].substitute())
+        return True
+
+    def _send_search_results(self, query, settings):
+        term = query.get("k", [""])[0]
+        page = query.get("page", ["1"])[0]
+        card_count = query.get("cards", [str(settings["cards_per_page"])])[0]
+        # Pages and card indexes are three digits of the ASIN
+        if not (page.isdecimal() and 1 <= int(page) <= 999 and card_count.isdecimal() and int(card_count) <= 999):
+            self._send(400, BAD_REQUEST_PAGE)
+            return
+        page, card_count = int(page), int(card_count)
+
+        cards = []
+        for index in range(card_count):
+            product = build_product(term, page, index)
+            cards.append(CARD_TEMPLATE.substitute(
+                index=index,
+                query=quote_plus(term),
+                asin=product["asin"],
+                name=html.escape(product["name"]),
+                price=PRICE_TEMPLATE.substitute(price=product["price"]) if product["price"] else "",
+                rating=RATING_TEMPLATE.substitute(rating=product["rating"]) if product["rating"] else "",
+            ))
+
+        next_link = ""
+        if page < settings["pages"]:
+            next_link = NEXT_LINK_TEMPLATE.substitute(query=quote_plus(term), next_page=page + 1)
+
+        self._send(200, self.server.pages["search"].substitute(
+            term=html.escape(term), page=page, cards="".join(cards), next_link=next_link))
+
+    def _send_asset(self, path):
+        """Serves filler bytes for card images and web fonts, so load profiles have something to block."""
+        self.server.record("assets")
+        content_type = ASSET_CONTENT_TYPES.get(os.path.splitext(path)[1], "application/octet-stream")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(ASSET_BYTES)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(ASSET_BYTES)
+
+    def _send(self, status, body):
+        payload = body.encode('utf-8')
+        self.server.record("requests")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        """Keeps the stand-in quiet; request counts are available through StandInServer.stats."""
+
+
+class StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections when many workers or tabs connect at once
+    request_queue_size = 128
+
+
+class StandInServer:
+    """Runs the stand-in on a background thread."""
+    def __init__(
+        self,
+        host: str = STAND_IN_HOST,
+        port: int = STAND_IN_PORT,
+        latency: float = STAND_IN_LATENCY,
+        error_mode: str = STAND_IN_ERROR_MODE,
+        error_rate: float = STAND_IN_ERROR_RATE,
+        cards_per_page: int = 16,
+        pages: int = 5,
+        seed: int = 0
+    ):
+        self.host = host
+        self.port = port
+        self.settings = {
+            "latency": latency,
+            "error_mode": error_mode,
+            "error_rate": error_rate,
+            "cards_per_page": cards_per_page,
+            "pages": pages,
+        }
+        self.seed = seed
+        self.stats = {"requests": 0, "errors": 0, "assets": 0}
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/"
+
+    def start(self):
+        """Binds the server and starts serving. Raises OSError if the port is already taken."""
+        server = StandInHTTPServer((self.host, self.port), StandInHandler)
+        server.settings = self.settings
+        server.random = random.Random(self.seed)
+        server.pages = {
+            "home": load_page("home.html"),
+            "search": load_page("search_results.html"),
+            "product": load_page("product_detail.html"),
+            "captcha": load_page("captcha.html"),
+            "rush_hour": load_page("rush_hour.html"),
+        }
+        lock = threading.Lock()
+
+        def record(counter):
+            with lock:
+                self.stats[counter] += 1
+
+        server.record = record
+        self._server = server
+        self.port = server.server_address[1]
+        self._thread = threading.Thread(target=server.serve_forever, name="amazon-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=STAND_IN_HOST)
+    parser.add_argument("--port", type=int, default=STAND_IN_PORT)
+    parser.add_argument("--latency", type=float, default=STAND_IN_LATENCY, help="Seconds added to every response")
+    parser.add_argument("--error-mode", choices=ERROR_MODES, default=STAND_IN_ERROR_MODE or None)
+    parser.add_argument("--error-rate", type=float, default=STAND_IN_ERROR_RATE,
+                        help="Share of requests answered with the error page")
+    parser.add_argument("--cards", type=int, default=16, help="Search result cards per page")
+    parser.add_argument("--pages", type=int, default=5, help="Number of search result pages")
+    args = parser.parse_args()
+
+    server = StandInServer(args.host, args.port, args.latency, args.error_mode or "", args.error_rate,
+                           args.cards, args.pages).start()
+    print(f"Amazon stand-in serving on {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
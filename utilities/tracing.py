@@ -0,0 +1,110 @@
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from configs.configs import TRACING_ENABLED
+from utilities.utilities import SingletonLogger, get_worker_id
+
+class Tracer:
+    """
+    Records timed spans of page-object actions, tagged with browser, device and search term.
+
+    Spans export as Chrome trace-event JSON (chrome://tracing, Perfetto) and as per-step duration
+    lists for the p50/p95 summary. When disabled, traced calls cost a single attribute check.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.enabled = TRACING_ENABLED
+            cls._instance.spans = []
+            cls._instance._lock = threading.Lock()
+            # perf_counter has the resolution for durations; the offset places spans on the wall clock
+            cls._instance._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+        return cls._instance
+
+    def record(self, name: str, start_ns: int, duration_ns: int, tags: dict):
+        with self._lock:
+            self.spans.append((name, start_ns, duration_ns, threading.get_ident(), tags))
+
+    @contextmanager
+    def span(self, name: str, **tags):
+        """Times the enclosed block as one span."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter_ns() - start, {**current_tags(), **tags})
+
+    def durations_by_step(self) -> dict:
+        """Returns the span durations in milliseconds, grouped by step name."""
+        durations = {}
+        for name, _, duration_ns, _, _ in self.spans:
+            durations.setdefault(name, []).append(duration_ns / 1e6)
+        return durations
+
+    def export_chrome_trace(self, path: str):
+        """Writes the spans as a Chrome trace-event JSON file, one process row per xdist worker."""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": get_worker_id()}}]
+        for name, start_ns, duration_ns, thread_id, tags in self.spans:
+            events.append({
+                "name": name,
+                "cat": "page_object",
+                "ph": "X",
+                "ts": (start_ns + self._epoch_offset_ns) / 1000,
+                "dur": duration_ns / 1000,
+                "pid": pid,
+                "tid": thread_id,
+                "args": tags
+            })
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+
+def current_tags() -> dict:
+    """Returns the test context bound on the logger (browser, device, search term)."""
+    context = SingletonLogger().context_filter.context
+    return {field: context[field] for field in ("browser", "device", "search_term") if field in context}
+
+def traced(step: str = None):
+    """Decorator recording every call of a page-object method as a span named Class.method (or step)."""
+    def decorator(method):
+        name = step or method.__qualname__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            tracer = Tracer()
+            if not tracer.enabled:
+                return method(self, *args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                tags = current_tags()
+                browser_name = getattr(self, "browser_name", None)
+                if browser_name:
+                    tags["browser"] = browser_name
+                tracer.record(name, start, time.perf_counter_ns() - start, tags)
+        return wrapper
+    return decorator
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list: the smallest value with fraction of the values at or below it."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+def summarize_steps(durations_by_step: dict) -> list:
+    """Returns (step, count, p50 ms, p95 ms, total ms) rows, slowest total first."""
+    rows = [
+        (step, len(durations), percentile(durations, 0.5), percentile(durations, 0.95), sum(durations))
+        for step, durations in durations_by_step.items() if durations
+    ]
+    return sorted(rows, key=lambda row: row[4], reverse=True)
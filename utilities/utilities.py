@@ -1,15 +1,22 @@
+import atexit
+import copy
+import io
+import json
 import logging
 import os
+import queue
+import shutil
+import threading
+import time
 from abc import ABC, abstractmethod
-from selenium import webdriver
-from selenium.webdriver import Chrome, Firefox, Edge
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.edge.service import Service as EdgeService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
+from contextlib import contextmanager
 from datetime import datetime, date
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from configs.configs import (
+    DRIVER_POOL_MAX_USES, DRIVER_POOL_WINDOW_SIZE, DRIVER_MANIFEST_PATH, DRIVER_OFFLINE,
+    DRIVER_PATH_ENV_VARS, DRIVER_BINARY_NAMES, SCREENSHOT_THUMBNAIL_SIZE, SCREENSHOT_QUALITY,
+    LOG_STRUCTURED, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOAD_PROFILE, LOAD_PROFILES, BLOCKED_FONT_URLS, EXTRACTION_MODE
+)
 
 # --------------------------
 # Date Factory
@@ -31,10 +38,78 @@ class ScreenshotStrategy(ABC):
     def save(self, driver, path: str):
         pass
 
+    def file_names(self, name: str) -> dict:
+        """Returns the full-size and thumbnail file names write() produces for a screenshot name."""
+        return {"full": f"{name}.png", "thumbnail": f"{name}.png"}
+
+    def write(self, png_bytes: bytes, dir_path: str, name: str):
+        """Stores an already captured PNG screenshot."""
+        write_atomically(os.path.join(dir_path, self.file_names(name)["full"]), png_bytes)
+
 class PNGStrategy(ScreenshotStrategy):
     def save(self, driver, path: str):
         driver.save_screenshot(path)
 
+class ThumbnailStrategy(ScreenshotStrategy):
+    """Stores a compact full-size image plus a report thumbnail; WebP through Pillow, plain PNG without it."""
+    def __init__(self, thumbnail_size=SCREENSHOT_THUMBNAIL_SIZE, quality: int = SCREENSHOT_QUALITY):
+        self.thumbnail_size = thumbnail_size
+        self.quality = quality
+        try:
+            from PIL import Image
+            self._image = Image
+        except ImportError:
+            self._image = None
+
+    def file_names(self, name: str) -> dict:
+        if self._image is None:
+            return super().file_names(name)
+        return {"full": f"{name}.webp", "thumbnail": f"{name}_thumb.webp"}
+
+    def save(self, driver, path: str):
+        dir_path, file_name = os.path.split(path)
+        self.write(driver.get_screenshot_as_png(), dir_path, os.path.splitext(file_name)[0])
+
+    def write(self, png_bytes: bytes, dir_path: str, name: str):
+        if self._image is None:
+            return super().write(png_bytes, dir_path, name)
+
+        file_names = self.file_names(name)
+        image = self._image.open(io.BytesIO(png_bytes)).convert("RGB")
+        write_atomically(os.path.join(dir_path, file_names["full"]), self._encode(image))
+        image.thumbnail(self.thumbnail_size)
+        write_atomically(os.path.join(dir_path, file_names["thumbnail"]), self._encode(image))
+
+    def _encode(self, image) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format="WEBP", quality=self.quality, method=4)
+        return buffer.getvalue()
+
+@contextmanager
+def atomic_open(path: str, mode: str = "wb", **kwargs):
+    """
+    Opens a temporary file next to path that replaces path once the block completes.
+
+    Readers never see a partial file, and concurrent writers (processes or threads) each write their
+    own temporary file; the last replace wins. The temporary file is removed if the block fails.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, mode, **kwargs) as output_file:
+            yield output_file
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def write_atomically(path: str, data):
+    """Writes bytes, or text as UTF-8, through atomic_open."""
+    with atomic_open(path) as output_file:
+        output_file.write(data.encode("utf-8") if isinstance(data, str) else data)
+
 class ScreenshotManager:
     def __init__(
         self, 
@@ -64,7 +139,67 @@ class ScreenshotManager:
 # --------------------------
 # Singleton Logger
 # --------------------------
+def get_worker_id() -> str:
+    """Returns the pytest-xdist worker id (e.g. gw0), the crawl runner worker id, or 'master' outside of both."""
+    return os.environ.get("PYTEST_XDIST_WORKER") or os.environ.get("CRAWL_RUNNER_WORKER", "master")
+
+class ContextFilter(logging.Filter):
+    """Adds the bound test context (browser, device, search term, step) to every record."""
+    FIELDS = ("browser", "device", "search_term", "step")
+
+    def __init__(self):
+        super().__init__()
+        self.context = {}
+
+    def filter(self, record):
+        for field in self.FIELDS:
+            if getattr(record, field, None) is None:
+                setattr(record, field, self.context.get(field))
+        record.worker = get_worker_id()
+        return True
+
+class JsonLogFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+    def format(self, record):
+        entry = {
+            "ts": record.created,
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "worker": getattr(record, "worker", None),
+            "message": record.getMessage(),
+        }
+        for field in ContextFilter.FIELDS:
+            entry[field] = getattr(record, field, None)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+class LocalQueueHandler(QueueHandler):
+    """
+    Hands records to a QueueListener in the same process.
+
+    QueueHandler.prepare formats the whole record, traceback included, into the message and drops
+    exc_info, so the listener's JSON formatter never saw the exception. Here only the message is
+    merged with its arguments and the traceback is kept as exc_text, for the listener's formatter.
+    """
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
 class SingletonLogger:
+    """
+    Process-wide logger whose records are handed to a queue and written by a listener thread.
+
+    Every xdist worker writes its own size-rotated file (logs/automation.<worker>.log), so writes
+    never interleave; `python -m utilities.log_merge` rebuilds one time-ordered log.
+    """
     _instance = None
 
     def __new__(cls):
@@ -76,56 +211,374 @@ class SingletonLogger:
     def _configure_logger(self):
         self.logger = logging.getLogger('automation')
         self.logger.setLevel(logging.INFO)
+        self.context_filter = ContextFilter()
+        self.listener = None
         
         log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
         os.makedirs(log_dir, exist_ok=True)
-        log_file = os.path.join(log_dir, 'automation.log')
+        worker_id = get_worker_id()
+        log_file = os.path.join(log_dir, 'automation.log' if worker_id == 'master' else f'automation.{worker_id}.log')
         
         if not self.logger.handlers:
-            handler = logging.FileHandler(log_file)
-            formatter = logging.Formatter(
-                "%(asctime)s: %(levelname)s: %(message)s", 
-                datefmt="%m/%d/%Y %I:%M:%S %p"
-            )
+            handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+            if LOG_STRUCTURED:
+                formatter = JsonLogFormatter()
+            else:
+                formatter = logging.Formatter(
+                    "%(asctime)s: %(levelname)s: %(message)s", 
+                    datefmt="%m/%d/%Y %I:%M:%S %p"
+                )
             handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
+
+            queue_handler = LocalQueueHandler(queue.SimpleQueue())
+            queue_handler.addFilter(self.context_filter)
+            self.logger.addHandler(queue_handler)
+            self.listener = QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+            self.listener.start()
+            atexit.register(self.stop)
+
+    def bind(self, **fields):
+        """Sets context fields (browser, device, search_term, step) attached to following records."""
+        for field, value in fields.items():
+            if value is None:
+                self.context_filter.context.pop(field, None)
+            else:
+                self.context_filter.context[field] = value
+
+    def stop(self):
+        """Writes out the queued records and stops the listener thread."""
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
 
     def get_logger(self):
         return self.logger
     
+# --------------------------
+# File Lock
+# --------------------------
+class FileLock:
+    """Cross-process lock backed by an exclusively created lock file."""
+    def __init__(self, path: str, timeout: float = 120, stale_after: float = 600, poll_interval: float = 0.05):
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+
+    def acquire(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                        os.remove(self.path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Could not acquire lock {self.path} within {self.timeout} s")
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+# --------------------------
+# Driver Binary Resolver
+# --------------------------
+class DriverBinaryResolver:
+    """
+    Resolves WebDriver binaries once and shares them through a lock-protected on-disk manifest.
+
+    The manifest maps "<browser>:<browser version>" to a driver path, so webdriver_manager only runs
+    when the installed browser changes. With DRIVER_OFFLINE set it never runs at all.
+    """
+    _resolved = {}
+    stats = {"hits": 0, "misses": 0, "seconds_saved": 0.0}
+
+    def __init__(self, manifest_path: str = DRIVER_MANIFEST_PATH, offline: bool = DRIVER_OFFLINE):
+        self.manifest_path = manifest_path
+        self.offline = offline
+
+    def resolve(self, browser_name: str, manager_factory) -> str:
+        """
+        Returns the driver binary path for the browser.
+
+        :param browser_name: chrome, firefox or edge.
+        :param manager_factory: webdriver_manager class used when the manifest has no usable entry.
+        :raises: RuntimeError when offline and no driver binary can be found.
+        """
+        if browser_name in self._resolved:
+            return self._resolved[browser_name]
+
+        env_path = os.environ.get(DRIVER_PATH_ENV_VARS.get(browser_name, ""))
+        if env_path:
+            self._resolved[browser_name] = env_path
+            return env_path
+
+        manager = manager_factory()
+        key = f"{browser_name}:{self._browser_version(manager) or 'unknown'}"
+
+        with FileLock(self.manifest_path + ".lock"):
+            manifest = self._read_manifest()
+            entry = manifest["drivers"].get(key)
+
+            if entry and os.path.isfile(entry["path"]):
+                path = entry["path"]
+                manifest["seconds_saved"] += entry["install_seconds"]
+                self.stats["hits"] += 1
+                self.stats["seconds_saved"] += entry["install_seconds"]
+            elif self.offline:
+                path = shutil.which(DRIVER_BINARY_NAMES[browser_name])
+                if not path:
+                    raise RuntimeError(f"No cached driver for {key} and DRIVER_OFFLINE is set")
+                manifest["drivers"][key] = {"path": path, "install_seconds": 0.0, "resolved_at": time.time()}
+                self.stats["misses"] += 1
+            else:
+                start = time.perf_counter()
+                path = manager.install()
+                manifest["drivers"][key] = {
+                    "path": path,
+                    "install_seconds": round(time.perf_counter() - start, 3),
+                    "resolved_at": time.time()
+                }
+                self.stats["misses"] += 1
+
+            self._write_manifest(manifest)
+
+        self._resolved[browser_name] = path
+        return path
+
+    @staticmethod
+    def _browser_version(manager):
+        """Reads the installed browser version from the OS without any network access."""
+        try:
+            return manager.driver.get_browser_version_from_os()
+        except Exception:
+            return None
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as manifest_file:
+                return json.load(manifest_file)
+        except (FileNotFoundError, ValueError):
+            return {"drivers": {}, "seconds_saved": 0.0}
+
+    def _write_manifest(self, manifest: dict):
+        write_atomically(self.manifest_path, json.dumps(manifest, indent=2))
+
 # Factory Pattern for Browsers
 class Browser(ABC):
+    def __init__(self, load_profile: str = LOAD_PROFILE):
+        if load_profile not in LOAD_PROFILES:
+            raise ValueError(f"Unsupported load profile: {load_profile}")
+        self.load_profile = load_profile
+        self.profile = LOAD_PROFILES[load_profile]
+
     @abstractmethod
     def create_driver(self):
         pass
 
+    def _apply_chromium_profile(self, options):
+        """Applies the load profile to Chrome or Edge options."""
+        options.page_load_strategy = self.profile["page_load_strategy"]
+        if self.profile["block_images"]:
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        if self.profile["disable_extensions"]:
+            options.add_argument('--disable-extensions')
+            options.add_argument('--disable-component-extensions-with-background-pages')
+
+    @staticmethod
+    def _enable_network_capture(options, logging_prefs_capability):
+        """Turns on the DevTools performance log the "network" extraction mode reads responses from."""
+        if EXTRACTION_MODE == "network":
+            options.set_capability(logging_prefs_capability, {"performance": "ALL"})
+            options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+    def _block_chromium_fonts(self, driver):
+        """Blocks web font requests through CDP; Chromium has no preference for it. Covers the first tab."""
+        if self.profile["block_fonts"]:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_FONT_URLS})
+        return driver
+
+class BrowserFactory:
+    """
+    Registry of Browser classes by name.
+
+    Only the requested Browser is constructed, and each one imports its Selenium driver and
+    webdriver_manager modules inside create_driver. A worker that only runs Firefox never loads the
+    Chromium modules.
+    """
+    _registry = {}
+
+    @classmethod
+    def register(cls, browser_name: str):
+        """Class decorator that makes a Browser available under browser_name."""
+        def decorator(browser_class):
+            cls._registry[browser_name] = browser_class
+            return browser_class
+        return decorator
+
+    @classmethod
+    def browser_names(cls):
+        return list(cls._registry)
+
+    @classmethod
+    def get_browser(cls, browser_name: str, load_profile: str = LOAD_PROFILE) -> Browser:
+        browser_class = cls._registry.get(browser_name.lower())
+        return browser_class(load_profile) if browser_class else None
+
+@BrowserFactory.register("chrome")
 class ChromeBrowser(Browser):
     def create_driver(self):
-        options = webdriver.ChromeOptions()
+        from selenium.webdriver import Chrome, ChromeOptions
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        options = ChromeOptions()
         options.add_argument('--headless')
-        service = ChromeService(ChromeDriverManager().install())
-        return Chrome(service=service, options=options)
+        self._apply_chromium_profile(options)
+        self._enable_network_capture(options, "goog:loggingPrefs")
+        service = ChromeService(DriverBinaryResolver().resolve("chrome", ChromeDriverManager))
+        return self._block_chromium_fonts(Chrome(service=service, options=options))
 
+@BrowserFactory.register("firefox")
 class FirefoxBrowser(Browser):
     def create_driver(self):
-        options = webdriver.FirefoxOptions()
+        from selenium.webdriver import Firefox, FirefoxOptions
+        from selenium.webdriver.firefox.service import Service as FirefoxService
+        from webdriver_manager.firefox import GeckoDriverManager
+
+        options = FirefoxOptions()
         options.add_argument('--headless')
-        service = FirefoxService(GeckoDriverManager().install())
+        options.page_load_strategy = self.profile["page_load_strategy"]
+        if self.profile["block_images"]:
+            options.set_preference("permissions.default.image", 2)
+        if self.profile["block_fonts"]:
+            options.set_preference("gfx.downloadable_fonts.enabled", False)
+        if self.profile["disable_extensions"]:
+            # A fresh geckodriver profile has no user add-ons; this stops the add-on update and system add-on checks
+            options.set_preference("extensions.update.enabled", False)
+            options.set_preference("extensions.getAddons.cache.enabled", False)
+            options.set_preference("extensions.systemAddon.update.enabled", False)
+        service = FirefoxService(DriverBinaryResolver().resolve("firefox", GeckoDriverManager))
         return Firefox(service=service, options=options)
 
+@BrowserFactory.register("edge")
 class EdgeBrowser(Browser):
     def create_driver(self):
-        options = webdriver.EdgeOptions()
+        from selenium.webdriver import Edge, EdgeOptions
+        from selenium.webdriver.edge.service import Service as EdgeService
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+
+        options = EdgeOptions()
         options.add_argument('--headless')
-        service = EdgeService(EdgeChromiumDriverManager().install())
-        return Edge(service=service, options=options)
+        self._apply_chromium_profile(options)
+        self._enable_network_capture(options, "ms:loggingPrefs")
+        service = EdgeService(DriverBinaryResolver().resolve("edge", EdgeChromiumDriverManager))
+        return self._block_chromium_fonts(Edge(service=service, options=options))
+
+# --------------------------
+# Driver Pool
+# --------------------------
+class DriverPool:
+    """
+    Leases warm WebDriver sessions created through BrowserFactory.
+
+    A pool lives in one process, so every xdist worker keeps its own sessions. Returned sessions are
+    reset (cookies, extra tabs, window size) and reused until they have been leased max_uses times.
+    """
+    def __init__(self, max_uses: int = DRIVER_POOL_MAX_USES, window_size=DRIVER_POOL_WINDOW_SIZE):
+        self.max_uses = max_uses
+        self.window_size = window_size
+        self._idle = {}
+        self._leases = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "recycled": 0, "reset_failures": 0}
+
+    def acquire(self, browser_name: str):
+        """Returns an idle session for the browser, launching a new one when none is available."""
+        browser_name = browser_name.lower()
+        with self._lock:
+            idle = self._idle.setdefault(browser_name, [])
+            if idle:
+                driver, uses = idle.pop()
+                self.stats["hits"] += 1
+            else:
+                driver, uses = None, 0
+                self.stats["misses"] += 1
+
+        if driver is None:
+            browser = BrowserFactory.get_browser(browser_name)
+            if not browser:
+                raise ValueError(f"Unsupported browser: {browser_name}")
+            driver = browser.create_driver()
+
+        with self._lock:
+            self._leases[id(driver)] = (browser_name, uses + 1)
+        return driver
+
+    def release(self, driver):
+        """Returns a leased session, resetting it for reuse or quitting it once it is used up."""
+        with self._lock:
+            browser_name, uses = self._leases.pop(id(driver))
+
+        if uses < self.max_uses and self.reset(driver):
+            with self._lock:
+                self._idle.setdefault(browser_name, []).append((driver, uses))
+            return
+
+        with self._lock:
+            self.stats["recycled"] += 1
+        self._quit(driver)
+
+    def reset(self, driver) -> bool:
+        """Clears cookies, closes extra tabs and restores the window size. Returns False on failure."""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.delete_all_cookies()
+            if hasattr(driver, "execute_cdp_cmd"):
+                # Chromium can drop the cookies of every domain, not just the current one
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.set_window_size(*self.window_size)
+            driver.get("about:blank")
+            return True
+        except Exception:
+            with self._lock:
+                self.stats["reset_failures"] += 1
+            return False
+
+    def close(self):
+        """Quits every idle session."""
+        with self._lock:
+            drivers = [driver for idle in self._idle.values() for driver, _ in idle]
+            self._idle.clear()
+        for driver in drivers:
+            self._quit(driver)
 
-class BrowserFactory:
     @staticmethod
-    def get_browser(browser_name: str) -> Browser:
-        browsers = {
-            "chrome": ChromeBrowser(),
-            "firefox": FirefoxBrowser(),
-            "edge": EdgeBrowser()
-        }
-        return browsers.get(browser_name.lower())
\ No newline at end of file
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass